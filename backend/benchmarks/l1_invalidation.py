@@ -0,0 +1,95 @@
+"""
+Multi-worker harness for the L1 cache invalidation bus.
+
+Simulates several uvicorn workers in one process, each with its own Redis
+connection, InvalidationBus and LocalCache. One worker invalidates a key and
+the harness measures how long it takes until no worker still holds it.
+
+Needs the app's environment (backend/.env) and a running Redis. From backend/src:
+    python ../benchmarks/l1_invalidation.py [--workers 8] [--rounds 200]
+"""
+import argparse
+import asyncio
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from redis.asyncio import Redis  # noqa: E402
+
+from core.config import Settings  # noqa: E402
+from database.redis import MISSING, InvalidationBus, LocalCache  # noqa: E402
+
+config = Settings() # pyright: ignore[reportCallIssue]
+
+
+class SimulatedWorker:
+    def __init__(self, index: int, channel: str):
+        self.redis = Redis.from_url(config.REDIS_URL, decode_responses=True)
+        self.bus = InvalidationBus(self.redis, channel=channel)
+        self.cache = self.bus.register(LocalCache(f"harness-{index}", maxsize=1000, ttl=300))
+
+    async def start(self) -> None:
+        await self.bus.start()
+        await self.bus.wait_ready()
+
+    async def stop(self) -> None:
+        await self.bus.stop()
+        await self.redis.aclose()
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--rounds", type=int, default=200)
+    parser.add_argument("--timeout", type=float, default=1.0)
+    args = parser.parse_args()
+
+    channel = f"cache:invalidate:harness:{time.time_ns()}"
+    workers = [SimulatedWorker(i, channel) for i in range(args.workers)]
+    await asyncio.gather(*(worker.start() for worker in workers))
+
+    delays: list[float] = []
+    stale_rounds = 0
+    try:
+        for round_ in range(args.rounds):
+            key = f"harness:{round_}"
+            for worker in workers:
+                worker.cache.set(key, round_)
+                worker.cache.set(f"{key}:untouched", round_)
+
+            publisher = random.choice(workers)
+            started = time.perf_counter()
+            await publisher.bus.publish([key])
+
+            deadline = started + args.timeout
+            while any(worker.cache.get(key) is not MISSING for worker in workers):
+                if time.perf_counter() > deadline:
+                    stale_rounds += 1
+                    break
+                await asyncio.sleep(0)
+            else:
+                delays.append(time.perf_counter() - started)
+
+            if any(worker.cache.get(f"{key}:untouched") is MISSING for worker in workers):
+                raise AssertionError("Invalidation dropped an unrelated key")
+    finally:
+        await asyncio.gather(*(worker.stop() for worker in workers))
+
+    delays.sort()
+    print(f"workers: {args.workers}, rounds: {args.rounds}, stale after {args.timeout}s: {stale_rounds}")
+    if delays:
+        p99 = delays[max(0, int(len(delays) * 0.99) - 1)]
+        print(
+            f"propagation p50 {statistics.median(delays) * 1000:.2f} ms, "
+            f"p99 {p99 * 1000:.2f} ms, max {delays[-1] * 1000:.2f} ms"
+        )
+    if stale_rounds:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,114 @@
+"""
+Redis round trips and latency of the authenticated admin request path,
+sequential commands vs. auto-batched CacheRepo.
+
+Needs the app's environment (backend/.env) and a running Redis. From backend/src:
+    python ../benchmarks/redis_roundtrips.py [--requests 5000] [--concurrency 50]
+"""
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+from pathlib import Path
+from uuid import uuid4
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from redis.asyncio import Redis  # noqa: E402
+from redis.asyncio.client import Pipeline  # noqa: E402
+
+from core.rbac import roles_cache_key  # noqa: E402
+from database.redis import CacheRepo, get_redis  # noqa: E402
+
+# Stand-in for the rate limiter's script: one EVALSHA per request
+RATE_LIMIT_LUA = """
+local current = redis.call('INCR', KEYS[1])
+if current == 1 then redis.call('PEXPIRE', KEYS[1], ARGV[1]) end
+return current
+"""
+
+round_trips = 0
+
+
+def count_round_trips() -> None:
+    """Counts every command sent on its own plus every pipeline flush."""
+    execute_command = Redis.execute_command
+    pipeline_execute = Pipeline.execute
+
+    async def counted_command(self, *args, **kwargs):
+        global round_trips
+        round_trips += 1
+        return await execute_command(self, *args, **kwargs)
+
+    async def counted_pipeline(self, *args, **kwargs):
+        global round_trips
+        round_trips += 1
+        return await pipeline_execute(self, *args, **kwargs)
+
+    Redis.execute_command = counted_command
+    Pipeline.execute = counted_pipeline
+
+
+async def admin_request(repo: CacheRepo, rate_limit, user_id: str, batched: bool) -> float:
+    started = time.perf_counter()
+    jti = uuid4().hex
+    roles_key = roles_cache_key(user_id, 1)
+
+    await rate_limit(keys=[f"bench:rl:{user_id}"], args=[60000])
+    if batched:
+        blocked, roles = await asyncio.gather(repo.exists(f"block:{jti}"), repo.get(roles_key))
+    else:
+        blocked = await repo.exists(f"block:{jti}")
+        roles = await repo.get(roles_key)
+    if roles is None:
+        await repo.set(roles_key, '["admin"]', ttl=60)
+
+    return time.perf_counter() - started
+
+
+async def run(mode: str, requests: int, concurrency: int) -> None:
+    global round_trips
+    redis = get_redis()
+    rate_limit = redis.register_script(RATE_LIMIT_LUA)
+    batched = mode == "autobatch"
+    repo = CacheRepo(redis, autobatch=batched)
+    users = [str(uuid4()) for _ in range(100)]
+    latencies: list[float] = []
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(i: int) -> None:
+        async with semaphore:
+            latencies.append(await admin_request(repo, rate_limit, users[i % len(users)], batched))
+
+    round_trips = 0
+    started = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(requests)))
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    p99 = latencies[int(len(latencies) * 0.99) - 1]
+    print(
+        f"{mode:>10}: {round_trips / requests:.2f} round trips/request, "
+        f"p50 {statistics.median(latencies) * 1000:.2f} ms, p99 {p99 * 1000:.2f} ms, "
+        f"{requests / elapsed:.0f} req/s"
+    )
+
+    await redis.delete(*(roles_cache_key(user, 1) for user in users))
+    await redis.delete(*(f"bench:rl:{user}" for user in users))
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    args = parser.parse_args()
+
+    count_round_trips()
+    for mode in ("sequential", "autobatch"):
+        await run(mode, args.requests, args.concurrency)
+    await get_redis().aclose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
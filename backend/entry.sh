@@ -10,4 +10,4 @@ uvicorn main:app \
   --host "${API_HOST:-0.0.0.0}" \
   --port "${API_PORT:-8080}" \
   --proxy-headers \
-  --forwarded-allow-ips "${FORWARDED_ALLOW_IPS:-*}"
+  --forwarded-allow-ips "${FORWARDED_ALLOW_IPS:-127.0.0.1}"
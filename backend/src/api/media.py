@@ -0,0 +1,50 @@
+import re
+
+from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import FileResponse, RedirectResponse, Response
+
+from core.config import Settings
+from database.media import LocalStorage, MediaStorage, get_media_storage
+from service.users.pictures import CONTENT_TYPES
+
+config = Settings() # pyright: ignore[reportCallIssue]
+
+# Names are content digests, so a URL's bytes never change
+IMMUTABLE = "public, max-age=31536000, immutable"
+
+# Only picture variants are public; direct uploads and temporary files are not
+PUBLIC_KEY = re.compile(
+    r"users/[0-9a-f-]{36}/[0-9a-f]{32}_\d+\.(?P<ext>" + "|".join(CONTENT_TYPES) + r")"
+)
+
+
+def get_media_router() -> APIRouter:
+    router = APIRouter(prefix=f"/{config.MEDIA_DIR.strip('/')}", include_in_schema=False)
+
+    @router.api_route('/{key:path}', methods=['GET', 'HEAD'])
+    async def serve_media(
+        key: str,
+        storage: MediaStorage = Depends(get_media_storage),
+    ) -> Response:
+        match = PUBLIC_KEY.fullmatch(key)
+        if match is None:
+            raise HTTPException(status.HTTP_404_NOT_FOUND)
+
+        if not isinstance(storage, LocalStorage):
+            return RedirectResponse(storage.url(key), status.HTTP_301_MOVED_PERMANENTLY)
+
+        stored = await storage.stat(key)
+        if stored is None:
+            raise HTTPException(status.HTTP_404_NOT_FOUND)
+
+        headers = {"Cache-Control": IMMUTABLE}
+        media_type = CONTENT_TYPES[match["ext"]]
+        if config.MEDIA_ACCEL_REDIRECT:
+            # nginx sends the file itself, with sendfile and Range support
+            headers["X-Accel-Redirect"] = f"{config.MEDIA_ACCEL_PREFIX.rstrip('/')}/{key}"
+            return Response(headers=headers, media_type=media_type)
+
+        # Standalone: Starlette handles Range and uses zero-copy send where the server supports it
+        return FileResponse(storage.path(key), media_type=media_type, headers=headers)
+
+    return router
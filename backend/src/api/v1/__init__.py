@@ -5,11 +5,15 @@ def get_v1_router() -> APIRouter:
     from .auth import get_auth_routers
     from .users import get_users_router
     from .misc import get_misc_router
+    from .admins import get_admins_router
+    from .interactions import get_interactions_router
     
     router = APIRouter(prefix='/v1')
 
     router.include_router(get_auth_routers())
     router.include_router(get_users_router())
     router.include_router(get_misc_router())
+    router.include_router(get_admins_router())
+    router.include_router(get_interactions_router())
     
     return router
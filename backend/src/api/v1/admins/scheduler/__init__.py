@@ -0,0 +1,11 @@
+from fastapi import APIRouter
+
+
+def get_scheduler_router() -> APIRouter:
+    from .jobs import router as jobs_router
+
+    router = APIRouter(prefix='/scheduler')
+
+    router.include_router(jobs_router)
+
+    return router
@@ -0,0 +1,21 @@
+from typing import Annotated
+from fastapi import APIRouter, Depends
+
+from database.relational_db import User
+from domain.scheduler import ScheduledJob
+from core.security import require
+from scheduler import LeaderScheduler, get_scheduler
+
+router = APIRouter()
+
+
+@router.get(
+    path='/jobs',
+    response_model=list[ScheduledJob],
+    summary='Get scheduled jobs with their last runs',
+)
+async def scheduled_jobs(
+    _: Annotated[User, Depends(require('admin'))],
+    scheduler: Annotated[LeaderScheduler, Depends(get_scheduler)],
+):
+    return await scheduler.jobs()
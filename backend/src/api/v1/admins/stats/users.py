@@ -1,8 +1,8 @@
 from typing import Annotated
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, Query, Response
 
 from database.relational_db import User
-from domain.statistics import ActiveUsersGraph, RegistrationsGraph
+from domain.statistics import ActiveUserCounts, ActiveUsersGraph, Granularity, RegistrationsGraph
 from core.config import Settings
 from core.security import require
 # from domain.auth.enums import SystemPermission
@@ -12,26 +12,49 @@ router = APIRouter()
 config = Settings() # pyright: ignore[reportCallIssue]
 
 
-# @router.get(    
-#     path='/active-users',
-#     response_model=list[ActiveUsersGraph],
-#     summary='Get graph data for active users by days',
-# )
-# async def active_users(
-#     _: Annotated[User, Depends(require('admin'))],
-#     svc: Annotated[StatService, Depends(get_stats_service)],
-#     days: int = Query(30, description='Number of days back to retrieve data for'),
-# ):
-#     return await svc.active_users(days)
+@router.get(    
+    path='/active-users',
+    response_model=list[ActiveUsersGraph],
+    summary='Get graph data for active users by days',
+)
+async def active_users(
+    response: Response,
+    _: Annotated[User, Depends(require('admin'))],
+    svc: Annotated[StatService, Depends(get_stats_service)],
+    days: int = Query(30, ge=1, le=3660, description='Number of days back to retrieve data for'),
+):
+    points, age = await svc.active_users(days)
+    response.headers["Age"] = str(int(age))
+    return points
+
+@router.get(
+    path='/active-counts',
+    response_model=list[ActiveUserCounts],
+    summary='Get daily, weekly and monthly active users by days',
+)
+async def active_counts(
+    response: Response,
+    _: Annotated[User, Depends(require('admin'))],
+    svc: Annotated[StatService, Depends(get_stats_service)],
+    days: int = Query(30, ge=1, le=3660, description='Number of days back to retrieve data for'),
+):
+    points, age = await svc.active_user_counts(days)
+    response.headers["Age"] = str(int(age))
+    return points
 
 @router.get(    
     path='/registrations',
     response_model=list[RegistrationsGraph],
-    summary='Get graph data for new registrations by days',
+    summary='Get graph data for new registrations',
 )
 async def registrations(
+    response: Response,
     _: Annotated[User, Depends(require('admin'))],
     svc: Annotated[StatService, Depends(get_stats_service)],
-    days: int = Query(30, description='Number of days back to retrieve data for'),
+    days: int = Query(30, ge=1, le=3660, description='Number of days back to retrieve data for'),
+    granularity: Granularity = Query(Granularity.DAY, description='Bucket size'),
+    tz: str = Query('UTC', max_length=64, description='IANA timezone buckets are aligned to; other than UTC, at most 92 days'),
 ):
-    return await svc.new_registrations(days)
+    points, age = await svc.new_registrations(days, granularity, tz)
+    response.headers["Age"] = str(int(age))
+    return points
@@ -5,10 +5,10 @@ def get_users_router() -> APIRouter:
     from .list import router as list_router
     from .user_id import get_user_id_router
 
-    router = APIRouter(prefix='/users')
-    router.include_router(list_router)
-    router.include_router(get_user_id_router())
+    # Prefix set on include: the list route's path is empty, and an empty
+    # path under an empty prefix is rejected by FastAPI
+    router = APIRouter()
+    router.include_router(list_router, prefix='/users')
+    router.include_router(get_user_id_router(), prefix='/users')
     
     return router
-
-
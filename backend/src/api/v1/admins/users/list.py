@@ -1,9 +1,11 @@
+from datetime import datetime
 from typing import Annotated
 from fastapi import APIRouter, Depends, Query
 
+from core.query_budget import query_budget
 from core.security import require
 from database.relational_db import User
-from domain.users import UserModel
+from domain.users import UserModel, UserSort
 from service.users import UserService, get_user_service
 from domain.common import CursorPage
 
@@ -14,18 +16,27 @@ router = APIRouter()
     path='',
     response_model=CursorPage[UserModel],
     summary='List users with filters and search (cursor pagination)',
+    # statement_timeout, auth user and roles, the page and one roles query for all of
+    # it (tests/test_query_counts.py); role loading must not scale with the page
+    dependencies=[Depends(query_budget(5))],
 )
 async def list_users(
     _: Annotated[User, Depends(require('admin'))],
     svc: Annotated[UserService, Depends(get_user_service)],
     banned: bool | None = Query(None, description='Filter by banned status'),
     search: str | None = Query(None, description='Search by username or email'),
+    seen_after: datetime | None = Query(None, description='Only users active since'),
+    seen_before: datetime | None = Query(None, description='Only users inactive since, including never seen'),
+    sort: UserSort = Query(UserSort.CREATED_AT, description='Order, newest first; cursors only work with the order they came from'),
     limit: int = Query(50, ge=1, le=100, description='Page size'),
     cursor: str | None = Query(None, description='Opaque cursor'),
 ):
     users, next_cursor = await svc.admin_list_users(
         banned=banned,
         search=search,
+        seen_after=seen_after,
+        seen_before=seen_before,
+        sort=sort,
         limit=limit,
         cursor=cursor,
     )
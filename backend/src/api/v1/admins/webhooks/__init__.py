@@ -0,0 +1,10 @@
+from fastapi import APIRouter
+
+
+def get_webhooks_router() -> APIRouter:
+    from .subscriptions import router as subscriptions_router
+
+    router = APIRouter()
+    router.include_router(subscriptions_router, prefix='/webhooks')
+
+    return router
@@ -0,0 +1,97 @@
+from typing import Annotated
+from uuid import UUID
+from fastapi import APIRouter, Depends, Path, Query, status
+
+from core.security import require
+from database.relational_db import User
+from domain.webhooks import (
+    WebhookCreate,
+    WebhookCreated,
+    WebhookDeliveryModel,
+    WebhookModel,
+    WebhookPatch,
+)
+from service.webhooks import WebhookService, get_webhook_service
+
+router = APIRouter()
+
+
+@router.get(
+    path='',
+    response_model=list[WebhookModel],
+    summary='List webhook subscriptions',
+)
+async def list_webhooks(
+    _: Annotated[User, Depends(require('admin'))],
+    svc: Annotated[WebhookService, Depends(get_webhook_service)],
+):
+    return await svc.list_subscriptions()
+
+
+@router.post(
+    path='',
+    response_model=WebhookCreated,
+    status_code=status.HTTP_201_CREATED,
+    summary='Subscribe an endpoint to events',
+)
+async def create_webhook(
+    payload: WebhookCreate,
+    _: Annotated[User, Depends(require('admin'))],
+    svc: Annotated[WebhookService, Depends(get_webhook_service)],
+):
+    return await svc.create(payload)
+
+
+@router.patch(
+    path='/{webhook_id}',
+    response_model=WebhookModel,
+    summary='Update a webhook subscription',
+)
+async def update_webhook(
+    webhook_id: Annotated[UUID, Path(...)],
+    payload: WebhookPatch,
+    _: Annotated[User, Depends(require('admin'))],
+    svc: Annotated[WebhookService, Depends(get_webhook_service)],
+):
+    return await svc.update(webhook_id, payload)
+
+
+@router.delete(
+    path='/{webhook_id}',
+    status_code=status.HTTP_204_NO_CONTENT,
+    summary='Delete a webhook subscription and its pending deliveries',
+)
+async def delete_webhook(
+    webhook_id: Annotated[UUID, Path(...)],
+    _: Annotated[User, Depends(require('admin'))],
+    svc: Annotated[WebhookService, Depends(get_webhook_service)],
+):
+    await svc.delete(webhook_id)
+
+
+@router.post(
+    path='/{webhook_id}/ping',
+    status_code=status.HTTP_202_ACCEPTED,
+    summary='Send a test event to the endpoint',
+)
+async def ping_webhook(
+    webhook_id: Annotated[UUID, Path(...)],
+    _: Annotated[User, Depends(require('admin'))],
+    svc: Annotated[WebhookService, Depends(get_webhook_service)],
+):
+    await svc.ping(webhook_id)
+    return {'status': 'queued'}
+
+
+@router.get(
+    path='/{webhook_id}/deliveries',
+    response_model=list[WebhookDeliveryModel],
+    summary='Recent deliveries to the endpoint, newest first',
+)
+async def list_deliveries(
+    webhook_id: Annotated[UUID, Path(...)],
+    _: Annotated[User, Depends(require('admin'))],
+    svc: Annotated[WebhookService, Depends(get_webhook_service)],
+    limit: int = Query(50, ge=1, le=200),
+):
+    return await svc.list_deliveries(webhook_id, limit)
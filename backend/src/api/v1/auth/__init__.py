@@ -1,5 +1,6 @@
 from fastapi import APIRouter, Depends
-from fastapi_limiter.depends import RateLimiter
+
+from core.rate_limit import client_ip, rate_limit
 
 
 def get_auth_routers() -> APIRouter:
@@ -15,7 +16,7 @@ def get_auth_routers() -> APIRouter:
             403: {"description": "Forbidden"},
             429: {"description": "Too Many Requests"}
         },
-        dependencies=[Depends(RateLimiter(times=10, seconds=60))]
+        dependencies=[Depends(rate_limit(10, 60, by=client_ip))]
     )
     
     router.include_router(register_router)
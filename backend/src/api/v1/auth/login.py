@@ -1,10 +1,9 @@
 from typing import Annotated, Literal
 from fastapi import APIRouter, Depends, Response, Request, Header, HTTPException
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from fastapi_limiter import FastAPILimiter
-from fastapi_limiter.depends import RateLimiter
 
 from core.http.cookies import clear_auth_cookies, set_auth_cookies
+from core.query_budget import query_budget
 from service.auth import CredentialsService, get_credentials_service
 from domain.auth import UserLogin, TokenPair
 
@@ -27,7 +26,10 @@ security = HTTPBearer(
             'It is made to protect web from xss and csrf attacks'
         },
         401: {"description": "Wrong credentials"}
-    }
+    },
+    # statement_timeout, user and roles (tests/test_query_counts.py), plus the
+    # UPDATE when the password is rehashed
+    dependencies=[Depends(query_budget(4))],
 )
 async def login_user(
     response: Response,
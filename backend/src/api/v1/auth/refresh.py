@@ -1,12 +1,12 @@
 from typing import Annotated
 from fastapi import APIRouter, Depends, Header, Request, Response, HTTPException
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from fastapi_limiter.depends import RateLimiter
 
 from service.auth import TokenService, get_token_service
 from domain.auth import TokenPair
 from core.http.cookies import clear_auth_cookies, set_auth_cookies
-from core.security import extract_jti
+from core.query_budget import query_budget
+from core.rate_limit import rate_limit, refresh_principal
 
 router = APIRouter()
 security = HTTPBearer(
@@ -19,7 +19,8 @@ security = HTTPBearer(
     path='/refresh',
     response_model=TokenPair,
     summary='Rotate tokens',
-    dependencies=[Depends(RateLimiter(times=10, seconds=60, identifier=extract_jti))],
+    # statement_timeout, user and roles (tests/test_query_counts.py)
+    dependencies=[Depends(rate_limit(10, 60, by=refresh_principal)), Depends(query_budget(3))],
 )
 async def refresh_tokens(
     request: Request,
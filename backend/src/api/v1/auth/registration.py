@@ -2,6 +2,7 @@ from typing import Annotated, Literal
 from fastapi import APIRouter, Depends, Response, Header
 
 from core.http.cookies import set_auth_cookies
+from core.query_budget import query_budget
 from service.auth import CredentialsService, get_credentials_service
 from domain.auth import UserRegister,  TokenPair
 
@@ -20,7 +21,10 @@ router = APIRouter()
             'It is made to protect web from xss and csrf attacks'
         },
         409: {"description": "User with provided credentials already exists"}
-    }
+    },
+    # statement_timeout, user, default role, role links (delete and insert), daily
+    # rollup, outbox row and its NOTIFY (tests/test_query_counts.py)
+    dependencies=[Depends(query_budget(8))],
 )
 async def register_user(
     response: Response,
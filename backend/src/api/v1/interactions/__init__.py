@@ -0,0 +1,20 @@
+from fastapi import APIRouter, Depends
+
+from core.rate_limit import rate_limit
+
+
+def get_interactions_router() -> APIRouter:
+    from .ingest import router as ingest_router
+
+    router = APIRouter(
+        tags=['Interactions'],
+        responses={
+            401: {"description": "Not authorized"},
+            429: {"description": "Too Many Requests"},
+        },
+        dependencies=[Depends(rate_limit(120, 60, mode="approximate"))],
+    )
+
+    router.include_router(ingest_router)
+
+    return router
@@ -0,0 +1,31 @@
+from datetime import datetime, UTC
+from typing import Annotated
+from uuid import UUID
+from fastapi import APIRouter, Depends, status
+
+from core.security import parse_token
+from domain.statistics import InteractionsAccepted, InteractionsIn
+from service.statistics import InteractionBuffer, get_interaction_buffer
+
+router = APIRouter()
+
+
+@router.post(
+    path='/interactions',
+    status_code=status.HTTP_202_ACCEPTED,
+    response_model=InteractionsAccepted,
+    summary='Record book interactions',
+)
+async def ingest(
+    payload: InteractionsIn,
+    # The verified token is enough: no database round trip on this path
+    token: Annotated[dict[str, int | str], Depends(parse_token)],
+    buffer: Annotated[InteractionBuffer, Depends(get_interaction_buffer)],
+):
+    user_id = UUID(str(token["sub"]))
+    # Stamped here, client clocks aren't trusted
+    now = datetime.now(UTC)
+    accepted = buffer.add([
+        (now, user_id, event.interaction.value, event.target_id) for event in payload.events
+    ])
+    return InteractionsAccepted(accepted=accepted)
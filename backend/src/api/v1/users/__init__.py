@@ -1,4 +1,6 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Depends
+
+from core.rate_limit import rate_limit
 
 
 def get_users_router() -> APIRouter:
@@ -7,7 +9,12 @@ def get_users_router() -> APIRouter:
     router = APIRouter(
         prefix='/users',
         tags=['Users'],
-        responses={401: {"description": "Not authorized"}}
+        responses={
+            401: {"description": "Not authorized"},
+            429: {"description": "Too Many Requests"},
+        },
+        # High-volume, per user: counted locally and synced with Redis in the background
+        dependencies=[Depends(rate_limit(300, 60, mode="approximate"))],
     )
 
     router.include_router(get_me_router())
@@ -4,10 +4,12 @@ from fastapi import APIRouter
 def get_me_router() -> APIRouter:
     from .profile import router as profile_router
     from .picture import router as picture_router
+    from .resumable import router as resumable_router
     
     router = APIRouter()
     
     router.include_router(profile_router)
     router.include_router(picture_router)
+    router.include_router(resumable_router)
     
     return router
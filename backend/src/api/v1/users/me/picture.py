@@ -1,9 +1,10 @@
 from typing import Annotated
-from fastapi import APIRouter, Depends, UploadFile, File
+from fastapi import APIRouter, Depends, HTTPException, Request, UploadFile, File, status
 
 from database.relational_db import User
-from domain.users import UserModel
+from domain.users import PictureUploadConfirm, PictureUploadForm, UserModel
 from core.config import Settings
+from core.http import stream_file_field
 from core.security import auth_user
 from service.users import UserService, get_user_service
 
@@ -17,9 +18,74 @@ config = Settings() # pyright: ignore[reportCallIssue]
     summary='Update user profile picture'
 )
 async def update_profile(
-    file: Annotated[UploadFile, File(..., description=f"JPEG or PNG files (max {config.MAX_PHOTO_SIZE} MB)")],
+    file: Annotated[UploadFile, File(..., description=f"JPEG, PNG or WebP files (max {config.MAX_PHOTO_SIZE} MB)")],
     user: Annotated[User, Depends(auth_user)],
     svc: Annotated[UserService, Depends(get_user_service)],
 ):
     await svc.add_picture(file, user)
     return user
+
+
+@router.put(
+    path='/me/picture/stream',
+    response_model=UserModel,
+    summary='Update user profile picture, parsing the upload as it streams in',
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {"multipart/form-data": {"schema": {
+                "type": "object",
+                "properties": {"file": {"type": "string", "format": "binary"}},
+                "required": ["file"],
+            }}},
+        },
+    },
+)
+async def update_profile_streaming(
+    request: Request,
+    user: Annotated[User, Depends(auth_user)],
+    svc: Annotated[UserService, Depends(get_user_service)],
+):
+    # Same form as PUT /me/picture, but nothing is spooled to disk: the file is
+    # rejected on its first bytes or once over the limit, not after the upload
+    declared = int(request.headers.get("content-length") or 0)
+    if declared > config.MAX_PHOTO_SIZE * 1024 * 1024 + 64 * 1024:
+        raise HTTPException(
+            status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"File too large. Max {config.MAX_PHOTO_SIZE} MB"
+        )
+    await svc.add_picture(stream_file_field(request), user)
+    return user
+
+
+@router.post(
+    path='/me/picture/uploads',
+    response_model=PictureUploadForm,
+    summary='Get a presigned form to upload a profile picture straight to storage',
+    responses={501: {"description": "Storage backend doesn't support direct uploads"}},
+)
+async def create_picture_upload(
+    user: Annotated[User, Depends(auth_user)],
+    svc: Annotated[UserService, Depends(get_user_service)],
+):
+    key, upload = await svc.create_picture_upload(user)
+    return PictureUploadForm(
+        url=upload.url,
+        fields=upload.fields,
+        key=key,
+        expires_in=config.MEDIA_UPLOAD_URL_TTL,
+    )
+
+
+@router.post(
+    path='/me/picture/uploads/confirm',
+    response_model=UserModel,
+    summary='Set a directly uploaded file as the profile picture'
+)
+async def confirm_picture_upload(
+    payload: PictureUploadConfirm,
+    user: Annotated[User, Depends(auth_user)],
+    svc: Annotated[UserService, Depends(get_user_service)],
+):
+    await svc.confirm_picture_upload(user, payload.key)
+    return user
@@ -3,6 +3,7 @@ from fastapi import APIRouter, Depends
 
 from database.relational_db import User
 from domain.users import UserModel, UserPatch
+from core.query_budget import query_budget
 from core.security import auth_user
 from service.users import UserService, get_user_service
 
@@ -11,7 +12,9 @@ router = APIRouter()
 @router.get(
     path='/me',
     response_model=UserModel,
-    summary='Get user account info'
+    summary='Get user account info',
+    # statement_timeout, user and roles (tests/test_query_counts.py)
+    dependencies=[Depends(query_budget(3))],
 )
 async def profile(
     user: Annotated[User, Depends(auth_user)],
@@ -0,0 +1,115 @@
+from typing import Annotated
+from fastapi import APIRouter, Depends, Header, HTTPException, Request, Response, status
+
+from database.relational_db import User
+from core.config import Settings
+from core.security import auth_user
+from service.users import UserService, get_user_service
+from service.users.resumable import ResumableUploads, UploadState, get_resumable_uploads
+
+router = APIRouter()
+config = Settings() # pyright: ignore[reportCallIssue]
+
+TUS_VERSION = "1.0.0"
+
+
+def _tus_headers(state: UploadState) -> dict[str, str]:
+    return {
+        "Tus-Resumable": TUS_VERSION,
+        "Upload-Offset": str(state.offset),
+        "Upload-Length": str(state.length),
+        "Cache-Control": "no-store",
+    }
+
+
+@router.post(
+    path='/me/picture/resumable',
+    status_code=status.HTTP_201_CREATED,
+    summary='Start a resumable profile picture upload (tus creation)',
+    responses={201: {"description": "Created, the upload URL is in the Location header"}},
+)
+async def create_upload(
+    request: Request,
+    upload_length: Annotated[int, Header(ge=1)],
+    user: Annotated[User, Depends(auth_user)],
+    uploads: Annotated[ResumableUploads, Depends(get_resumable_uploads)],
+) -> Response:
+    if upload_length > config.MAX_PHOTO_SIZE * 1024 * 1024:
+        raise HTTPException(
+            status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"File too large. Max {config.MAX_PHOTO_SIZE} MB"
+        )
+    state = await uploads.create(user.id, upload_length)
+    headers = _tus_headers(state)
+    headers["Location"] = f"{request.url.path.rstrip('/')}/{state.id}"
+    return Response(status_code=status.HTTP_201_CREATED, headers=headers)
+
+
+@router.head(
+    path='/me/picture/resumable/{upload_id}',
+    summary='Current offset of a resumable upload',
+)
+async def upload_offset(
+    upload_id: str,
+    user: Annotated[User, Depends(auth_user)],
+    uploads: Annotated[ResumableUploads, Depends(get_resumable_uploads)],
+) -> Response:
+    state = await uploads.get(upload_id, user.id)
+    return Response(headers=_tus_headers(state))
+
+
+@router.patch(
+    path='/me/picture/resumable/{upload_id}',
+    status_code=status.HTTP_204_NO_CONTENT,
+    summary='Append a chunk to a resumable upload; the last one sets the profile picture',
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {"application/offset+octet-stream": {"schema": {"type": "string", "format": "binary"}}},
+        },
+    },
+)
+async def append_chunk(
+    upload_id: str,
+    request: Request,
+    upload_offset: Annotated[int, Header(ge=0)],
+    user: Annotated[User, Depends(auth_user)],
+    uploads: Annotated[ResumableUploads, Depends(get_resumable_uploads)],
+    svc: Annotated[UserService, Depends(get_user_service)],
+) -> Response:
+    if request.headers.get("content-type") != "application/offset+octet-stream":
+        raise HTTPException(
+            status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            detail="Expected application/offset+octet-stream",
+        )
+
+    state = await uploads.get(upload_id, user.id)
+    try:
+        state = await uploads.append(state, upload_offset, request.stream())
+    except HTTPException as exc:
+        if exc.status_code == status.HTTP_415_UNSUPPORTED_MEDIA_TYPE:
+            await uploads.discard(upload_id)
+        raise
+
+    if state.complete:
+        try:
+            await svc.add_picture(uploads.read(upload_id), user)
+        finally:
+            await uploads.discard(upload_id)
+
+    return Response(status_code=status.HTTP_204_NO_CONTENT, headers=_tus_headers(state))
+
+
+@router.delete(
+    path='/me/picture/resumable/{upload_id}',
+    status_code=status.HTTP_204_NO_CONTENT,
+    summary='Abandon a resumable upload',
+)
+async def delete_upload(
+    upload_id: str,
+    user: Annotated[User, Depends(auth_user)],
+    uploads: Annotated[ResumableUploads, Depends(get_resumable_uploads)],
+) -> Response:
+    await uploads.get(upload_id, user.id)
+    await uploads.discard(upload_id)
+    return Response(status_code=status.HTTP_204_NO_CONTENT, headers={"Tus-Resumable": TUS_VERSION})
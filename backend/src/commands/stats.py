@@ -0,0 +1,78 @@
+"""
+Maintenance commands for statistics rollups.
+
+Usage (from backend/src):
+    python -m commands.stats backfill [--since YYYY-MM-DD] [--until YYYY-MM-DD]
+    python -m commands.stats check [--since YYYY-MM-DD] [--until YYYY-MM-DD] [--fix]
+"""
+import argparse
+import asyncio
+import logging
+import sys
+from datetime import date, timedelta
+
+from core.config import configure_logging
+from database.relational_db import UserDailyStatsInterface, uow_scope
+from database.relational_db.session import engine
+
+logger = logging.getLogger(__name__)
+
+
+async def backfill(since: date | None, until: date | None) -> int:
+    async with uow_scope() as uow:
+        written = await UserDailyStatsInterface(uow.session).rebuild(since, until)
+
+    logger.info("Rebuilt user_daily_stats: %d days written", written)
+    return 0
+
+
+async def check(since: date | None, until: date | None, fix: bool) -> int:
+    async with uow_scope() as uow:
+        repo = UserDailyStatsInterface(uow.session)
+        mismatches = await repo.find_mismatches(since, until)
+
+        for row in mismatches:
+            logger.warning(
+                "%s: rollup has %d registrations, users table has %d",
+                row['day'], row['actual'], row['expected'],
+            )
+
+        if mismatches and fix:
+            for row in mismatches:
+                await repo.rebuild(row['day'], row['day'] + timedelta(days=1))
+            logger.info("Re-aggregated %d inconsistent days", len(mismatches))
+            return 0
+
+    if not mismatches:
+        logger.info("user_daily_stats is consistent with users")
+        return 0
+    return 1
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(prog="commands.stats")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    for name in ("backfill", "check"):
+        cmd = sub.add_parser(name)
+        cmd.add_argument("--since", type=date.fromisoformat, default=None, help="First UTC day, inclusive")
+        cmd.add_argument("--until", type=date.fromisoformat, default=None, help="Last UTC day, exclusive")
+        if name == "check":
+            cmd.add_argument("--fix", action="store_true", help="Re-aggregate mismatching days")
+
+    args = parser.parse_args()
+    configure_logging()
+
+    async def run() -> int:
+        try:
+            if args.command == "backfill":
+                return await backfill(args.since, args.until)
+            return await check(args.since, args.until, args.fix)
+        finally:
+            await engine.dispose()
+
+    return asyncio.run(run())
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,53 @@
+"""
+Turns row-change notifications from Postgres into cache invalidations.
+
+Triggers on `users`, `roles` and `user_roles` (see the
+`cache_invalidation_triggers` migration) send compact JSON payloads on the
+`cache_invalidation` channel, so changes made outside the API (SQL consoles,
+migrations, other services) reach the caches too:
+
+    {"t": "u",  "id": <user id>, "av": <auth version before the change>}
+    {"t": "ur", "id": <user id>, "av": <current auth version>}
+    {"t": "r",  "id": <role id>}
+
+Every worker listens and drops its own L1 entries; Redis deletes are
+idempotent, so it doesn't matter that each worker repeats them.
+"""
+import logging
+from typing import Any
+
+from core.rbac import ROLES_CACHE_PATTERN, roles_cache_key, roles_local_cache
+from database.redis import CacheRepo, get_redis
+from database.relational_db import PgListener
+
+CHANNEL = "cache_invalidation"
+
+logger = logging.getLogger(__name__)
+
+
+async def apply_db_change(payload: dict[str, Any]) -> None:
+    cache_repo = CacheRepo(get_redis())
+    kind = payload.get("t")
+
+    if kind in ("u", "ur"):
+        if payload.get("av") is None:
+            return
+        key = roles_cache_key(payload["id"], payload["av"])
+        roles_local_cache.drop(key)
+        await cache_repo.delete(key)
+    elif kind == "r":
+        # A renamed or deleted role can be in anybody's cached slugs
+        roles_local_cache.clear()
+        await cache_repo.delete_pattern(ROLES_CACHE_PATTERN)
+    else:
+        logger.warning("Unknown cache invalidation payload: %s", payload)
+
+
+async def resync() -> None:
+    """Notifications were missed while disconnected: drop everything they could cover."""
+    roles_local_cache.clear()
+    await CacheRepo(get_redis()).delete_pattern(ROLES_CACHE_PATTERN)
+
+
+def get_db_invalidation_listener() -> PgListener:
+    return PgListener(CHANNEL, apply_db_change, on_reconnect=resync)
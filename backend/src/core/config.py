@@ -30,6 +30,24 @@ class Settings(BaseSettings):
     # Media settings
     MEDIA_DIR: str = 'media'
     MAX_PHOTO_SIZE: int = 5  # in MB
+    MAX_PICTURE_PIXELS: int = 40_000_000  # decoded size limit, against decompression bombs
+    PICTURE_WORKERS: int = 2  # processes resizing profile pictures
+    MEDIA_GC_GRACE: int = 60 * 5  # in seconds, how long unreferenced new files are kept
+    MEDIA_UPLOAD_URL_TTL: int = 60 * 10  # in seconds, lifetime of presigned upload forms
+    UPLOAD_STAGING_DIR: str = 'staging'  # resumable uploads in progress; shared between replicas
+    RESUMABLE_UPLOAD_TTL: int = 60 * 60 * 24  # in seconds since the last chunk
+    # Behind nginx: let it send media files (see nginx.conf), the app only checks the path
+    MEDIA_ACCEL_REDIRECT: bool = False
+    MEDIA_ACCEL_PREFIX: str = '/internal-media'
+    
+    # Media storage backend; "s3" works with any S3-compatible service (MinIO locally)
+    MEDIA_STORAGE: Literal["local", "s3"] = "local"
+    S3_BUCKET: str = ''
+    S3_PUBLIC_URL: str = ''  # base URL objects are served from (CDN or bucket endpoint)
+    S3_ENDPOINT_URL: str | None = None
+    S3_REGION: str | None = None
+    S3_ACCESS_KEY_ID: str | None = None
+    S3_SECRET_ACCESS_KEY: str | None = None
     
     # Auth Settings    
     JWT_PRIVATE_KEY: str | None = None
@@ -47,13 +65,84 @@ class Settings(BaseSettings):
     COOKIE_DOMAIN: str | None = None
     COOKIE_PATH: str = "/"
 
+    # API's Prometheus endpoint, on its own port so it is never public; 0 disables
+    METRICS_PORT: int = 9100
+
+    # Per-route SQL statement budgets (core.query_budget): "log" warns, "raise" fails the request
+    QUERY_BUDGET_ACTION: Literal["off", "log", "raise"] = "log"
+
     # CORS settings (optional, use only if you call backend directly)
     CORS_ALLOW_ORIGINS: str = ""
     CORS_ALLOW_ORIGIN_REGEX: str = ""
     
+    # Rate limiting: how often approximate-mode limiters sync with Redis, in seconds
+    RATE_LIMIT_SYNC_INTERVAL: float = 1.0
+    # Header the edge proxy sets to the client's address, trusted over the connection's (Fly-Client-IP on Fly).
+    # Only set it where clients can't reach the app without that proxy overwriting the header
+    CLIENT_IP_HEADER: str = ""
+    
+    # Stats cache (stale-while-revalidate), in seconds
+    STATS_CACHE_FRESH_TTL: int = 60
+    STATS_CACHE_STALE_TTL: int = 60 * 10
+    
+    # Interaction events, buffered per worker and written with COPY
+    INTERACTIONS_BATCH_SIZE: int = 5_000  # rows per COPY; a full batch is flushed right away
+    INTERACTIONS_FLUSH_INTERVAL: float = 1.0  # in seconds between flushes otherwise
+    INTERACTIONS_MAX_BUFFER: int = 100_000  # rows held while the database is unavailable, the rest are dropped
+    INTERACTIONS_RETENTION_DAYS: int = 90  # daily partitions older than this are dropped
+    
+    # Daily active users, counted in Redis HyperLogLogs from authenticated requests
+    ACTIVE_USERS_DEDUPE_SECONDS: float = 60 * 5  # a user is sent to Redis once per this, per worker
+    ACTIVE_USERS_TTL_DAYS: int = 400  # daily counters kept this long
+    
+    # users.last_seen_at, buffered per worker and written in batches
+    LAST_SEEN_FLUSH_INTERVAL: float = 30  # in seconds
+    LAST_SEEN_RESOLUTION: float = 60  # in seconds; requests closer than this to the stored value aren't recorded
+    
+    # Background tasks (Redis stream consumed by `python -m tasks.worker`)
+    TASKS_STREAM: str = 'tasks'
+    TASKS_GROUP: str = 'workers'
+    TASKS_CONCURRENCY: int = 8
+    TASKS_MAX_LEN: int = 100_000  # approximate cap on the stream and dead-letter stream
+    TASKS_DEFAULT_TIMEOUT: float = 60 * 5  # in seconds, per run
+    TASKS_VISIBILITY_TIMEOUT: int = 60 * 10  # in seconds before a dead worker's task is rerun
+    TASKS_SHUTDOWN_GRACE: float = 30  # in seconds running tasks get to finish on shutdown
+    TASKS_METRICS_PORT: int = 9101  # worker's Prometheus endpoint, 0 disables
+
+    # Scheduler, run by whichever API process holds the Redis leader lease
+    SCHEDULER_ENABLED: bool = True
+    SCHEDULER_LEASE_TTL: float = 15  # in seconds; a dead leader is replaced within this
+
+    # Transactional outbox, published by `python -m outbox.relay`
+    OUTBOX_BATCH_SIZE: int = 500
+    OUTBOX_POLL_INTERVAL: float = 1.0  # in seconds; commits wake the relay sooner through NOTIFY
+    OUTBOX_NOTIFY: bool = True  # NOTIFY on commit; off leaves the relay to polling and spares commits NOTIFY's global lock
+    OUTBOX_MAX_ATTEMPTS: int = 10
+    OUTBOX_STREAM: str = 'events'  # Redis stream every published event is added to
+    OUTBOX_STREAM_MAX_LEN: int = 100_000
+    OUTBOX_METRICS_PORT: int = 9102  # relay's Prometheus endpoint, 0 disables
+
+    # Outgoing webhooks
+    WEBHOOK_TIMEOUT: float = 10  # in seconds, per delivery request
+    WEBHOOK_BATCH_SIZE: int = 100  # events per request
+    WEBHOOK_BATCH_WINDOW: float = 0.5  # in seconds events are gathered before sending
+    WEBHOOK_MAX_ATTEMPTS: int = 8
+    WEBHOOK_RETRY_BACKOFF: float = 10  # in seconds before the first retry, doubled on each following one
+    WEBHOOK_MAX_CONNECTIONS: int = 100  # across all endpoints, per worker
+
     # Database settings
     DATABASE_URL: str
     REDIS_URL: str
+    # Default Postgres statement_timeout for every connection, in ms (0 disables)
+    DB_STATEMENT_TIMEOUT_MS: int = 10_000
+    # Coalesce Redis commands issued in the same event-loop tick into one pipeline
+    REDIS_AUTOBATCH: bool = True
+    # Redis timeouts, in seconds; a stalled Redis must not stall requests
+    REDIS_SOCKET_TIMEOUT: float = 0.5
+    REDIS_CONNECT_TIMEOUT: float = 0.5
+    # Circuit breaker: consecutive failures before opening, seconds before a probe
+    REDIS_BREAKER_FAILURE_THRESHOLD: int = 5
+    REDIS_BREAKER_RESET_TIMEOUT: float = 5.0
 
     @field_validator("COOKIE_SAMESITE", mode="before")
     @classmethod
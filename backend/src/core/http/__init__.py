@@ -1 +1,2 @@
 from .cookies import clear_auth_cookies, set_auth_cookies
+from .multipart import stream_file_field
@@ -0,0 +1,73 @@
+from typing import AsyncIterator
+
+from fastapi import HTTPException, Request, status
+from python_multipart.multipart import MultipartParser, parse_options_header
+
+
+async def stream_file_field(request: Request, field: str = "file") -> AsyncIterator[bytes]:
+    """
+    Yields the bytes of one file field of a multipart/form-data body as they
+    arrive, without spooling the body anywhere. Parsing stops at the end of
+    that field; a missing field is a 422 and a malformed body a 400.
+    """
+    content_type, options = parse_options_header(request.headers.get("content-type", ""))
+    boundary = options.get(b"boundary")
+    if content_type != b"multipart/form-data" or not boundary:
+        raise HTTPException(status.HTTP_415_UNSUPPORTED_MEDIA_TYPE, detail="Expected multipart/form-data")
+
+    chunks: list[bytes] = []
+    state = {"header": b"", "value": b"", "in_field": False, "found": False, "done": False}
+
+    def on_part_begin() -> None:
+        state["in_field"] = False
+
+    def on_header_field(data: bytes, start: int, end: int) -> None:
+        state["header"] += data[start:end]
+
+    def on_header_value(data: bytes, start: int, end: int) -> None:
+        state["value"] += data[start:end]
+
+    def on_header_end() -> None:
+        if state["header"].lower() == b"content-disposition":
+            _, params = parse_options_header(state["value"])
+            if params.get(b"name") == field.encode() and b"filename" in params:
+                state["in_field"] = state["found"] = True
+        state["header"] = state["value"] = b""
+
+    def on_part_data(data: bytes, start: int, end: int) -> None:
+        if state["in_field"]:
+            chunks.append(data[start:end])
+
+    def on_part_end() -> None:
+        if state["in_field"]:
+            state["done"] = True
+            state["in_field"] = False
+
+    parser = MultipartParser(boundary, callbacks={
+        "on_part_begin": on_part_begin,
+        "on_header_field": on_header_field,
+        "on_header_value": on_header_value,
+        "on_header_end": on_header_end,
+        "on_part_data": on_part_data,
+        "on_part_end": on_part_end,
+    })
+
+    async for body in request.stream():
+        # MultipartParseError is a ValueError, as are header parsing errors in the callbacks
+        try:
+            parser.write(body)
+        except ValueError:
+            raise HTTPException(status.HTTP_400_BAD_REQUEST, detail="Malformed multipart body")
+        if chunks:
+            for chunk in chunks:
+                yield chunk
+            chunks.clear()
+        if state["done"]:
+            return
+
+    try:
+        parser.finalize()
+    except ValueError:
+        raise HTTPException(status.HTTP_400_BAD_REQUEST, detail="Malformed multipart body")
+    if not state["found"]:
+        raise HTTPException(status.HTTP_422_UNPROCESSABLE_ENTITY, detail=f"Missing file field '{field}'")
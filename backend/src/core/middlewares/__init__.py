@@ -0,0 +1,2 @@
+from .admission import AdmissionControlMiddleware, RouteClass
+from .metrics import MetricsMiddleware
@@ -0,0 +1,150 @@
+import json
+import time
+from dataclasses import dataclass, field
+
+from prometheus_client import Counter, Gauge
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from database.relational_db.session import statement_timeout
+
+ADMISSION_IN_FLIGHT = Gauge(
+    "admission_in_flight_requests",
+    "Requests currently admitted, by route class",
+    ["route_class"],
+)
+ADMISSION_LIMIT = Gauge(
+    "admission_concurrency_limit",
+    "Current adaptive concurrency limit, by route class",
+    ["route_class"],
+)
+ADMISSION_REJECTED = Counter(
+    "admission_rejected_total",
+    "Requests shed with 503, by route class",
+    ["route_class"],
+)
+
+
+@dataclass
+class RouteClass:
+    """
+    A group of routes sharing one adaptive concurrency limit and one
+    Postgres `statement_timeout`.
+
+    The limit grows by ~1 for every `limit` requests answered under
+    `target_latency` and shrinks by `backoff` (at most once per
+    `decrease_interval`) when they are slower, AIMD-style. Latency runs to
+    the start of the response, so streaming a body to a slow client doesn't
+    count. Non-`adaptive` classes keep `initial_limit`: for uploads, whose
+    latency follows the client's bandwidth rather than server load.
+    """
+    name: str
+    prefixes: tuple[str, ...] = ()
+    initial_limit: int = 64
+    min_limit: int = 1
+    max_limit: int = 256
+    target_latency: float = 0.5
+    statement_timeout_ms: int | None = None
+    backoff: float = 0.9
+    decrease_interval: float = 0.1
+    adaptive: bool = True
+
+    limit: float = field(init=False)
+    in_flight: int = field(init=False, default=0)
+    _last_decrease: float = field(init=False, default=0.0)
+
+    def __post_init__(self):
+        self.limit = float(self.initial_limit)
+        ADMISSION_LIMIT.labels(self.name).set(self.limit)
+
+    def matches(self, path: str) -> bool:
+        return any(path.startswith(prefix) for prefix in self.prefixes)
+
+    def try_acquire(self) -> bool:
+        if self.in_flight >= int(self.limit):
+            return False
+        self.in_flight += 1
+        ADMISSION_IN_FLIGHT.labels(self.name).set(self.in_flight)
+        return True
+
+    def release(self, latency: float) -> None:
+        self.in_flight -= 1
+        ADMISSION_IN_FLIGHT.labels(self.name).set(self.in_flight)
+        if not self.adaptive:
+            return
+
+        if latency <= self.target_latency:
+            self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+        else:
+            now = time.monotonic()
+            if now - self._last_decrease >= self.decrease_interval:
+                self.limit = max(self.min_limit, self.limit * self.backoff)
+                self._last_decrease = now
+        ADMISSION_LIMIT.labels(self.name).set(self.limit)
+
+
+class AdmissionControlMiddleware:
+    """
+    Pure ASGI middleware limiting in-flight HTTP requests per route class.
+
+    Requests over the limit are rejected immediately with 503 and
+    `Retry-After` instead of queueing inside the server, so a spike on one
+    class of routes can't drive up latency for the others. Admitted
+    requests run with their class's Postgres `statement_timeout`.
+    """
+    def __init__(
+        self,
+        app: ASGIApp,
+        route_classes: list[RouteClass],
+        default: RouteClass,
+        retry_after: int = 1,
+    ):
+        self.app = app
+        self.route_classes = route_classes
+        self.default = default
+        self.retry_after = retry_after
+
+    def classify(self, path: str) -> RouteClass:
+        for route_class in self.route_classes:
+            if route_class.matches(path):
+                return route_class
+        return self.default
+
+    async def _reject(self, send: Send) -> None:
+        body = json.dumps({"detail": "Server is busy, retry later"}).encode()
+        await send({
+            "type": "http.response.start",
+            "status": 503,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                (b"retry-after", str(self.retry_after).encode()),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        route_class = self.classify(scope["path"])
+        if not route_class.try_acquire():
+            ADMISSION_REJECTED.labels(route_class.name).inc()
+            await self._reject(send)
+            return
+
+        token = statement_timeout.set(route_class.statement_timeout_ms)
+        started = time.perf_counter()
+        answered: float | None = None
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal answered
+            if message["type"] == "http.response.start":
+                answered = time.perf_counter()
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            statement_timeout.reset(token)
+            route_class.release((answered or time.perf_counter()) - started)
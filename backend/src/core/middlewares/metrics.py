@@ -0,0 +1,120 @@
+import logging
+import time
+
+from prometheus_client import Counter, Gauge, Histogram
+from starlette.routing import Match
+from starlette.datastructures import MutableHeaders
+from starlette.types import Message, Receive, Scope, Send
+
+from database.relational_db.instrumentation import DbStats, db_stats
+
+logger = logging.getLogger(__name__)
+
+UNMATCHED = "unmatched"
+# Clients pick the method token freely; anything else shares one label
+METHODS = frozenset({"GET", "HEAD", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"})
+OTHER_METHOD = "other"
+
+HTTP_REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by route template, method and status",
+    ["route", "method", "status"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30),
+)
+HTTP_IN_FLIGHT = Gauge(
+    "http_requests_in_flight",
+    "Requests being served, by route template and method",
+    ["route", "method"],
+)
+HTTP_DB_STATEMENTS = Histogram(
+    "http_request_db_statements",
+    "SQL statements run per request, by route template",
+    ["route"],
+    buckets=(0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 100),
+)
+HTTP_DB_DURATION = Histogram(
+    "http_request_db_seconds",
+    "Time spent in SQL statements per request, by route template",
+    ["route"],
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5),
+)
+HTTP_QUERY_BUDGET_EXCEEDED = Counter(
+    "http_query_budget_exceeded_total",
+    "Requests that ran more SQL statements than their route's query budget",
+    ["route"],
+)
+
+
+class MetricsMiddleware:
+    """
+    Pure ASGI middleware exporting per-route request metrics.
+
+    Routes are labelled by their template (`/api/v1/admins/users/{user_id}`),
+    never the raw path, so label cardinality stays bounded; requests no route
+    matches share one label. Add it last so it is outermost and also sees
+    requests shed by admission control.
+
+    It also owns the request's `DbStats`: requests over their route's query
+    budget are logged here, and with `server_timing` the statement count and
+    database time are sent in a `Server-Timing` header for browser devtools.
+    """
+    def __init__(self, app, skip_paths: tuple[str, ...] = (), server_timing: bool = False):
+        self.app = app
+        self.skip_paths = skip_paths
+        self.server_timing = server_timing
+
+    @staticmethod
+    def route_template(scope: Scope) -> str:
+        app = scope.get("app")
+        router = getattr(app, "router", None)
+        partial = UNMATCHED
+        for route in getattr(router, "routes", ()):
+            match, _ = route.matches(scope)
+            if match == Match.FULL:
+                return route.path
+            if match == Match.PARTIAL and partial == UNMATCHED:
+                # Path matches but the method doesn't: answered with 405
+                partial = route.path
+        return partial
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["path"].startswith(self.skip_paths):
+            await self.app(scope, receive, send)
+            return
+
+        route = self.route_template(scope)
+        method = scope["method"] if scope["method"] in METHODS else OTHER_METHOD
+        status = 500
+        started = time.perf_counter()
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                if self.server_timing:
+                    # Streamed bodies aren't included: the header goes out before them
+                    MutableHeaders(scope=message).append("Server-Timing", (
+                        f'db;dur={stats.seconds * 1000:.1f};desc="{stats.statements} queries", '
+                        f"app;dur={(time.perf_counter() - started) * 1000:.1f}"
+                    ))
+            await send(message)
+
+        # A block counting statements around in-process requests (utils.query_counter) gets ours too
+        parent = db_stats.get()
+        stats = DbStats()
+        token = db_stats.set(stats)
+        in_flight = HTTP_IN_FLIGHT.labels(route, method)
+        in_flight.inc()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            HTTP_REQUEST_DURATION.labels(route, method, str(status)).observe(time.perf_counter() - started)
+            in_flight.dec()
+            db_stats.reset(token)
+            HTTP_DB_STATEMENTS.labels(route).observe(stats.statements)
+            HTTP_DB_DURATION.labels(route).observe(stats.seconds)
+            if parent is not None:
+                parent.merge(stats)
+            if stats.over_budget and stats.budget_action != "off":
+                HTTP_QUERY_BUDGET_EXCEEDED.labels(route).inc()
+                logger.warning("%s %s over its query budget of %d: %s", method, route, stats.budget, stats.describe())
@@ -0,0 +1,35 @@
+"""
+Per-request SQL statement budgets.
+
+Every request's statements are counted by the engine instrumentation into a
+`DbStats` the metrics middleware sets. Routes declare how many statements
+they should need with the `query_budget` dependency; going over it usually
+means a lazy load in a loop (N+1) or a relationship loaded eagerly for no
+reason. What happens then is `QUERY_BUDGET_ACTION`:
+- `log`: the request completes; the middleware logs a warning naming the
+  most repeated statement and counts it in `http_query_budget_exceeded_total`.
+- `raise`: the statement past the budget raises `QueryBudgetExceeded`, so
+  the request fails with 500. Meant for dev and CI.
+- `off`: budgets are ignored.
+"""
+from core.config import Settings
+from database.relational_db.instrumentation import BudgetAction, db_stats
+
+config = Settings() # pyright: ignore[reportCallIssue]
+
+
+def query_budget(statements: int, *, action: BudgetAction | None = None):
+    """
+    Route dependency allowing `statements` SQL statements per request.
+    `action` overrides `QUERY_BUDGET_ACTION` for this route.
+    """
+    budget_action = action or config.QUERY_BUDGET_ACTION
+
+    async def dependency() -> None:
+        stats = db_stats.get()
+        if stats is None or budget_action == "off":
+            return
+        stats.budget = statements
+        stats.budget_action = budget_action
+
+    return dependency
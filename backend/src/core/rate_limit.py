@@ -0,0 +1,294 @@
+"""
+Built-in rate limiting.
+
+Limits are declared per route with the `rate_limit` dependency and counted per
+principal: the user id from a verified token when there is one, otherwise the
+client IP.
+
+Two modes:
+- `exact`: GCRA in a single Redis script call per request. Smooth like a
+  sliding window, and the state is one key per principal.
+- `approximate`: every worker keeps local counters and reconciles them with a
+  shared Redis fixed-window counter at most every `sync_interval` seconds,
+  in the background. Cheap enough for high-volume routes, at the cost of
+  letting a burst overshoot by roughly one sync interval per worker.
+
+When Redis is unavailable, exact limits are enforced per worker with the
+same GCRA in memory, and approximate limits keep counting locally until the
+next successful sync.
+
+Results are reported in `RateLimit-Limit`, `RateLimit-Remaining` and
+`RateLimit-Reset` headers, plus `Retry-After` on 429.
+"""
+import asyncio
+import logging
+import math
+import time
+from dataclasses import dataclass
+from typing import Callable, Literal
+
+from fastapi import HTTPException, Request, Response, status
+
+from core.config import Settings
+from core.security import decode_token
+from database.redis import REDIS_FAILURES, REDIS_FALLBACKS, get_redis, get_redis_breaker
+
+config = Settings() # pyright: ignore[reportCallIssue]
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = "rl"
+
+# KEYS[1] - bucket key; ARGV: emission interval (ms), burst (requests), cost
+# Returns {allowed, remaining, retry_after_ms, reset_after_ms}
+GCRA_LUA = """
+local emission = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local cost = tonumber(ARGV[3])
+
+local time = redis.call('TIME')
+local now = tonumber(time[1]) * 1000 + math.floor(tonumber(time[2]) / 1000)
+
+local tat = tonumber(redis.call('GET', KEYS[1]))
+if not tat or tat < now then
+    tat = now
+end
+
+local new_tat = tat + emission * cost
+local allow_at = new_tat - emission * burst
+local diff = now - allow_at
+
+if diff < 0 then
+    return {0, 0, math.ceil(-diff), math.ceil(tat - now)}
+end
+
+redis.call('SET', KEYS[1], new_tat, 'PX', math.ceil(new_tat - now))
+return {1, math.floor(diff / emission), 0, math.ceil(new_tat - now)}
+"""
+
+_gcra_script = None
+
+
+def _gcra():
+    global _gcra_script
+    if _gcra_script is None:
+        _gcra_script = get_redis().register_script(GCRA_LUA)
+    return _gcra_script
+
+
+@dataclass
+class Decision:
+    allowed: bool
+    limit: int
+    remaining: int
+    reset_after: float
+    retry_after: float = 0
+
+
+class LocalGCRA:
+    """In-memory GCRA, used per worker while Redis is unavailable."""
+    def __init__(self, max_keys: int = 100_000):
+        self.max_keys = max_keys
+        self._tats: dict[str, float] = {}
+
+    def hit(self, key: str, limit: int, period: float, cost: int) -> Decision:
+        now = time.monotonic() * 1000
+        if len(self._tats) >= self.max_keys:
+            self._tats = {k: tat for k, tat in self._tats.items() if tat > now}
+            if len(self._tats) >= self.max_keys:
+                self._tats.clear()
+
+        emission = period * 1000 / limit
+        tat = max(self._tats.get(key, now), now)
+        new_tat = tat + emission * cost
+        diff = now - (new_tat - emission * limit)
+        if diff < 0:
+            return Decision(False, limit, 0, (tat - now) / 1000, -diff / 1000)
+
+        self._tats[key] = new_tat
+        return Decision(True, limit, int(diff // emission), (new_tat - now) / 1000)
+
+
+local_gcra = LocalGCRA()
+
+
+async def _exact(key: str, limit: int, period: float, cost: int) -> Decision:
+    emission_ms = period * 1000 / limit
+    try:
+        allowed, remaining, retry_ms, reset_ms = await get_redis_breaker().call(
+            _gcra(), keys=[key], args=[emission_ms, limit, cost]
+        )
+    except REDIS_FAILURES:
+        REDIS_FALLBACKS.labels("rate_limit").inc()
+        return local_gcra.hit(key, limit, period, cost)
+    return Decision(
+        allowed=bool(allowed),
+        limit=limit,
+        remaining=int(remaining),
+        reset_after=int(reset_ms) / 1000,
+        retry_after=int(retry_ms) / 1000,
+    )
+
+
+@dataclass
+class _LocalWindow:
+    window: int
+    synced_total: int = 0   # Fleet-wide count as of the last sync
+    unsynced: int = 0       # Consumed here since the last sync
+    last_sync: float = 0
+    syncing: bool = False
+
+
+class ApproximateLimiter:
+    """Per-worker counters, reconciled with Redis in the background."""
+    def __init__(self, sync_interval: float, max_keys: int = 100_000):
+        self.sync_interval = sync_interval
+        self.max_keys = max_keys
+        self._windows: dict[str, _LocalWindow] = {}
+        self._tasks: set[asyncio.Task] = set()
+
+    async def _sync(self, key: str, state: _LocalWindow, period: float) -> None:
+        pending, state.unsynced = state.unsynced, 0
+        try:
+            redis_key = f"{key}:{state.window}"
+            async with get_redis().pipeline(transaction=False) as pipe:
+                pipe.incrby(redis_key, pending)
+                pipe.expire(redis_key, math.ceil(period) * 2)
+                total, _ = await get_redis_breaker().call(pipe.execute)
+            state.synced_total = int(total)
+        except Exception as exc:
+            # Keep the count locally and retry on the next sync
+            state.unsynced += pending
+            if isinstance(exc, REDIS_FAILURES):
+                REDIS_FALLBACKS.labels("rate_limit").inc()
+            else:
+                logger.warning("Rate limit sync failed for %s", key, exc_info=True)
+        finally:
+            state.last_sync = time.monotonic()
+            state.syncing = False
+
+    def _schedule_sync(self, key: str, state: _LocalWindow, period: float) -> None:
+        state.syncing = True
+        task = asyncio.create_task(self._sync(key, state, period))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    def _evict(self) -> None:
+        # Drop the least recently synced half; their counts are mostly in Redis already
+        by_age = sorted(self._windows.items(), key=lambda item: item[1].last_sync)
+        for key, _ in by_age[: len(by_age) // 2]:
+            del self._windows[key]
+
+    def hit(self, key: str, limit: int, period: float, cost: int) -> Decision:
+        now = time.time()
+        window = int(now // period)
+        reset_after = (window + 1) * period - now
+
+        state = self._windows.get(key)
+        if state is None or state.window != window:
+            if len(self._windows) >= self.max_keys:
+                self._evict()
+            state = self._windows[key] = _LocalWindow(window=window)
+
+        used = state.synced_total + state.unsynced
+        allowed = used + cost <= limit
+        if allowed:
+            state.unsynced += cost
+            used += cost
+
+        if (
+            state.unsynced
+            and not state.syncing
+            and time.monotonic() - state.last_sync >= self.sync_interval
+        ):
+            self._schedule_sync(key, state, period)
+
+        return Decision(
+            allowed=allowed,
+            limit=limit,
+            remaining=max(0, limit - used),
+            reset_after=reset_after,
+            retry_after=0 if allowed else reset_after,
+        )
+
+
+approximate_limiter = ApproximateLimiter(config.RATE_LIMIT_SYNC_INTERVAL)
+
+
+# Principals
+
+def client_ip(request: Request) -> str:
+    if config.CLIENT_IP_HEADER and (address := request.headers.get(config.CLIENT_IP_HEADER)):
+        return f"ip:{address}"
+    # Behind nginx this is X-Forwarded-For's address, as far as uvicorn trusts FORWARDED_ALLOW_IPS
+    return f"ip:{request.client.host if request.client else 'unknown'}"
+
+
+def _token_principal(request: Request, token: str | None, typ: str) -> str:
+    if token:
+        payload = decode_token(request, token)
+        if payload is not None and payload.get("typ") == typ:
+            return f"user:{payload['sub']}"
+    return client_ip(request)
+
+
+def access_principal(request: Request) -> str:
+    """User id from a verified access token, falling back to the client IP."""
+    auth = request.headers.get("Authorization")
+    token = auth.split(" ", 1)[1] if auth and auth.lower().startswith("bearer ") else None
+    return _token_principal(request, token, "access")
+
+
+def refresh_principal(request: Request) -> str:
+    """User id from a verified refresh token (cookie or Bearer), falling back to the client IP."""
+    token = request.cookies.get("refresh_token")
+    if not token:
+        auth = request.headers.get("Authorization")
+        if auth and auth.lower().startswith("bearer "):
+            token = auth.split(" ", 1)[1]
+    return _token_principal(request, token, "refresh")
+
+
+def _set_headers(headers, decision: Decision) -> None:
+    headers["RateLimit-Limit"] = str(decision.limit)
+    headers["RateLimit-Remaining"] = str(decision.remaining)
+    headers["RateLimit-Reset"] = str(math.ceil(decision.reset_after))
+
+
+def rate_limit(
+    times: int,
+    seconds: float,
+    *,
+    by: Callable[[Request], str] = access_principal,
+    scope: str | None = None,
+    mode: Literal["exact", "approximate"] = "exact",
+    cost: int = 1,
+):
+    """
+    Route dependency allowing `times` requests per `seconds` per principal.
+    `scope` names the limit; by default every route counts separately.
+    """
+    async def dependency(request: Request, response: Response) -> None:
+        if scope is not None:
+            name = scope
+        else:
+            route = request.scope.get("route")
+            name = f"{request.method}:{getattr(route, 'path', request.url.path)}"
+        key = f"{KEY_PREFIX}:{name}:{by(request)}"
+
+        if mode == "approximate":
+            decision = approximate_limiter.hit(key, times, seconds, cost)
+        else:
+            decision = await _exact(key, times, seconds, cost)
+
+        if not decision.allowed:
+            headers: dict[str, str] = {"Retry-After": str(math.ceil(decision.retry_after))}
+            _set_headers(headers, decision)
+            raise HTTPException(
+                status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Too Many Requests",
+                headers=headers,
+            )
+
+        _set_headers(response.headers, decision)
+
+    return dependency
@@ -1,7 +1,19 @@
 from uuid import UUID
 
+from database.redis import LocalCache, get_invalidation_bus
+
+# Row changes in users / roles / user_roles invalidate these keys right away
+# through Postgres NOTIFY (see core.cache_invalidation). The TTLs stay short:
+# a load that read the old roles can still store them after the NOTIFY, and
+# they then live until expiry
 PERMISSIONS_CACHE_TTL_SECONDS = 900 # 15 minutes
 ROLES_CACHE_TTL_SECONDS = 900 # 15 minutes
+ROLES_LOCAL_TTL_SECONDS = 60
+
+# Role slugs never change for a given auth version, so they are safe to keep in-process
+roles_local_cache = get_invalidation_bus().register(
+    LocalCache("auth:roles", maxsize=10_000, ttl=ROLES_LOCAL_TTL_SECONDS)
+)
 
 
 def permissions_cache_key(user_id: UUID | str, version: int) -> str:
@@ -9,6 +21,8 @@ def permissions_cache_key(user_id: UUID | str, version: int) -> str:
 
 def roles_cache_key(user_id: UUID | str, version: int) -> str:
     return f"auth:roles:{user_id}:v{version}"
+
+ROLES_CACHE_PATTERN = "auth:roles:*"
  
  
 GLOBAL_ROLE_IMPLICATIONS = {
@@ -1,55 +1,74 @@
+import asyncio
 import json
 from typing import Annotated, Literal
 
-import jwt
 from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 
 from core.rbac import (
     ROLES_CACHE_TTL_SECONDS, 
     roles_cache_key,
+    roles_local_cache,
     GLOBAL_ROLE_IMPLICATIONS,
     TEAM_ROLE_IMPLICATIONS,
 )
-from database.redis import CacheRepo, get_redis
+from core.config import Settings
+from database.redis import MISSING, REDIS_FAILURES, CacheRepo, get_redis
 from database.relational_db import User
 from domain.auth import SystemPermission, SystemRole
 from service.auth import TokenService, get_token_service
-from service.users import UserService, get_user_service
+from service.statistics import get_active_users_counter
+from service.users import UserService, get_last_seen_tracker, get_user_service
 # from service.organizations import OrganizationService, get_organization_service
 
+config = Settings() # pyright: ignore[reportCallIssue]
+
 security = HTTPBearer(
     description="Access token must be passed as Bearer to authorize request"
 )
 
 
-async def extract_jti(request: Request) -> str:
-    token = request.cookies.get("refresh_token")
-    if not token:
-        auth = request.headers.get("Authorization")
-        if auth and auth.lower().startswith("bearer "):
-            token = auth.split(" ", 1)[1]
-    if not token:
-        raise HTTPException(status.HTTP_401_UNAUTHORIZED, "Missing refresh token")
-    try:
-        payload = jwt.decode(
-            token, options={"verify_signature": False, "verify_exp": False}
-        )
-    except jwt.PyJWTError as exc:
-        raise HTTPException(
-            status.HTTP_401_UNAUTHORIZED, "Bad refresh token passed"
-        ) from exc
-    jti = payload.get("jti")
-    if not jti:
-        raise HTTPException(status.HTTP_401_UNAUTHORIZED, "Bad refresh token passed")
-    return jti
+def decode_token(request: Request, token: str) -> dict[str, int | str] | None:
+    """Verified JWT payload, decoded at most once per request and token."""
+    decoded = getattr(request.state, "decoded_tokens", None)
+    if decoded is None:
+        decoded = request.state.decoded_tokens = {}
+    if token not in decoded:
+        decoded[token] = TokenService.decode(token)
+    return decoded[token]
 
 async def parse_token(
+    request: Request,
     creds: Annotated[HTTPAuthorizationCredentials, Depends(security)],
     token_svc: Annotated[TokenService, Depends(get_token_service)],
 ) -> dict[str, int | str]:
-    payload = await token_svc.verify_access(creds.credentials)
-    if payload is None:
+    payload = decode_token(request, creds.credentials)
+    if payload is None or payload.get("typ") != "access":
+        raise HTTPException(status.HTTP_401_UNAUTHORIZED, "Bad access token passed")
+
+    # The roles key only depends on the token, so unless it is in L1, fetch it
+    # together with the denylist check; with autobatching both go out in a
+    # single round trip
+    roles_key = roles_cache_key(payload["sub"], payload.get("av", 0))
+    jti, expires_at = str(payload["jti"]), int(payload["exp"])
+    if roles_local_cache.get(roles_key) is not MISSING:
+        blocked = await token_svc.is_blocked(jti, expires_at)
+    else:
+        cache_repo = CacheRepo(get_redis(), autobatch=config.REDIS_AUTOBATCH)
+        blocked, cached_roles = await asyncio.gather(
+            token_svc.is_blocked(jti, expires_at),
+            cache_repo.get(roles_key),
+            return_exceptions=True,
+        )
+        if isinstance(blocked, BaseException):
+            raise blocked
+        if isinstance(cached_roles, REDIS_FAILURES):
+            # Roles are derived from the database in `require` instead
+            cached_roles = None
+        elif isinstance(cached_roles, BaseException):
+            raise cached_roles
+        request.state.cached_roles = cached_roles
+    if blocked:
         raise HTTPException(status.HTTP_401_UNAUTHORIZED, "Bad access token passed")
     
     return payload
@@ -68,21 +87,31 @@ async def auth_user(
             detail="Your account is banned, contact support: laughinmee@gmail.com",
         )
 
+    # Fire-and-forget: deduplicated locally and written to Redis in the background
+    get_active_users_counter().record(user.id)
+    get_last_seen_tracker().touch(user)
     return user
 
 
-async def load_cached_roles(user: User) -> list[str]:
-    cache_repo = CacheRepo(get_redis())
+async def load_cached_roles(user: User, prefetched: str | None = None) -> list[str]:
+    if prefetched is not None:
+        roles = CacheRepo.decode(prefetched)
+        roles_local_cache.set(roles_cache_key(user.id, user.auth_version), roles)
+        return roles
 
-    roles = await cache_repo.get(roles_cache_key(user.id, user.auth_version))
-    
-    if roles is not None:
-        return json.loads(roles)
-    
-    roles_slugs = user.role_slugs
-    await cache_repo.set(roles_cache_key(user.id, user.auth_version), json.dumps(roles_slugs), ttl=ROLES_CACHE_TTL_SECONDS)
+    cache_repo = CacheRepo(get_redis(), autobatch=config.REDIS_AUTOBATCH)
+
+    async def load() -> list[str]:
+        return user.role_slugs
 
-    return roles_slugs
+    # With Redis unavailable this serves the roles loaded with the user from the database
+    return await cache_repo.get_or_load(
+        roles_cache_key(user.id, user.auth_version),
+        load,
+        namespace="auth:roles",
+        ttl=ROLES_CACHE_TTL_SECONDS,
+        local=roles_local_cache,
+    )
 
 def verify_auth_version(token_version: int | str | None, user: User) -> None:
     if token_version is None or int(token_version) != int(user.auth_version):
@@ -124,7 +153,8 @@ def require(
         
         verify_auth_version(payload.get("av"), user)
         
-        global_roles = await load_cached_roles(user)
+        # Prefetched under the token's auth version, which was just checked to be current
+        global_roles = await load_cached_roles(user, getattr(request.state, "cached_roles", None))
         eff_roles = expand_roles(list(global_roles), GLOBAL_ROLE_IMPLICATIONS)
         
         if eff_roles & bypass_global:
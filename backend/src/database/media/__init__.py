@@ -0,0 +1,25 @@
+from core.config import Settings
+from .base import DirectUploadsUnsupported, MediaStorage, PresignedUpload, StoredObject
+from .local_storage import LocalStorage
+from .s3_storage import S3Storage
+
+config = Settings() # pyright: ignore[reportCallIssue]
+
+
+def _create_storage() -> MediaStorage:
+    if config.MEDIA_STORAGE == "s3":
+        return S3Storage(
+            config.S3_BUCKET,
+            config.S3_PUBLIC_URL,
+            endpoint_url=config.S3_ENDPOINT_URL,
+            region=config.S3_REGION,
+            access_key_id=config.S3_ACCESS_KEY_ID,
+            secret_access_key=config.S3_SECRET_ACCESS_KEY,
+        )
+    return LocalStorage(config.MEDIA_DIR, f"{config.SITE_URL}/{config.MEDIA_DIR}")
+
+
+media_storage = _create_storage()
+
+def get_media_storage() -> MediaStorage:
+    return media_storage
@@ -0,0 +1,45 @@
+from dataclasses import dataclass, field
+from typing import Protocol
+
+
+@dataclass(frozen=True)
+class StoredObject:
+    key: str
+    modified_at: float  # unix time
+    size: int | None = None
+
+
+@dataclass(frozen=True)
+class PresignedUpload:
+    """A form POST the client sends straight to storage: `fields` go before the file."""
+    url: str
+    fields: dict[str, str] = field(default_factory=dict)
+
+
+class DirectUploadsUnsupported(NotImplementedError):
+    """The backend can't take uploads that bypass the API."""
+
+
+class MediaStorage(Protocol):
+    """Where media bytes live. Keys are relative POSIX paths."""
+    def url(self, key: str) -> str: ...
+
+    def key_for(self, url: str) -> str | None: ...
+
+    async def exists(self, key: str) -> bool: ...
+
+    async def stat(self, key: str) -> StoredObject | None: ...
+
+    async def get(self, key: str) -> bytes: ...
+
+    async def put(self, key: str, data: bytes, content_type: str | None = None) -> None: ...
+
+    async def touch(self, *keys: str) -> list[str]: ...
+
+    async def delete(self, *keys: str) -> None: ...
+
+    async def list(self, prefix: str) -> list[StoredObject]: ...
+
+    async def presign_upload(self, key: str, max_size: int, expires_in: int) -> PresignedUpload: ...
+
+    async def close(self) -> None: ...
@@ -0,0 +1,97 @@
+import asyncio
+import os
+from pathlib import Path
+from uuid import uuid4
+
+import aiofiles
+import aiofiles.os
+
+from .base import DirectUploadsUnsupported, PresignedUpload, StoredObject
+
+
+class LocalStorage:
+    """
+    Media files under `root`, served from `base_url`. Keys are relative
+    POSIX paths. All filesystem calls run in threads, off the event loop.
+    """
+    def __init__(self, root: str | Path, base_url: str):
+        self.root = Path(root)
+        self.base_url = base_url.rstrip("/")
+
+    def path(self, key: str) -> Path:
+        path = (self.root / key).resolve()
+        if not path.is_relative_to(self.root.resolve()):
+            raise ValueError(f"Key escapes the media root: {key}")
+        return path
+
+    def url(self, key: str) -> str:
+        return f"{self.base_url}/{key}"
+
+    def key_for(self, url: str) -> str | None:
+        """Reverse of `url`, None for URLs this storage didn't produce."""
+        prefix = f"{self.base_url}/"
+        return url[len(prefix):] if url.startswith(prefix) else None
+
+    async def exists(self, key: str) -> bool:
+        return await aiofiles.os.path.isfile(self.path(key))
+
+    async def stat(self, key: str) -> StoredObject | None:
+        try:
+            result = await aiofiles.os.stat(self.path(key))
+        except FileNotFoundError:
+            return None
+        return StoredObject(key, result.st_mtime, result.st_size)
+
+    async def get(self, key: str) -> bytes:
+        async with aiofiles.open(self.path(key), "rb") as file:
+            return await file.read()
+
+    async def put(self, key: str, data: bytes, content_type: str | None = None) -> None:
+        """Writes to a temporary file next to the target and renames it into place."""
+        path = self.path(key)
+        await aiofiles.os.makedirs(path.parent, exist_ok=True)
+        tmp = path.with_name(f".{path.name}.{uuid4().hex}.tmp")
+        try:
+            async with aiofiles.open(tmp, "wb") as out:
+                await out.write(data)
+                await out.flush()
+                await asyncio.to_thread(os.fsync, out.fileno())
+            await aiofiles.os.replace(tmp, path)
+        except BaseException:
+            await asyncio.to_thread(tmp.unlink, missing_ok=True)
+            raise
+
+    async def touch(self, *keys: str) -> list[str]:
+        """Sets the modification time of `keys` to now. Returns the ones that don't exist."""
+        def run() -> list[str]:
+            missing = []
+            for key in keys:
+                try:
+                    os.utime(self.path(key))
+                except FileNotFoundError:
+                    missing.append(key)
+            return missing
+        return await asyncio.to_thread(run)
+
+    async def delete(self, *keys: str) -> None:
+        for key in keys:
+            await asyncio.to_thread(self.path(key).unlink, missing_ok=True)
+
+    async def list(self, prefix: str) -> list[StoredObject]:
+        """Objects directly under the `prefix` directory; temporary files are skipped."""
+        def scan() -> list[StoredObject]:
+            folder = self.path(prefix)
+            if not folder.is_dir():
+                return []
+            return [
+                StoredObject(f"{prefix.rstrip('/')}/{entry.name}", entry.stat().st_mtime, entry.stat().st_size)
+                for entry in os.scandir(folder)
+                if entry.is_file() and not entry.name.startswith(".")
+            ]
+        return await asyncio.to_thread(scan)
+
+    async def presign_upload(self, key: str, max_size: int, expires_in: int) -> PresignedUpload:
+        raise DirectUploadsUnsupported("Direct uploads need an object storage backend")
+
+    async def close(self) -> None:
+        pass
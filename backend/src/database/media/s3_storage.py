@@ -0,0 +1,151 @@
+import asyncio
+from contextlib import AsyncExitStack
+from typing import Any
+
+from .base import PresignedUpload, StoredObject
+
+CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+
+class S3Storage:
+    """
+    Media in an S3-compatible bucket (AWS S3, MinIO, ...), served from
+    `public_url`, e.g. a CDN or the bucket's own endpoint.
+
+    Objects are written once under content-addressed keys, so they are
+    stored with an immutable Cache-Control. aiobotocore is imported on first
+    use, so it is only needed when this backend is configured.
+    """
+    def __init__(
+        self,
+        bucket: str,
+        public_url: str,
+        *,
+        endpoint_url: str | None = None,
+        region: str | None = None,
+        access_key_id: str | None = None,
+        secret_access_key: str | None = None,
+    ):
+        self.bucket = bucket
+        self.public_url = public_url.rstrip("/")
+        self._client_kwargs = {
+            "endpoint_url": endpoint_url,
+            "region_name": region,
+            "aws_access_key_id": access_key_id,
+            "aws_secret_access_key": secret_access_key,
+        }
+        self._client: Any = None
+        self._stack: AsyncExitStack | None = None
+        self._lock = asyncio.Lock()
+
+    async def _get_client(self) -> Any:
+        if self._client is None:
+            async with self._lock:
+                if self._client is None:
+                    from aiobotocore.session import get_session
+
+                    stack = AsyncExitStack()
+                    self._client = await stack.enter_async_context(
+                        get_session().create_client("s3", **self._client_kwargs)
+                    )
+                    self._stack = stack
+        return self._client
+
+    def url(self, key: str) -> str:
+        return f"{self.public_url}/{key}"
+
+    def key_for(self, url: str) -> str | None:
+        prefix = f"{self.public_url}/"
+        return url[len(prefix):] if url.startswith(prefix) else None
+
+    async def stat(self, key: str) -> StoredObject | None:
+        from botocore.exceptions import ClientError
+
+        client = await self._get_client()
+        try:
+            head = await client.head_object(Bucket=self.bucket, Key=key)
+        except ClientError as exc:
+            if exc.response.get("Error", {}).get("Code") in ("404", "NoSuchKey", "NotFound"):
+                return None
+            raise
+        return StoredObject(key, head["LastModified"].timestamp(), head["ContentLength"])
+
+    async def exists(self, key: str) -> bool:
+        return await self.stat(key) is not None
+
+    async def get(self, key: str) -> bytes:
+        client = await self._get_client()
+        response = await client.get_object(Bucket=self.bucket, Key=key)
+        async with response["Body"] as body:
+            return await body.read()
+
+    async def put(self, key: str, data: bytes, content_type: str | None = None) -> None:
+        client = await self._get_client()
+        extra = {"ContentType": content_type} if content_type else {}
+        await client.put_object(
+            Bucket=self.bucket, Key=key, Body=data, CacheControl=CACHE_CONTROL, **extra
+        )
+
+    async def touch(self, *keys: str) -> list[str]:
+        """
+        Sets the modification time of `keys` to now by copying each object
+        onto itself. Returns the ones that don't exist.
+        """
+        from botocore.exceptions import ClientError
+
+        client = await self._get_client()
+        missing = []
+        for key in keys:
+            try:
+                head = await client.head_object(Bucket=self.bucket, Key=key)
+                # Copying onto itself is only allowed when replacing metadata, so keep what put() set
+                extra = {"ContentType": head["ContentType"]} if head.get("ContentType") else {}
+                await client.copy_object(
+                    Bucket=self.bucket,
+                    Key=key,
+                    CopySource={"Bucket": self.bucket, "Key": key},
+                    MetadataDirective="REPLACE",
+                    CacheControl=CACHE_CONTROL,
+                    **extra,
+                )
+            except ClientError as exc:
+                if exc.response.get("Error", {}).get("Code") not in ("404", "NoSuchKey", "NotFound"):
+                    raise
+                missing.append(key)
+        return missing
+
+    async def delete(self, *keys: str) -> None:
+        client = await self._get_client()
+        # DeleteObjects takes at most 1000 keys
+        for start in range(0, len(keys), 1000):
+            batch = keys[start:start + 1000]
+            await client.delete_objects(
+                Bucket=self.bucket,
+                Delete={"Objects": [{"Key": key} for key in batch], "Quiet": True},
+            )
+
+    async def list(self, prefix: str) -> list[StoredObject]:
+        client = await self._get_client()
+        paginator = client.get_paginator("list_objects_v2")
+        objects: list[StoredObject] = []
+        async for page in paginator.paginate(Bucket=self.bucket, Prefix=f"{prefix.rstrip('/')}/"):
+            for item in page.get("Contents", []):
+                objects.append(StoredObject(item["Key"], item["LastModified"].timestamp(), item["Size"]))
+        return objects
+
+    async def presign_upload(self, key: str, max_size: int, expires_in: int) -> PresignedUpload:
+        """A presigned POST; the size limit is enforced by storage, not by trusting the client."""
+        client = await self._get_client()
+        post = await client.generate_presigned_post(
+            Bucket=self.bucket,
+            Key=key,
+            Conditions=[["content-length-range", 1, max_size]],
+            ExpiresIn=expires_in,
+        )
+        return PresignedUpload(url=post["url"], fields=post["fields"])
+
+    async def close(self) -> None:
+        if self._stack is not None:
+            await self._stack.aclose()
+            self._stack = None
+            self._client = None
@@ -1,2 +1,7 @@
-from .redis_client import get_redis
-from .cache_interface import CacheRepo
+from .redis_client import get_redis, get_binary_redis
+from .codecs import Codec, JsonCodec, MsgpackCodec, JSON
+from .circuit_breaker import CircuitBreaker, CircuitOpenError, REDIS_FAILURES, REDIS_FALLBACKS, get_redis_breaker
+from .local_cache import LocalCache, MISSING
+from .invalidation import InvalidationBus, get_invalidation_bus
+from .cache_interface import CacheRepo, cached
+from .swr_cache import SWRCache
@@ -0,0 +1,76 @@
+import asyncio
+from typing import Any
+
+from redis.asyncio import Redis
+
+
+class AutoBatcher:
+    """
+    Coalesces commands issued in the same event-loop tick into one pipeline.
+
+    Every `submit` queues a command and returns a future; the queue is flushed
+    by a `call_soon` callback, so commands awaited together (e.g. via
+    `asyncio.gather`, or from concurrent requests) cost a single round trip.
+    """
+    def __init__(self, redis: Redis):
+        self.redis = redis
+        self._pending: list[tuple[str, tuple, dict, asyncio.Future]] = []
+        self._scheduled = False
+        self._tasks: set[asyncio.Task] = set()
+
+    def submit(self, command: str, *args, **kwargs) -> asyncio.Future:
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((command, args, kwargs, future))
+        if not self._scheduled:
+            self._scheduled = True
+            loop.call_soon(self._flush)
+        return future
+
+    def _flush(self) -> None:
+        batch, self._pending = self._pending, []
+        self._scheduled = False
+        task = asyncio.ensure_future(self._execute(batch))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    @staticmethod
+    def _resolve(future: asyncio.Future, result: Any) -> None:
+        if future.done():
+            return
+        if isinstance(result, BaseException):
+            future.set_exception(result)
+        else:
+            future.set_result(result)
+
+    async def _execute(self, batch: list[tuple[str, tuple, dict, asyncio.Future]]) -> None:
+        if len(batch) == 1:
+            command, args, kwargs, future = batch[0]
+            try:
+                result = await getattr(self.redis, command)(*args, **kwargs)
+            except Exception as exc:
+                result = exc
+            self._resolve(future, result)
+            return
+
+        try:
+            async with self.redis.pipeline(transaction=False) as pipe:
+                for command, args, kwargs, _ in batch:
+                    getattr(pipe, command)(*args, **kwargs)
+                results = await pipe.execute(raise_on_error=False)
+        except Exception as exc:
+            results = [exc] * len(batch)
+
+        for (*_, future), result in zip(batch, results):
+            self._resolve(future, result)
+
+
+_batchers: dict[int, AutoBatcher] = {}
+
+
+def get_batcher(redis: Redis) -> AutoBatcher:
+    """One batcher per client, shared by every CacheRepo in the worker."""
+    batcher = _batchers.get(id(redis))
+    if batcher is None or batcher.redis is not redis:
+        batcher = _batchers[id(redis)] = AutoBatcher(redis)
+    return batcher
@@ -1,21 +1,310 @@
+import asyncio
+import logging
+import random
+import time
+from functools import wraps
+from typing import Any, Awaitable, Callable, Mapping
+
+from prometheus_client import Counter, Histogram
 from redis.asyncio import Redis
+from redis.asyncio.client import Pipeline
+from redis.exceptions import LockError
+
+from .batching import get_batcher
+from .circuit_breaker import REDIS_FAILURES, REDIS_FALLBACKS, get_redis_breaker
+from .codecs import JSON, Codec
+from .invalidation import get_invalidation_bus
+from .local_cache import MISSING, LocalCache
+from .redis_client import get_binary_redis, get_redis
+
+logger = logging.getLogger(__name__)
+
+CACHE_REQUESTS = Counter(
+    "cache_requests_total",
+    "Cache-aside lookups by namespace and result (l1_hit, l2_hit, negative_hit, miss)",
+    ["namespace", "result"],
+)
+CACHE_LOOKUP_SECONDS = Histogram(
+    "cache_lookup_seconds",
+    "Time to serve a cache-aside lookup, including the loader on a miss",
+    ["namespace"],
+)
+CACHE_LOAD_SECONDS = Histogram(
+    "cache_load_seconds",
+    "Time spent in the loader after a miss",
+    ["namespace"],
+)
+
+# Stored in place of a value when the loader returned None
+NONE_MARKER = b"\x00none"
+
+# Per-worker single-flight: one in-flight load per key
+_inflight: dict[str, asyncio.Future] = {}
 
 
 class CacheRepo():
-    def __init__(self, redis: Redis):
+    def __init__(self, redis: Redis, binary: Redis | None = None, autobatch: bool = False):
         self.redis = redis
-        
+        self.binary = binary
+        self.autobatch = autobatch
+
+    async def _call(self, client: Redis, command: str, *args, **kwargs) -> Any:
+        """
+        Runs a command directly, or queues it on the client's auto-batcher,
+        through the Redis circuit breaker.
+        """
+        if self.autobatch:
+            return await get_redis_breaker().call(get_batcher(client).submit, command, *args, **kwargs)
+        return await get_redis_breaker().call(getattr(client, command), *args, **kwargs)
+
     async def set(self, name: str, value: str, ttl: int | None = None) -> None:
-        await self.redis.set(name, value, ex=ttl)
-        
+        await self._call(self.redis, "set", name, value, ex=ttl)
+
     async def get(self, name: str) -> str | None:
-        return await self.redis.get(name)
-    
+        return await self._call(self.redis, "get", name)
+
     async def delete(self, *names: str) -> None:
-        await self.redis.delete(*names)
-        
+        await self._call(self.redis, "delete", *names)
+
     async def update(self, name: str, ttl: int) -> None:
-        await self.redis.expire(name, ttl)
-        
+        await self._call(self.redis, "expire", name, ttl)
+
     async def exists(self, *names) -> int:
-        return await self.redis.exists(*names)
+        return await self._call(self.redis, "exists", *names)
+
+    async def mget(self, *names: str) -> list[str | None]:
+        if not names:
+            return []
+        return await self._call(self.redis, "mget", names)
+
+    async def mset(self, mapping: Mapping[str, str], ttl: int | None = None) -> None:
+        """Sets several keys in one round trip. MSET can't expire keys, so a TTL uses a pipeline."""
+        if not mapping:
+            return
+        if ttl is None:
+            await self._call(self.redis, "mset", mapping)
+            return
+        async with self.pipeline() as pipe:
+            for name, value in mapping.items():
+                pipe.set(name, value, ex=ttl)
+            await pipe.execute()
+
+    async def delete_pattern(self, pattern: str, batch: int = 500) -> int:
+        """Unlinks keys matching `pattern` with SCAN, for rare bulk invalidations."""
+        deleted = 0
+        names: list[str] = []
+        async for name in self.redis.scan_iter(match=pattern, count=batch):
+            names.append(name)
+            if len(names) >= batch:
+                deleted += await self.redis.unlink(*names)
+                names.clear()
+        if names:
+            deleted += await self.redis.unlink(*names)
+        return deleted
+
+    async def invalidate(self, *names: str, prefixes: tuple[str, ...] = ()) -> None:
+        """Deletes keys from Redis and from every worker's L1 caches."""
+        if names:
+            try:
+                await self._call(self.redis, "delete", *names)
+            except REDIS_FAILURES:
+                logger.warning("Failed to delete %s, Redis is unavailable", ", ".join(names))
+        await get_invalidation_bus().publish(names, prefixes)
+
+    def pipeline(self, transaction: bool = False) -> Pipeline:
+        """
+        Explicit pipeline, for callers that know their commands up front:
+
+            async with cache_repo.pipeline() as pipe:
+                pipe.get(a).exists(b)
+                value, present = await pipe.execute()
+        """
+        return self.redis.pipeline(transaction=transaction)
+
+    def _client(self, codec: Codec) -> Redis:
+        if not codec.binary:
+            return self.redis
+        if self.binary is None:
+            self.binary = get_binary_redis()
+        return self.binary
+
+    @staticmethod
+    def decode(raw: str | bytes, codec: Codec = JSON) -> Any:
+        """Decodes a raw value written by `get_or_load`."""
+        if raw == NONE_MARKER or raw == NONE_MARKER.decode():
+            return None
+        return codec.loads(raw)
+
+    @staticmethod
+    def _jittered(ttl: int, jitter: float) -> int:
+        return max(1, round(ttl * random.uniform(1 - jitter, 1 + jitter)))
+
+    async def get_or_load(
+        self,
+        name: str,
+        loader: Callable[[], Awaitable[Any]],
+        *,
+        namespace: str,
+        ttl: int,
+        codec: Codec = JSON,
+        jitter: float = 0.1,
+        negative_ttl: int | None = None,
+        lock_ttl: float | None = 5.0,
+        local: LocalCache | None = None,
+    ) -> Any:
+        """
+        Cache-aside read of `name`, calling `loader` on a miss.
+
+        Concurrent misses for the same key share one load within the worker,
+        and with `lock_ttl` set, a short Redis lock makes other workers wait
+        for that load instead of repeating it. TTLs are spread by `jitter`
+        so keys written together don't expire together. A `None` result is
+        cached only when `negative_ttl` is given. With `local`, values are
+        also kept in that in-process cache in front of Redis.
+
+        When Redis is unavailable the loader is called directly and nothing
+        is cached, so reads degrade to the source of truth instead of failing.
+        """
+        started = time.perf_counter()
+        client = self._client(codec)
+        try:
+            if local is not None:
+                value = local.get(name)
+                if value is not MISSING:
+                    CACHE_REQUESTS.labels(namespace, "negative_hit" if value is None else "l1_hit").inc()
+                    return value
+
+            try:
+                raw = await self._call(client, "get", name)
+            except REDIS_FAILURES:
+                REDIS_FALLBACKS.labels(f"cache:{namespace}").inc()
+                return await loader()
+            if raw is not None:
+                value = self.decode(raw, codec)
+                CACHE_REQUESTS.labels(namespace, "negative_hit" if value is None else "l2_hit").inc()
+                if local is not None:
+                    local.set(name, value)
+                return value
+
+            CACHE_REQUESTS.labels(namespace, "miss").inc()
+            flight = _inflight.get(name)
+            if flight is None:
+                flight = asyncio.ensure_future(self._fill(
+                    client, name, loader,
+                    namespace=namespace, ttl=ttl, codec=codec, jitter=jitter,
+                    negative_ttl=negative_ttl, lock_ttl=lock_ttl, local=local,
+                ))
+                _inflight[name] = flight
+                flight.add_done_callback(lambda _: _inflight.pop(name, None))
+            # Shielded so one cancelled caller doesn't cancel the load for everybody
+            return await asyncio.shield(flight)
+        finally:
+            CACHE_LOOKUP_SECONDS.labels(namespace).observe(time.perf_counter() - started)
+
+    async def _fill(
+        self,
+        client: Redis,
+        name: str,
+        loader: Callable[[], Awaitable[Any]],
+        *,
+        namespace: str,
+        ttl: int,
+        codec: Codec,
+        jitter: float,
+        negative_ttl: int | None,
+        lock_ttl: float | None,
+        local: LocalCache | None,
+    ) -> Any:
+        lock = None
+        if lock_ttl:
+            lock = client.lock(f"lock:{name}", timeout=lock_ttl)
+            try:
+                acquired = await get_redis_breaker().call(lock.acquire, blocking=False)
+            except REDIS_FAILURES:
+                # Load without the lock; the store below may fail too, which is fine
+                lock, acquired = None, True
+            if not acquired:
+                lock = None
+                found, value = await self._wait_for(client, name, codec, lock_ttl)
+                if found:
+                    if local is not None:
+                        local.set(name, value)
+                    return value
+
+        try:
+            started = time.perf_counter()
+            value = await loader()
+            CACHE_LOAD_SECONDS.labels(namespace).observe(time.perf_counter() - started)
+
+            try:
+                if value is not None:
+                    await self._call(client, "set", name, codec.dumps(value), ex=self._jittered(ttl, jitter))
+                elif negative_ttl:
+                    await self._call(client, "set", name, NONE_MARKER, ex=self._jittered(negative_ttl, jitter))
+            except REDIS_FAILURES:
+                logger.warning("Failed to cache %s, Redis is unavailable", name)
+                return value
+            if local is not None and (value is not None or negative_ttl):
+                local.set(name, value)
+            return value
+        finally:
+            if lock is not None:
+                try:
+                    await lock.release()
+                except (LockError, *REDIS_FAILURES):
+                    pass
+
+    async def _wait_for(
+        self,
+        client: Redis,
+        name: str,
+        codec: Codec,
+        timeout: float,
+        poll_interval: float = 0.02,
+    ) -> tuple[bool, Any]:
+        """Polls for a value another worker is loading. Gives up once its lock is gone."""
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            await asyncio.sleep(poll_interval)
+            try:
+                raw = await self._call(client, "get", name)
+                if raw is not None:
+                    return True, self.decode(raw, codec)
+                if not await self._call(client, "exists", f"lock:{name}"):
+                    break
+            except REDIS_FAILURES:
+                break
+        return False, None
+
+
+def cached(
+    namespace: str,
+    key: Callable[..., str],
+    *,
+    ttl: int,
+    codec: Codec = JSON,
+    jitter: float = 0.1,
+    negative_ttl: int | None = None,
+    lock_ttl: float | None = 5.0,
+    local: LocalCache | None = None,
+):
+    """
+    Decorates an async function with cache-aside reads through `CacheRepo.get_or_load`.
+    The cache key is `{namespace}:{key(*args, **kwargs)}`.
+    """
+    def decorator(func: Callable[..., Awaitable[Any]]):
+        @wraps(func)
+        async def wrapper(*args, **kwargs):
+            return await CacheRepo(get_redis()).get_or_load(
+                f"{namespace}:{key(*args, **kwargs)}",
+                lambda: func(*args, **kwargs),
+                namespace=namespace,
+                ttl=ttl,
+                codec=codec,
+                jitter=jitter,
+                negative_ttl=negative_ttl,
+                lock_ttl=lock_ttl,
+                local=local,
+            )
+        return wrapper
+    return decorator
@@ -0,0 +1,166 @@
+import asyncio
+import logging
+import time
+from enum import IntEnum
+from typing import Any, Awaitable, Callable
+
+from prometheus_client import Counter, Gauge
+from redis.exceptions import ConnectionError as RedisConnectionError
+from redis.exceptions import TimeoutError as RedisTimeoutError
+
+from core.config import Settings
+
+config = Settings() # pyright: ignore[reportCallIssue]
+logger = logging.getLogger(__name__)
+
+# Errors that say the server is unreachable or slow; command errors don't count
+REDIS_FAILURES = (RedisConnectionError, RedisTimeoutError, asyncio.TimeoutError, OSError)
+
+
+class BreakerState(IntEnum):
+    CLOSED = 0
+    HALF_OPEN = 1
+    OPEN = 2
+
+
+BREAKER_STATE = Gauge(
+    "redis_breaker_state",
+    "Circuit breaker state: 0 closed, 1 half-open, 2 open",
+    ["breaker"],
+)
+BREAKER_TRANSITIONS = Counter(
+    "redis_breaker_transitions_total",
+    "Circuit breaker state changes, by the state entered",
+    ["breaker", "state"],
+)
+DEGRADED_FOR = Gauge(
+    "redis_degraded_for_seconds",
+    "Seconds since the breaker left the closed state, 0 when closed",
+    ["breaker"],
+)
+DEGRADED_SECONDS = Counter(
+    "redis_degraded_seconds_total",
+    "Time spent with the breaker not closed, counted when it closes again",
+    ["breaker"],
+)
+REDIS_FALLBACKS = Counter(
+    "redis_fallbacks_total",
+    "Requests served by a local fallback because Redis was unavailable",
+    ["site"],
+)
+
+
+class CircuitOpenError(RedisConnectionError):
+    """Raised instead of calling Redis while the breaker is open."""
+
+
+class CircuitBreaker:
+    """
+    Stops calling Redis after `failure_threshold` consecutive connection
+    errors or timeouts. While open, calls fail immediately with
+    `CircuitOpenError`; after `reset_timeout` seconds a single probe call is
+    let through (half-open) and its outcome closes or reopens the breaker.
+
+    `CircuitOpenError` is a redis `ConnectionError`, so use sites handle an
+    open breaker and a dead server with the same `except`.
+    """
+    def __init__(self, name: str, failure_threshold: int, reset_timeout: float):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = BreakerState.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.degraded_since: float | None = None
+        self._probing = False
+        self._on_close: list[Callable[[], Awaitable[None]]] = []
+        self._tasks: set[asyncio.Task] = set()
+        BREAKER_STATE.labels(name).set(BreakerState.CLOSED)
+        DEGRADED_FOR.labels(name).set_function(self.degraded_for)
+
+    @property
+    def closed(self) -> bool:
+        return self.state is BreakerState.CLOSED
+
+    def degraded_for(self) -> float:
+        if self.degraded_since is None:
+            return 0.0
+        return time.monotonic() - self.degraded_since
+
+    def on_close(self, callback: Callable[[], Awaitable[None]]) -> None:
+        """Registers a coroutine to run when Redis is back, e.g. to replay local writes."""
+        self._on_close.append(callback)
+
+    def _transition(self, state: BreakerState) -> None:
+        if state is self.state:
+            return
+        logger.warning("Redis breaker %s: %s -> %s", self.name, self.state.name, state.name)
+        if state is BreakerState.CLOSED:
+            DEGRADED_SECONDS.labels(self.name).inc(self.degraded_for())
+            self.degraded_since = None
+            self._run_close_callbacks()
+        elif self.degraded_since is None:
+            self.degraded_since = time.monotonic()
+        if state is BreakerState.OPEN:
+            self.opened_at = time.monotonic()
+        self.state = state
+        BREAKER_STATE.labels(self.name).set(state)
+        BREAKER_TRANSITIONS.labels(self.name, state.name.lower()).inc()
+
+    def _run_close_callbacks(self) -> None:
+        for callback in self._on_close:
+            task = asyncio.ensure_future(callback())
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    def before_call(self) -> bool:
+        """Raises while open. Returns True when this call is the half-open probe."""
+        if self.state is BreakerState.CLOSED:
+            return False
+        if self.state is BreakerState.OPEN:
+            if time.monotonic() - self.opened_at < self.reset_timeout:
+                raise CircuitOpenError(f"Redis breaker {self.name} is open")
+            self._transition(BreakerState.HALF_OPEN)
+        if self._probing:
+            raise CircuitOpenError(f"Redis breaker {self.name} is probing")
+        self._probing = True
+        return True
+
+    def record_success(self, probe: bool = False) -> None:
+        if probe:
+            self._probing = False
+        self.failures = 0
+        if self.state is not BreakerState.CLOSED:
+            self._transition(BreakerState.CLOSED)
+
+    def record_failure(self, probe: bool = False) -> None:
+        if probe:
+            self._probing = False
+        self.failures += 1
+        if self.state is BreakerState.HALF_OPEN or self.failures >= self.failure_threshold:
+            self._transition(BreakerState.OPEN)
+
+    async def call(self, func: Callable[..., Awaitable[Any]], *args, **kwargs) -> Any:
+        probe = self.before_call()
+        try:
+            result = await func(*args, **kwargs)
+        except REDIS_FAILURES:
+            self.record_failure(probe)
+            raise
+        except BaseException:
+            # Command errors and cancellation say nothing about availability
+            if probe:
+                self._probing = False
+            raise
+        self.record_success(probe)
+        return result
+
+
+redis_breaker = CircuitBreaker(
+    "redis",
+    failure_threshold=config.REDIS_BREAKER_FAILURE_THRESHOLD,
+    reset_timeout=config.REDIS_BREAKER_RESET_TIMEOUT,
+)
+
+def get_redis_breaker() -> CircuitBreaker:
+    return redis_breaker
@@ -0,0 +1,38 @@
+import json
+from typing import Any, Protocol
+
+
+class Codec(Protocol):
+    """Serializes cached values. Binary codecs need a client without decode_responses."""
+    binary: bool
+
+    def dumps(self, value: Any) -> str | bytes: ...
+
+    def loads(self, raw: str | bytes) -> Any: ...
+
+
+class JsonCodec:
+    binary = False
+
+    def dumps(self, value: Any) -> str:
+        return json.dumps(value, separators=(",", ":"))
+
+    def loads(self, raw: str | bytes) -> Any:
+        return json.loads(raw)
+
+
+class MsgpackCodec:
+    binary = True
+
+    def __init__(self):
+        import msgpack
+        self._msgpack = msgpack
+
+    def dumps(self, value: Any) -> bytes:
+        return self._msgpack.packb(value, use_bin_type=True)
+
+    def loads(self, raw: str | bytes) -> Any:
+        return self._msgpack.unpackb(raw, raw=False)
+
+
+JSON = JsonCodec()
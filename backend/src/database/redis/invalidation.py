@@ -0,0 +1,114 @@
+import asyncio
+import json
+import logging
+import os
+from uuid import uuid4
+
+from prometheus_client import Counter
+from redis.asyncio import Redis
+
+from .circuit_breaker import REDIS_FAILURES, get_redis_breaker
+from .local_cache import LocalCache
+from .redis_client import get_redis
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = "cache:invalidate"
+
+INVALIDATIONS_RECEIVED = Counter(
+    "cache_invalidations_received_total",
+    "Invalidation messages applied to this worker's L1 caches",
+)
+
+
+class InvalidationBus:
+    """
+    Broadcasts cache invalidations over Redis pub/sub so every worker (and
+    replica) drops the affected keys from its in-process caches.
+
+    Messages are `{"origin", "keys", "prefixes"}`; a key or prefix is dropped
+    from every registered `LocalCache`.
+    """
+    def __init__(self, redis: Redis, channel: str = CHANNEL):
+        self.redis = redis
+        self.channel = channel
+        self.origin = f"{os.getpid()}-{uuid4().hex[:8]}"
+        self.caches: list[LocalCache] = []
+        self._task: asyncio.Task | None = None
+        self._ready = asyncio.Event()
+
+    def register(self, cache: LocalCache) -> LocalCache:
+        self.caches.append(cache)
+        return cache
+
+    def drop_local(self, keys: list[str], prefixes: list[str]) -> None:
+        for cache in self.caches:
+            cache.drop(*keys)
+            for prefix in prefixes:
+                cache.drop_prefix(prefix)
+
+    async def publish(self, keys: list[str] | tuple[str, ...] = (), prefixes: list[str] | tuple[str, ...] = ()) -> None:
+        keys, prefixes = list(keys), list(prefixes)
+        if not keys and not prefixes:
+            return
+        # Drop our own copies right away instead of waiting for the echo
+        self.drop_local(keys, prefixes)
+        message = json.dumps({"origin": self.origin, "keys": keys, "prefixes": prefixes})
+        try:
+            await get_redis_breaker().call(self.redis.publish, self.channel, message)
+        except REDIS_FAILURES:
+            # Other workers are disconnected too, and clear their L1 caches when that happens
+            logger.warning("Invalidation not broadcast, Redis is unavailable")
+
+    async def _listen(self) -> None:
+        backoff = 0.5
+        while True:
+            pubsub = self.redis.pubsub(ignore_subscribe_messages=True)
+            try:
+                await pubsub.subscribe(self.channel)
+                self._ready.set()
+                backoff = 0.5
+                while True:
+                    # An explicit read timeout; the client's socket timeout is too short to idle on
+                    message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=30)
+                    if message is None:
+                        continue
+                    payload = json.loads(message["data"])
+                    if payload.get("origin") == self.origin:
+                        continue
+                    self.drop_local(payload.get("keys", []), payload.get("prefixes", []))
+                    INVALIDATIONS_RECEIVED.inc()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                # Anything published while disconnected is lost: start clean
+                logger.warning("Invalidation bus disconnected, retrying in %.1fs", backoff, exc_info=True)
+                self._ready.clear()
+                for cache in self.caches:
+                    cache.clear()
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, 30)
+            finally:
+                await pubsub.aclose()
+
+    async def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._listen())
+
+    async def wait_ready(self, timeout: float = 5) -> None:
+        await asyncio.wait_for(self._ready.wait(), timeout)
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+invalidation_bus = InvalidationBus(get_redis())
+
+def get_invalidation_bus() -> InvalidationBus:
+    return invalidation_bus
@@ -0,0 +1,63 @@
+import time
+from collections import OrderedDict
+from typing import Any
+
+from prometheus_client import Gauge
+
+L1_ENTRIES = Gauge(
+    "cache_l1_entries",
+    "Entries held in a worker's in-process cache",
+    ["namespace"],
+)
+
+MISSING = object()
+
+
+class LocalCache:
+    """
+    In-process (L1) cache: LRU bounded by `maxsize`, entries expire after `ttl`
+    seconds. Not shared between workers; keep TTLs short and invalidate
+    through the `InvalidationBus` so every worker drops stale entries.
+    """
+    def __init__(self, namespace: str, *, maxsize: int = 1024, ttl: float = 60):
+        self.namespace = namespace
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: OrderedDict[str, tuple[float, Any]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, name: str) -> Any:
+        """Returns the value or `MISSING`. A cached `None` is returned as `None`."""
+        entry = self._data.get(name)
+        if entry is None:
+            return MISSING
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._data[name]
+            L1_ENTRIES.labels(self.namespace).set(len(self._data))
+            return MISSING
+        self._data.move_to_end(name)
+        return value
+
+    def set(self, name: str, value: Any, ttl: float | None = None) -> None:
+        self._data[name] = (time.monotonic() + (ttl or self.ttl), value)
+        self._data.move_to_end(name)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+        L1_ENTRIES.labels(self.namespace).set(len(self._data))
+
+    def drop(self, *names: str) -> None:
+        for name in names:
+            self._data.pop(name, None)
+        L1_ENTRIES.labels(self.namespace).set(len(self._data))
+
+    def drop_prefix(self, prefix: str) -> None:
+        for name in [name for name in self._data if name.startswith(prefix)]:
+            del self._data[name]
+        L1_ENTRIES.labels(self.namespace).set(len(self._data))
+
+    def clear(self) -> None:
+        self._data.clear()
+        L1_ENTRIES.labels(self.namespace).set(0)
@@ -1,11 +1,70 @@
+import time
+
+from prometheus_client import Counter, Histogram
 from redis.asyncio import Redis
+from redis.asyncio.client import Pipeline
 from core.config import Settings
 
 config = Settings() # pyright: ignore[reportCallIssue]
 
-redis_client = Redis.from_url(config.REDIS_URL, decode_responses=True)
+REDIS_COMMANDS = Counter(
+    "redis_commands_total",
+    "Redis commands by name and outcome (ok, error); a pipeline counts each queued command",
+    ["command", "outcome"],
+)
+REDIS_COMMAND_DURATION = Histogram(
+    "redis_command_duration_seconds",
+    "Redis round trips by command, PIPELINE for a whole pipeline",
+    ["command"],
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1),
+)
+
+
+class InstrumentedPipeline(Pipeline):
+    async def execute(self, raise_on_error: bool = True):
+        commands = [str(args[0]).upper() for args, _ in self.command_stack]
+        started = time.perf_counter()
+        outcome = "error"
+        try:
+            result = await super().execute(raise_on_error=raise_on_error)
+            outcome = "ok"
+            return result
+        finally:
+            REDIS_COMMAND_DURATION.labels("PIPELINE").observe(time.perf_counter() - started)
+            for command in commands:
+                REDIS_COMMANDS.labels(command, outcome).inc()
+
+
+class InstrumentedRedis(Redis):
+    """Redis client exporting command counts and latencies. Pub/sub isn't measured."""
+    async def execute_command(self, *args, **options):
+        command = str(args[0]).upper()
+        started = time.perf_counter()
+        outcome = "error"
+        try:
+            result = await super().execute_command(*args, **options)
+            outcome = "ok"
+            return result
+        finally:
+            REDIS_COMMAND_DURATION.labels(command).observe(time.perf_counter() - started)
+            REDIS_COMMANDS.labels(command, outcome).inc()
+
+    def pipeline(self, transaction: bool = True, shard_hint: str | None = None) -> Pipeline:
+        return InstrumentedPipeline(self.connection_pool, self.response_callbacks, transaction, shard_hint)
+
+
+_timeouts = {
+    "socket_timeout": config.REDIS_SOCKET_TIMEOUT,
+    "socket_connect_timeout": config.REDIS_CONNECT_TIMEOUT,
+}
+
+redis_client = InstrumentedRedis.from_url(config.REDIS_URL, decode_responses=True, **_timeouts)
+binary_redis_client = InstrumentedRedis.from_url(config.REDIS_URL, decode_responses=False, **_timeouts)
 
 def get_redis() -> Redis:
     """Returns prepared Redis session"""
     return redis_client
-    
+
+def get_binary_redis() -> Redis:
+    """Returns Redis session that keeps values as bytes, for binary codecs"""
+    return binary_redis_client
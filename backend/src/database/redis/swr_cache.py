@@ -0,0 +1,138 @@
+import asyncio
+import json
+import logging
+import time
+from typing import Any, Awaitable, Callable
+
+from redis.asyncio import Redis
+from redis.exceptions import LockError
+
+from database.relational_db import detached_context
+from .circuit_breaker import REDIS_FAILURES, REDIS_FALLBACKS, get_redis_breaker
+
+logger = logging.getLogger(__name__)
+
+# Strong references to in-flight refreshes, so they aren't garbage collected mid-run
+_background: set[asyncio.Task] = set()
+
+
+class SWRCache:
+    """
+    Redis result cache with stale-while-revalidate semantics.
+
+    Entries are fresh for `fresh_ttl` seconds and then served as stale for up
+    to `stale_ttl` more while a single background task recomputes them.
+    A short Redis lock per key makes sure only one worker recomputes. It is
+    renewed for as long as the computation runs, so a slow one doesn't let
+    everybody else start their own.
+    """
+    def __init__(
+        self,
+        redis: Redis,
+        *,
+        fresh_ttl: int,
+        stale_ttl: int,
+        lock_ttl: int = 30,
+        poll_interval: float = 0.05,
+    ):
+        self.redis = redis
+        self.fresh_ttl = fresh_ttl
+        self.stale_ttl = stale_ttl
+        self.lock_ttl = lock_ttl
+        self.poll_interval = poll_interval
+
+    @staticmethod
+    def _lock_name(key: str) -> str:
+        return f"lock:{key}"
+
+    async def _read(self, key: str) -> tuple[Any, float] | None:
+        raw = await self.redis.get(key)
+        if raw is None:
+            return None
+        envelope = json.loads(raw)
+        return envelope["data"], max(0.0, time.time() - envelope["at"])
+
+    async def _store(self, key: str, data: Any) -> None:
+        envelope = json.dumps({"at": time.time(), "data": data})
+        await self.redis.set(key, envelope, ex=self.fresh_ttl + self.stale_ttl)
+
+    async def _renew(self, lock) -> None:
+        while True:
+            await asyncio.sleep(self.lock_ttl / 3)
+            try:
+                await get_redis_breaker().call(lock.reacquire)
+            except LockError:
+                # Expired anyway, another worker may own it now
+                return
+            except REDIS_FAILURES:
+                logger.warning("Failed to renew %s", lock.name)
+
+    async def _recompute(
+        self,
+        key: str,
+        compute: Callable[[], Awaitable[Any]],
+        lock,
+    ) -> Any:
+        renewal = asyncio.create_task(self._renew(lock))
+        try:
+            data = await compute()
+            await self._store(key, data)
+            return data
+        finally:
+            renewal.cancel()
+            try:
+                await lock.release()
+            except LockError:
+                # Lock expired while computing, another worker may own it now
+                pass
+
+    def _refresh_in_background(self, key: str, compute: Callable[[], Awaitable[Any]], lock) -> None:
+        async def run():
+            try:
+                await self._recompute(key, compute, lock)
+            except Exception:
+                logger.exception("Background refresh of %s failed", key)
+
+        # Outlives the request, so it mustn't run under its statement timeout or count against its budget
+        task = asyncio.create_task(run(), context=detached_context())
+        _background.add(task)
+        task.add_done_callback(_background.discard)
+
+    async def get_or_compute(
+        self,
+        key: str,
+        compute: Callable[[], Awaitable[Any]],
+    ) -> tuple[Any, float]:
+        """
+        Returns `(data, age_seconds)`. `compute` must be JSON-serializable
+        and must not depend on request-scoped resources, since it may run
+        after the response has been sent. While Redis is unavailable,
+        `compute` runs inline on every call.
+        """
+        try:
+            cached = await get_redis_breaker().call(self._read, key)
+        except REDIS_FAILURES:
+            REDIS_FALLBACKS.labels("swr").inc()
+            return await compute(), 0.0
+        lock = self.redis.lock(self._lock_name(key), timeout=self.lock_ttl)
+
+        if cached is not None:
+            data, age = cached
+            if age >= self.fresh_ttl and await lock.acquire(blocking=False):
+                self._refresh_in_background(key, compute, lock)
+            return data, age
+
+        # Cold cache: one worker computes, everyone else waits for its result.
+        # The lock is held for as long as the owner computes; when it goes
+        # without a result (owner failed or died), one waiter takes over
+        while not await lock.acquire(blocking=False):
+            await asyncio.sleep(self.poll_interval)
+            cached = await self._read(key)
+            if cached is not None:
+                return cached
+        # The previous owner may have stored its result just before releasing
+        cached = await self._read(key)
+        if cached is not None:
+            await lock.release()
+            return cached
+        return await self._recompute(key, compute, lock), 0.0
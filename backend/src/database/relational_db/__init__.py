@@ -1,3 +1,4 @@
 from .tables import *
-from .session import get_uow
-from .unit_of_work import UoW
\ No newline at end of file
+from .session import detached_context, get_uow, uow_scope
+from .unit_of_work import UoW
+from .listener import PgListener
@@ -0,0 +1,136 @@
+"""
+Prometheus metrics for the SQLAlchemy engine.
+
+Every statement is counted and timed through engine events. Statements run
+while a request is being served are also added to that request's
+`DbStats` (the `db_stats` context variable, set by the metrics middleware),
+so per-route statement counts and database time can be reported, and a
+route's query budget (`core.query_budget`) enforced. Pool gauges are read
+at scrape time.
+"""
+import time
+from collections import Counter as Tally
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Literal
+
+from prometheus_client import Counter, Gauge, Histogram
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+OPERATIONS = frozenset({"SELECT", "INSERT", "UPDATE", "DELETE", "WITH"})
+
+DB_STATEMENTS = Counter(
+    "db_statements_total",
+    "SQL statements by operation and outcome (ok, error)",
+    ["operation", "outcome"],
+)
+DB_STATEMENT_DURATION = Histogram(
+    "db_statement_duration_seconds",
+    "SQL statement execution time by operation",
+    ["operation"],
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+)
+DB_POOL_SIZE = Gauge("db_pool_size", "Connections the pool keeps open")
+DB_POOL_MAX = Gauge("db_pool_max_connections", "Pool size plus allowed overflow")
+DB_POOL_CHECKED_OUT = Gauge("db_pool_checked_out", "Connections in use")
+DB_POOL_OVERFLOW = Gauge("db_pool_overflow", "Connections open beyond the pool size")
+
+
+BudgetAction = Literal["off", "log", "raise"]
+
+
+class QueryBudgetExceeded(RuntimeError):
+    """A statement was about to run past the query budget, with the budget action "raise"."""
+
+
+@dataclass
+class DbStats:
+    """Statements run on behalf of one request, or of a block under test."""
+    statements: int = 0
+    seconds: float = 0.0
+    budget: int | None = None
+    budget_action: BudgetAction = "log"
+    # Times each SQL string ran; the same SELECT many times over is the N+1 signature
+    by_statement: Tally[str] = field(default_factory=Tally)
+
+    def add(self, statement: str, elapsed: float) -> None:
+        self.statements += 1
+        self.seconds += elapsed
+        self.by_statement[statement] += 1
+
+    def merge(self, other: "DbStats") -> None:
+        self.statements += other.statements
+        self.seconds += other.seconds
+        self.by_statement.update(other.by_statement)
+
+    @property
+    def over_budget(self) -> bool:
+        return self.budget is not None and self.statements > self.budget
+
+    def most_repeated(self) -> tuple[str, int] | None:
+        if not self.by_statement:
+            return None
+        return self.by_statement.most_common(1)[0]
+
+    def describe(self) -> str:
+        """One line for logs and assertion messages."""
+        text = f"{self.statements} SQL statements in {self.seconds * 1000:.1f} ms"
+        repeated = self.most_repeated()
+        if repeated is not None and repeated[1] > 1:
+            statement, times = repeated
+            text += f"; ran {times}x: {' '.join(statement.split())[:200]}"
+        return text
+
+
+db_stats: ContextVar[DbStats | None] = ContextVar("db_stats", default=None)
+
+
+def _operation(statement: str) -> str:
+    keyword = statement.lstrip()[:6].upper()
+    return keyword if keyword in OPERATIONS else "OTHER"
+
+
+def instrument_engine(engine: AsyncEngine) -> None:
+    sync_engine = engine.sync_engine
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany) -> None:
+        stats = db_stats.get()
+        if (
+            stats is not None
+            and stats.budget is not None
+            and stats.budget_action == "raise"
+            and stats.statements >= stats.budget
+        ):
+            raise QueryBudgetExceeded(f"Query budget of {stats.budget} exceeded: {stats.describe()}")
+        context._metrics_started = time.perf_counter()
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany) -> None:
+        elapsed = time.perf_counter() - context._metrics_started
+        operation = _operation(statement)
+        DB_STATEMENTS.labels(operation, "ok").inc()
+        DB_STATEMENT_DURATION.labels(operation).observe(elapsed)
+        stats = db_stats.get()
+        if stats is not None:
+            stats.add(statement, elapsed)
+
+    @event.listens_for(sync_engine, "handle_error")
+    def _error(exception_context) -> None:
+        context = exception_context.execution_context
+        started = getattr(context, "_metrics_started", None)
+        if started is None:
+            return
+        DB_STATEMENTS.labels(_operation(exception_context.statement or ""), "error").inc()
+        stats = db_stats.get()
+        if stats is not None:
+            stats.add(exception_context.statement or "", time.perf_counter() - started)
+
+    pool = sync_engine.pool
+    if hasattr(pool, "checkedout"):
+        # Only queue pools report usage; NullPool and the like are skipped
+        DB_POOL_SIZE.set_function(pool.size)  # pyright: ignore[reportAttributeAccessIssue]
+        DB_POOL_MAX.set_function(lambda: pool.size() + pool._max_overflow)  # pyright: ignore[reportAttributeAccessIssue]
+        DB_POOL_CHECKED_OUT.set_function(pool.checkedout)  # pyright: ignore[reportAttributeAccessIssue]
+        DB_POOL_OVERFLOW.set_function(lambda: max(0, pool.overflow()))  # pyright: ignore[reportAttributeAccessIssue]
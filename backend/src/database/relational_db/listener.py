@@ -0,0 +1,99 @@
+import asyncio
+import json
+import logging
+from typing import Any, Awaitable, Callable
+
+import asyncpg
+from sqlalchemy.engine import make_url
+
+from core.config import Settings
+
+config = Settings() # pyright: ignore[reportCallIssue]
+logger = logging.getLogger(__name__)
+
+
+def asyncpg_dsn(database_url: str = config.DATABASE_URL) -> str:
+    """Plain libpq DSN for the SQLAlchemy `postgresql+asyncpg://` URL."""
+    return make_url(database_url).set(drivername="postgresql").render_as_string(hide_password=False)
+
+
+class PgListener:
+    """
+    Dedicated asyncpg connection that LISTENs on a channel and feeds JSON
+    payloads to `handler` one at a time.
+
+    Notifications sent while disconnected are lost, so `on_reconnect` is
+    awaited after every (re)connect except the first to let callers resync.
+    """
+    def __init__(
+        self,
+        channel: str,
+        handler: Callable[[dict[str, Any]], Awaitable[None]],
+        on_reconnect: Callable[[], Awaitable[None]] | None = None,
+    ):
+        self.channel = channel
+        self.handler = handler
+        self.on_reconnect = on_reconnect
+        self._queue: asyncio.Queue[str] = asyncio.Queue()
+        self._task: asyncio.Task | None = None
+
+    def _on_notify(self, _conn, _pid, _channel, payload: str) -> None:
+        self._queue.put_nowait(payload)
+
+    async def _dispatch(self, lost: asyncio.Event) -> None:
+        while not lost.is_set():
+            payload = await self._queue.get()
+            try:
+                await self.handler(json.loads(payload))
+            except Exception:
+                logger.exception("Failed to handle %s notification: %s", self.channel, payload)
+
+    async def _run(self) -> None:
+        backoff = 0.5
+        connected_before = False
+        while True:
+            conn = None
+            lost = asyncio.Event()
+            try:
+                conn = await asyncpg.connect(asyncpg_dsn())
+                conn.add_termination_listener(lambda _: lost.set())
+                await conn.add_listener(self.channel, self._on_notify)
+                backoff = 0.5
+
+                if connected_before and self.on_reconnect is not None:
+                    await self.on_reconnect()
+                connected_before = True
+
+                dispatcher = asyncio.create_task(self._dispatch(lost))
+                try:
+                    while not lost.is_set():
+                        try:
+                            await asyncio.wait_for(lost.wait(), timeout=30)
+                        except asyncio.TimeoutError:
+                            # A silently dropped socket is only noticed on use
+                            await conn.execute("SELECT 1")
+                finally:
+                    dispatcher.cancel()
+                logger.warning("LISTEN connection for %s was closed, reconnecting", self.channel)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.warning("LISTEN on %s failed, retrying in %.1fs", self.channel, backoff, exc_info=True)
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, 30)
+            finally:
+                if conn is not None and not conn.is_closed():
+                    await conn.close()
+
+    async def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
@@ -1,5 +1,8 @@
 from typing import AsyncGenerator
 from contextlib import asynccontextmanager
+from contextvars import Context, ContextVar, copy_context
+from sqlalchemy import event
+from sqlalchemy.orm import Session
 from sqlalchemy.ext.asyncio import(
     create_async_engine,
     async_sessionmaker,
@@ -8,16 +11,55 @@ from sqlalchemy.ext.asyncio import(
 )
 
 from core.config import Settings
+from .instrumentation import db_stats, instrument_engine
 from .unit_of_work import UoW
 
 config = Settings() # pyright: ignore[reportCallIssue]
 
-engine: AsyncEngine = create_async_engine(config.DATABASE_URL, echo=True)
+engine: AsyncEngine = create_async_engine(
+    config.DATABASE_URL,
+    echo=True,
+    connect_args={"server_settings": {"statement_timeout": str(config.DB_STATEMENT_TIMEOUT_MS)}},
+)
+instrument_engine(engine)
 async_session: async_sessionmaker[AsyncSession] = async_sessionmaker(engine, expire_on_commit=False)
 
+# Per-request override of statement_timeout (ms), set by the admission control middleware
+statement_timeout: ContextVar[int | None] = ContextVar("statement_timeout", default=None)
+
+
+def detached_context() -> Context:
+    """
+    A copy of the current context without the request's database settings
+    and statement counter, for tasks that outlive the request:
+    `asyncio.create_task(coro, context=detached_context())`. Otherwise their
+    statements count against the request's query budget, and can fail it.
+    """
+    context = copy_context()
+    context.run(statement_timeout.set, None)
+    context.run(db_stats.set, None)
+    return context
+
+
+@event.listens_for(Session, "after_begin")
+def _apply_statement_timeout(session, transaction, connection) -> None:
+    timeout = statement_timeout.get()
+    if timeout is None or timeout == config.DB_STATEMENT_TIMEOUT_MS:
+        return
+    # SET LOCAL lasts until the end of this transaction only
+    connection.exec_driver_sql(f"SET LOCAL statement_timeout = {int(timeout)}")
+
 
 async def get_uow() -> AsyncGenerator[UoW, None]:
     """Yields Unit of Work instead of raw sessions."""
     async with async_session() as session:
         async with UoW(session) as uow:
             yield uow
+
+
+@asynccontextmanager
+async def uow_scope() -> AsyncGenerator[UoW, None]:
+    """Unit of Work outside of a request, for background tasks and commands."""
+    async with async_session() as session:
+        async with UoW(session) as uow:
+            yield uow
@@ -2,3 +2,7 @@ from .table_base import Base
 from .users import *
 from .languages import *
 from .roles import *
+from .statistics import *
+from .webhooks import *
+from .outbox import *
+from .interactions import *
@@ -0,0 +1,2 @@
+from .interactions_table import InteractionEvent
+from .interactions_interface import InteractionsInterface, InteractionRow
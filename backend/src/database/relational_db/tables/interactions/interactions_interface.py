@@ -0,0 +1,111 @@
+from datetime import date, datetime, time, timedelta, UTC
+from typing import Sequence
+from uuid import UUID
+
+from sqlalchemy import func, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .interactions_table import InteractionEvent
+from ..time_series import bucket_window, gap_filled
+
+TABLE = InteractionEvent.__tablename__
+COLUMNS = ("occurred_at", "user_id", "interaction", "target_id")
+PARTITION_PREFIX = f"{TABLE}_p"
+
+# (occurred_at, user_id, interaction, target_id), in `COLUMNS` order
+InteractionRow = tuple[datetime, UUID, str, str]
+
+
+def partition_name(day: date) -> str:
+    return f"{PARTITION_PREFIX}{day:%Y%m%d}"
+
+
+def _day_start(day: date) -> datetime:
+    return datetime.combine(day, time.min, UTC)
+
+
+class InteractionsInterface:
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def copy(self, rows: Sequence[InteractionRow]) -> None:
+        """Appends rows with COPY, in the session's transaction."""
+        connection = await self.session.connection()
+        raw = await connection.get_raw_connection()
+        await raw.driver_connection.copy_records_to_table(  # pyright: ignore[reportOptionalMemberAccess]
+            TABLE, records=rows, columns=COLUMNS,
+        )
+
+    async def missing_partitions(self, days: Sequence[date]) -> list[date]:
+        result = await self.session.execute(
+            text(
+                "SELECT day FROM unnest(CAST(:days AS date[])) AS day "
+                "WHERE to_regclass(CAST(:prefix AS text) || to_char(day, 'YYYYMMDD')) IS NULL"
+            ),
+            {"days": list(days), "prefix": PARTITION_PREFIX},
+        )
+        return list(result.scalars())
+
+    async def ensure_partitions(self, days: Sequence[date]) -> list[date]:
+        """Creates the partitions of `days` that don't exist yet. Returns the days created."""
+        missing = await self.missing_partitions(days)
+        if not missing:
+            return []
+        # Serializes creators across workers; the check is repeated under the lock
+        await self.session.execute(
+            text("SELECT pg_advisory_xact_lock(hashtext(:key))"), {"key": f"partitions:{TABLE}"},
+        )
+        missing = await self.missing_partitions(missing)
+        for day in missing:
+            start, end = _day_start(day), _day_start(day + timedelta(days=1))
+            await self.session.execute(text(
+                f"CREATE TABLE IF NOT EXISTS {partition_name(day)} PARTITION OF {TABLE} "
+                f"FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+            ))
+        return missing
+
+    async def partition_days(self) -> list[date]:
+        """Days that have a partition, oldest first."""
+        result = await self.session.execute(
+            text(
+                "SELECT child.relname FROM pg_inherits "
+                "JOIN pg_class parent ON parent.oid = pg_inherits.inhparent "
+                "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+                "WHERE parent.relname = :table"
+            ),
+            {"table": TABLE},
+        )
+        days = []
+        for name in result.scalars():
+            suffix = name.removeprefix(PARTITION_PREFIX)
+            try:
+                days.append(datetime.strptime(suffix, "%Y%m%d").date())
+            except ValueError:
+                # Not one of ours
+                continue
+        return sorted(days)
+
+    async def drop_partitions(self, before: date) -> list[date]:
+        """Drops the partitions of days before `before`. Returns the days dropped."""
+        dropped = [day for day in await self.partition_days() if day < before]
+        for day in dropped:
+            await self.session.execute(text(f"DROP TABLE IF EXISTS {partition_name(day)}"))
+        return dropped
+
+    async def active_users_series(self, days: int):
+        """Gap-filled distinct interacting users per UTC day, over the last `days` days."""
+        start, end = bucket_window('day', 'UTC', days)
+        bucket = func.date_trunc('day', func.timezone('UTC', InteractionEvent.occurred_at))
+        counts = (
+            select(
+                bucket.label('bucket'),
+                func.count(func.distinct(InteractionEvent.user_id)).label('count'),
+            )
+            # Compared as timestamptz, so only the partitions in range are scanned
+            .where(InteractionEvent.occurred_at >= func.timezone('UTC', start))
+            .group_by(bucket)
+            .subquery()
+        )
+
+        result = await self.session.execute(gap_filled(counts, 'day', 'UTC', start, end))
+        return result.mappings().all()
@@ -0,0 +1,26 @@
+from uuid import UUID
+from datetime import datetime
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy import DateTime, String, Uuid
+
+from ..table_base import Base
+
+
+class InteractionEvent(Base):
+    """
+    Raw user interactions, partitioned by UTC day on `occurred_at`.
+
+    Rows are only appended in batches with COPY and read back in aggregates,
+    so the table has no primary key or indexes to maintain on ingest; the
+    mapper key below exists for the ORM only. Partitions are created ahead
+    and dropped past retention by `InteractionsInterface`.
+    """
+    __tablename__ = "interaction_events"
+
+    occurred_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    user_id: Mapped[UUID] = mapped_column(Uuid(as_uuid=True), nullable=False)
+    interaction: Mapped[str] = mapped_column(String(16), nullable=False)
+    target_id: Mapped[str] = mapped_column(String(64), nullable=False)
+
+    __table_args__ = {"postgresql_partition_by": "RANGE (occurred_at)"}
+    __mapper_args__ = {"primary_key": [occurred_at, user_id, interaction, target_id]}
@@ -8,6 +8,10 @@ class LanguagesInterface:
     def __init__(self, session: AsyncSession):
         self.session = session
 
+    async def list_all(self) -> list[Language]:
+        languages = await self.session.scalars(select(Language))
+        return list(languages.all())
+
     async def search(self, search: str, limit: int) -> list[Language]:
         stmt = select(Language)
 
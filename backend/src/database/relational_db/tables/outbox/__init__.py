@@ -0,0 +1,2 @@
+from .outbox_table import OutboxEvent
+from .outbox_interface import OutboxInterface
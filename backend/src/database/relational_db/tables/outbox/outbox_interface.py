@@ -0,0 +1,65 @@
+from datetime import datetime
+from typing import Any, Sequence
+
+from sqlalchemy import delete, func, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .outbox_table import OutboxEvent
+
+
+class OutboxInterface:
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def claim(self, limit: int) -> list[OutboxEvent]:
+        """
+        Locks the oldest due events until the transaction ends. Events locked
+        by another relay are skipped, so relays work on separate batches.
+        """
+        rows = await self.session.scalars(
+            select(OutboxEvent)
+            .where(
+                OutboxEvent.published_at.is_(None),
+                OutboxEvent.failed_at.is_(None),
+                OutboxEvent.next_attempt_at <= func.now(),
+            )
+            .order_by(OutboxEvent.id)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+        return list(rows)
+
+    async def mark_published(self, ids: Sequence[int]) -> None:
+        if not ids:
+            return
+        await self.session.execute(
+            update(OutboxEvent)
+            .where(OutboxEvent.id.in_(ids))
+            .values(published_at=func.now(), attempts=OutboxEvent.attempts + 1)
+            .execution_options(synchronize_session=False)
+        )
+
+    async def mark_failed(self, id: int, error: str, retry_at: datetime | None) -> None:
+        """Schedules another attempt at `retry_at`, or gives up when it is None."""
+        values: dict[str, Any] = {"attempts": OutboxEvent.attempts + 1, "last_error": error}
+        if retry_at is None:
+            values["failed_at"] = func.now()
+        else:
+            values["next_attempt_at"] = retry_at
+        await self.session.execute(
+            update(OutboxEvent)
+            .where(OutboxEvent.id == id)
+            .values(**values)
+            .execution_options(synchronize_session=False)
+        )
+
+    async def prune(self, published_before: datetime, failed_before: datetime) -> int:
+        result = await self.session.execute(
+            delete(OutboxEvent).where(
+                or_(
+                    OutboxEvent.published_at < published_before,
+                    OutboxEvent.failed_at < failed_before,
+                )
+            )
+        )
+        return result.rowcount or 0
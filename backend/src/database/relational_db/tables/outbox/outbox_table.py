@@ -0,0 +1,48 @@
+from uuid import UUID, uuid4
+from datetime import datetime
+from typing import Any
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy import BigInteger, DateTime, Identity, Index, Integer, String, Text, Uuid, func, text
+from sqlalchemy.dialects.postgresql import JSONB
+
+from ..table_base import Base
+from ..mixins import CreatedAtMixin
+
+
+class OutboxEvent(CreatedAtMixin, Base):
+    """
+    A domain event written in the transaction that caused it, and published
+    by the outbox relay once that transaction has committed.
+    """
+    __tablename__ = "outbox"
+
+    id: Mapped[int] = mapped_column(BigInteger, Identity(), primary_key=True)
+    event_id: Mapped[UUID] = mapped_column(Uuid(as_uuid=True), nullable=False, default=uuid4)
+    event_type: Mapped[str] = mapped_column(String(64), nullable=False)
+    payload: Mapped[dict[str, Any]] = mapped_column(JSONB, nullable=False)
+
+    attempts: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
+    next_attempt_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), nullable=False, server_default=func.now()
+    )
+    published_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    failed_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    last_error: Mapped[str | None] = mapped_column(Text, nullable=True)
+
+    __table_args__ = (
+        # The relay only ever scans what is left to publish
+        Index(
+            "outbox_pending_idx",
+            "id",
+            postgresql_where=text("published_at IS NULL AND failed_at IS NULL"),
+        ),
+    )
+
+    def envelope(self) -> dict[str, Any]:
+        """The event as consumers get it."""
+        return {
+            "id": str(self.event_id),
+            "type": self.event_type,
+            "created_at": self.created_at.isoformat(),
+            "data": self.payload,
+        }
@@ -27,11 +27,14 @@ class Role(TimestampMixin, Base):
     #     back_populates="roles",
     #     lazy="selectin",
     # )
+    # Never loaded: eager loading it pulled every holder of a role into each
+    # query touching roles. Role links are removed by the FK cascade.
     users: Mapped[list["User"]] = relationship(  # pyright: ignore[reportUndefinedVariable]
         "User",
         secondary="user_roles",
         back_populates="roles",
-        lazy="selectin",
+        lazy="raise_on_sql",
+        passive_deletes=True,
     )
 
 
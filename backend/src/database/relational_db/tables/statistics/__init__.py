@@ -0,0 +1,2 @@
+from .user_daily_stats_table import UserDailyStats
+from .user_daily_stats_interface import UserDailyStatsInterface
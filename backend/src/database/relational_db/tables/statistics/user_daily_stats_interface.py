@@ -0,0 +1,130 @@
+import random
+from datetime import date, datetime, UTC
+from sqlalchemy import Date, DateTime, cast, func, select, delete, literal_column
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .user_daily_stats_table import REGISTRATION_SLOTS, UserDailyStats
+from ..users import User
+from ..time_series import bucket_window, gap_filled
+
+
+def utc_day(column):
+    """SQL expression truncating a timestamptz column to its UTC calendar day."""
+    return cast(func.timezone('UTC', column), Date)
+
+
+class UserDailyStatsInterface:
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def increment_registrations(self, day: date, by: int = 1) -> None:
+        """Adds to one of the day's slot rows, picked at random."""
+        slot = random.randrange(REGISTRATION_SLOTS)
+        stmt = insert(UserDailyStats).values(day=day, slot=slot, registrations=by)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[UserDailyStats.day, UserDailyStats.slot],
+            set_={
+                'registrations': UserDailyStats.registrations + stmt.excluded.registrations,
+                'updated_at': func.now(),
+            },
+        )
+        await self.session.execute(stmt)
+
+    async def registrations_series(self, granularity: str, days: int):
+        """
+        Gap-filled registrations per UTC `granularity` bucket, summed from
+        the rollup. Hourly buckets can't be served from here.
+        """
+        if granularity == 'hour':
+            raise ValueError("Daily rollup can't be bucketed by hour")
+
+        start, end = bucket_window(granularity, 'UTC', days)
+        bucket = func.date_trunc(granularity, cast(UserDailyStats.day, DateTime))
+        counts = (
+            select(
+                bucket.label('bucket'),
+                func.sum(UserDailyStats.registrations).label('count'),
+            )
+            .where(UserDailyStats.day >= cast(start, Date))
+            .group_by(bucket)
+            .subquery()
+        )
+
+        result = await self.session.execute(gap_filled(counts, granularity, 'UTC', start, end))
+        return result.mappings().all()
+
+    def _raw_registrations(self, start: date | None, end: date | None):
+        """Aggregate registrations per UTC day straight from the users table."""
+        day = utc_day(User.created_at)
+        stmt = select(
+            day.label('day'),
+            func.count(User.id).label('registrations'),
+        ).group_by(day)
+
+        if start is not None:
+            stmt = stmt.where(User.created_at >= datetime.combine(start, datetime.min.time(), UTC))
+        if end is not None:
+            stmt = stmt.where(User.created_at < datetime.combine(end, datetime.min.time(), UTC))
+
+        return stmt
+
+    async def rebuild(self, start: date | None = None, end: date | None = None) -> int:
+        """
+        Re-aggregate the rollup for days in `[start, end)` from the raw table,
+        into slot 0 of each day. Open bounds rebuild everything. Returns the
+        number of days written.
+        """
+        wipe = delete(UserDailyStats)
+        if start is not None:
+            wipe = wipe.where(UserDailyStats.day >= start)
+        if end is not None:
+            wipe = wipe.where(UserDailyStats.day < end)
+        await self.session.execute(wipe)
+
+        raw = self._raw_registrations(start, end).subquery()
+        stmt = insert(UserDailyStats).from_select(
+            ['day', 'registrations'],
+            select(raw.c.day, raw.c.registrations),
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[UserDailyStats.day, UserDailyStats.slot],
+            set_={
+                'registrations': stmt.excluded.registrations,
+                'updated_at': func.now(),
+            },
+        ).returning(literal_column('1'))
+
+        result = await self.session.execute(stmt)
+        return len(result.all())
+
+    async def find_mismatches(self, start: date | None = None, end: date | None = None):
+        """Days where the rollup disagrees with the raw users table."""
+        raw = self._raw_registrations(start, end).subquery()
+
+        rollup = select(
+            UserDailyStats.day,
+            func.sum(UserDailyStats.registrations).label('registrations'),
+        ).group_by(UserDailyStats.day)
+        if start is not None:
+            rollup = rollup.where(UserDailyStats.day >= start)
+        if end is not None:
+            rollup = rollup.where(UserDailyStats.day < end)
+        rollup = rollup.subquery()
+
+        day = func.coalesce(raw.c.day, rollup.c.day)
+        expected = func.coalesce(raw.c.registrations, 0)
+        actual = func.coalesce(rollup.c.registrations, 0)
+
+        result = await self.session.execute(
+            select(
+                day.label('day'),
+                expected.label('expected'),
+                actual.label('actual'),
+            )
+            .select_from(raw.join(rollup, raw.c.day == rollup.c.day, full=True))
+            .where(expected != actual)
+            .order_by(day)
+        )
+
+        return result.mappings().all()
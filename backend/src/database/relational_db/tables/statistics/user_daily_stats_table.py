@@ -0,0 +1,22 @@
+from datetime import date
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy import Date, Integer, SmallInteger
+
+from ..table_base import Base
+from ..mixins import TimestampMixin
+
+
+# Rows per day that signups spread their increments over, so concurrent
+# registrations don't all queue on one row lock. Readers sum them
+REGISTRATION_SLOTS = 16
+
+
+class UserDailyStats(TimestampMixin, Base):
+    """Per-day (UTC) rollup of user counters, maintained incrementally."""
+    __tablename__ = "user_daily_stats"
+
+    day: Mapped[date] = mapped_column(Date, primary_key=True)
+    slot: Mapped[int] = mapped_column(SmallInteger, primary_key=True, default=0, server_default="0")
+    registrations: Mapped[int] = mapped_column(
+        Integer, nullable=False, default=0, server_default="0"
+    )
@@ -0,0 +1,44 @@
+from datetime import timedelta
+from sqlalchemy import Select, func, literal_column, select
+
+GRANULARITIES = ("hour", "day", "week", "month")
+
+
+def _step(granularity: str):
+    if granularity not in GRANULARITIES:
+        raise ValueError(f"Unsupported granularity: {granularity}")
+    return literal_column(f"interval '1 {granularity}'")
+
+
+def bucket_window(granularity: str, tz: str, days: int):
+    """
+    Local (wall-clock in `tz`) bounds of the last `days` days, truncated to
+    `granularity`. Both bounds are `timestamp without time zone`.
+    """
+    _step(granularity)
+    local_now = func.timezone(tz, func.now())
+    start = func.date_trunc(granularity, local_now - timedelta(days=days))
+    end = func.date_trunc(granularity, local_now)
+    return start, end
+
+
+def gap_filled(counts, granularity: str, tz: str, start, end) -> Select:
+    """
+    Left-joins `counts` (columns `bucket` as local timestamp and `count`)
+    onto a `generate_series` of every bucket in `[start, end]`, so empty
+    buckets come back as zero. Buckets are returned as timestamptz.
+    """
+    series = (
+        func.generate_series(start, end, _step(granularity))
+        .table_valued('bucket')
+        .render_derived(name='series')
+    )
+
+    return (
+        select(
+            func.timezone(tz, series.c.bucket).label('bucket'),
+            func.coalesce(counts.c.count, 0).label('count'),
+        )
+        .select_from(series.outerjoin(counts, counts.c.bucket == series.c.bucket))
+        .order_by(series.c.bucket)
+    )
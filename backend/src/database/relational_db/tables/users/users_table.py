@@ -2,7 +2,8 @@ from typing import TYPE_CHECKING
 from uuid import UUID, uuid4
 from datetime import date, datetime
 from sqlalchemy.orm import mapped_column, Mapped, relationship
-from sqlalchemy import ForeignKey, Uuid, String, Boolean, DateTime, Text, Index, Integer, Date
+from sqlalchemy import ForeignKey, Uuid, String, Boolean, DateTime, Text, Index, Integer, Date, text
+from sqlalchemy.dialects.postgresql import JSONB
 
 from ..table_base import Base
 from ..mixins import TimestampMixin
@@ -20,6 +21,8 @@ class User(TimestampMixin, Base):
     # Profile info
     username: Mapped[str | None] = mapped_column(String, nullable=True)
     profile_pic_url: Mapped[str | None] = mapped_column(String, nullable=True)
+    # {"48": {"webp": url, "jpg": url}, ...}, every size of the current picture
+    profile_pic_variants: Mapped[dict[str, dict[str, str]] | None] = mapped_column(JSONB, nullable=True)
     bio: Mapped[str | None] = mapped_column(String, nullable=True)
     birth_date: Mapped[date | None] = mapped_column(Date, nullable=True)
     language_code: Mapped[str | None] = mapped_column(
@@ -32,6 +35,8 @@ class User(TimestampMixin, Base):
     auth_version: Mapped[int] = mapped_column(
         Integer, nullable=False, default=1, server_default="1"
     )
+    # Written behind by `service.users.last_seen`, so it lags by up to a flush interval
+    last_seen_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
 
     __table_args__ = (
         # GIN trigram indexes for fast text search
@@ -47,6 +52,10 @@ class User(TimestampMixin, Base):
             postgresql_using='gin',
             postgresql_ops={'email': 'gin_trgm_ops'}
         ),
+        # Range scans for stats and (created_at, id) keyset pagination
+        Index('users_created_at_id_idx', 'created_at', 'id'),
+        # Matches the admin list's "recently seen first" order and its keyset pagination
+        Index('users_last_seen_at_id_idx', text('last_seen_at DESC NULLS LAST'), text('id DESC')),
     )
     
     roles: Mapped[list["Role"]] = relationship(  # pyright: ignore
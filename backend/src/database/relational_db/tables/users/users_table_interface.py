@@ -1,12 +1,13 @@
 from uuid import UUID
 from datetime import date, datetime, timedelta
 from pydantic import EmailStr
-from sqlalchemy import select, and_, or_, func, delete, insert
+from sqlalchemy import DateTime, Uuid, select, and_, or_, func, delete, insert, update, values, column
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
 from .users_table import User
 from ..roles import Role, UserRole
+from ..time_series import bucket_window, gap_filled
 
 
 class UserInterface:
@@ -38,10 +39,18 @@ class UserInterface:
         *,
         banned: bool | None = None,
         search: str | None = None,
+        seen_after: datetime | None = None,
+        seen_before: datetime | None = None,
+        sort: str = "created_at",
         limit: int = 50,
-        cursor_created_at: datetime | None = None,
+        cursor_at: datetime | None = None,
         cursor_id: UUID | None = None,
     ) -> list[User]:
+        """
+        Newest first by `sort` ("created_at" or "last_seen_at"), then id.
+        Never-seen users come last when sorting by `last_seen_at`; their
+        cursor has no `cursor_at`.
+        """
         stmt = select(User).options(
             selectinload(User.roles)
         )
@@ -51,21 +60,64 @@ class UserInterface:
         if search:
             pattern = f"%{search}%"
             stmt = stmt.where(or_(User.username.ilike(pattern), User.email.ilike(pattern)))
+        if seen_after is not None:
+            stmt = stmt.where(User.last_seen_at >= seen_after)
+        if seen_before is not None:
+            # Includes users never seen at all
+            stmt = stmt.where(or_(User.last_seen_at < seen_before, User.last_seen_at.is_(None)))
 
-        # Cursor pagination (created_at desc, id desc)
-        if cursor_created_at is not None and cursor_id is not None:
-            stmt = stmt.where(
-                or_(
-                    User.created_at < cursor_created_at,
-                    and_(User.created_at == cursor_created_at, User.id < cursor_id),
+        if sort == "last_seen_at":
+            # Cursor pagination (last_seen_at desc nulls last, id desc), served by users_last_seen_at_id_idx
+            if cursor_id is not None:
+                if cursor_at is not None:
+                    stmt = stmt.where(
+                        or_(
+                            User.last_seen_at < cursor_at,
+                            and_(User.last_seen_at == cursor_at, User.id < cursor_id),
+                            User.last_seen_at.is_(None),
+                        )
+                    )
+                else:
+                    stmt = stmt.where(User.last_seen_at.is_(None), User.id < cursor_id)
+            stmt = stmt.order_by(User.last_seen_at.desc().nulls_last(), User.id.desc()).limit(limit)
+        else:
+            # Cursor pagination (created_at desc, id desc)
+            if cursor_at is not None and cursor_id is not None:
+                stmt = stmt.where(
+                    or_(
+                        User.created_at < cursor_at,
+                        and_(User.created_at == cursor_at, User.id < cursor_id),
+                    )
                 )
-            )
-
-        stmt = stmt.order_by(User.created_at.desc(), User.id.desc()).limit(limit)
+            stmt = stmt.order_by(User.created_at.desc(), User.id.desc()).limit(limit)
 
         rows = await self.session.scalars(stmt)
         return list(rows.all())
 
+    async def touch_last_seen(self, seen: dict[UUID, datetime]) -> int:
+        """
+        Moves `last_seen_at` forward for many users in one statement. Older
+        timestamps never overwrite newer ones. Returns the rows updated.
+        """
+        if not seen:
+            return 0
+        rows = values(
+            column('id', Uuid(as_uuid=True)),
+            column('seen_at', DateTime(timezone=True)),
+            name='seen',
+        ).data(sorted(seen.items()))
+        result = await self.session.execute(
+            update(User)
+            .where(
+                User.id == rows.c.id,
+                or_(User.last_seen_at.is_(None), User.last_seen_at < rows.c.seen_at),
+            )
+            # Set explicitly, so the onupdate default doesn't count activity as an edit
+            .values(last_seen_at=rows.c.seen_at, updated_at=User.updated_at)
+            .execution_options(synchronize_session=False)
+        )
+        return result.rowcount or 0
+
     async def assign_roles(self, user: User, roles: list[Role]) -> User:
         await self.session.execute(
             delete(UserRole).where(UserRole.user_id == user.id)
@@ -83,16 +135,20 @@ class UserInterface:
         await self.session.flush()
         return user
 
-    async def registrations_by_days(self, days: int):
-        day = func.date_trunc('day', User.created_at)
-        result = await self.session.execute(
+    async def registrations_series(self, granularity: str, tz: str, days: int):
+        """Gap-filled registrations per `granularity` bucket in the `tz` timezone."""
+        start, end = bucket_window(granularity, tz, days)
+        bucket = func.date_trunc(granularity, func.timezone(tz, User.created_at))
+        counts = (
             select(
-                day.label('day'),
-                func.count(func.distinct(User.id)).label('count')
+                bucket.label('bucket'),
+                func.count(User.id).label('count'),
             )
-            .group_by(day)
-            .order_by(day)
-            .where(User.created_at >= datetime.now() - timedelta(days=days))
+            # Keep the predicate on the bare column so the created_at index is used
+            .where(User.created_at >= func.timezone(tz, start))
+            .group_by(bucket)
+            .subquery()
         )
-        
+
+        result = await self.session.execute(gap_filled(counts, granularity, tz, start, end))
         return result.mappings().all()
@@ -0,0 +1,2 @@
+from .webhooks_table import WebhookSubscription, WebhookDelivery
+from .webhooks_interface import WebhooksInterface
@@ -0,0 +1,200 @@
+from datetime import datetime, timedelta
+from typing import Any, Sequence
+from uuid import UUID, uuid4
+
+from sqlalchemy import delete, func, or_, select, text, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .webhooks_table import WebhookDelivery, WebhookSubscription
+
+
+def _pending():
+    return (WebhookDelivery.delivered_at.is_(None), WebhookDelivery.failed_at.is_(None))
+
+
+def _claimable():
+    return (
+        *_pending(),
+        WebhookDelivery.next_attempt_at <= func.now(),
+        or_(WebhookDelivery.locked_until.is_(None), WebhookDelivery.locked_until <= func.now()),
+    )
+
+
+class WebhooksInterface:
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def list_subscriptions(self) -> list[WebhookSubscription]:
+        rows = await self.session.scalars(
+            select(WebhookSubscription).order_by(WebhookSubscription.created_at)
+        )
+        return list(rows)
+
+    async def get_subscription(self, subscription_id: UUID | str) -> WebhookSubscription | None:
+        return await self.session.get(WebhookSubscription, subscription_id)
+
+    async def add_subscription(self, subscription: WebhookSubscription) -> WebhookSubscription:
+        self.session.add(subscription)
+        await self.session.flush()
+        return subscription
+
+    async def delete_subscription(self, subscription: WebhookSubscription) -> None:
+        await self.session.delete(subscription)
+
+    async def subscribers(self, event_type: str) -> list[UUID]:
+        """Active subscriptions receiving `event_type`."""
+        rows = await self.session.scalars(
+            select(WebhookSubscription.id).where(
+                WebhookSubscription.is_active.is_(True),
+                or_(
+                    func.cardinality(WebhookSubscription.event_types) == 0,
+                    WebhookSubscription.event_types.any(event_type),
+                ),
+            )
+        )
+        return list(rows)
+
+    async def add_deliveries(
+        self,
+        subscription_ids: Sequence[UUID],
+        event_id: UUID,
+        event_type: str,
+        payload: dict[str, Any],
+    ) -> None:
+        if not subscription_ids:
+            return
+        stmt = insert(WebhookDelivery).values([
+            {
+                "subscription_id": subscription_id,
+                "event_id": event_id,
+                "event_type": event_type,
+                "payload": payload,
+            }
+            for subscription_id in subscription_ids
+        ])
+        await self.session.execute(stmt.on_conflict_do_nothing(constraint="webhook_deliveries_event_uq"))
+
+    async def claim_batch(
+        self,
+        subscription: WebhookSubscription,
+        limit: int,
+        lease: timedelta,
+    ) -> tuple[UUID, list[WebhookDelivery]] | None:
+        """
+        Locks up to `limit` due deliveries of a subscription as one batch for
+        `lease`, unless it already has `max_concurrency` batches in flight.
+        Commit right after, so other workers see the claim.
+        """
+        # Claims for one endpoint are made one at a time, so the in-flight count holds
+        await self.session.execute(
+            text("SELECT pg_advisory_xact_lock(hashtext(:key))"),
+            {"key": f"webhook:{subscription.id}"},
+        )
+        in_flight = await self.session.scalar(
+            select(func.count(func.distinct(WebhookDelivery.batch_id))).where(
+                WebhookDelivery.subscription_id == subscription.id,
+                *_pending(),
+                WebhookDelivery.locked_until > func.now(),
+            )
+        )
+        if (in_flight or 0) >= subscription.max_concurrency:
+            return None
+
+        batch_id = uuid4()
+        due = (
+            select(WebhookDelivery.id)
+            .where(WebhookDelivery.subscription_id == subscription.id, *_claimable())
+            .order_by(WebhookDelivery.id)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+            .scalar_subquery()
+        )
+        rows = await self.session.scalars(
+            update(WebhookDelivery)
+            .where(WebhookDelivery.id.in_(due))
+            .values(locked_until=func.now() + lease, batch_id=batch_id)
+            .returning(WebhookDelivery)
+            .execution_options(synchronize_session=False)
+        )
+        deliveries = sorted(rows, key=lambda delivery: delivery.id)
+        if not deliveries:
+            return None
+        return batch_id, deliveries
+
+    async def mark_delivered(self, ids: Sequence[int]) -> None:
+        await self.session.execute(
+            update(WebhookDelivery)
+            .where(WebhookDelivery.id.in_(ids))
+            .values(
+                delivered_at=func.now(),
+                attempts=WebhookDelivery.attempts + 1,
+                locked_until=None,
+                last_error=None,
+            )
+            .execution_options(synchronize_session=False)
+        )
+
+    async def mark_failed(
+        self,
+        ids: Sequence[int],
+        error: str,
+        retry_at: datetime | None,
+    ) -> None:
+        """Schedules another attempt at `retry_at`, or gives up when it is None."""
+        values: dict[str, Any] = {
+            "attempts": WebhookDelivery.attempts + 1,
+            "locked_until": None,
+            "last_error": error,
+        }
+        if retry_at is None:
+            values["failed_at"] = func.now()
+        else:
+            values["next_attempt_at"] = retry_at
+        await self.session.execute(
+            update(WebhookDelivery)
+            .where(WebhookDelivery.id.in_(ids))
+            .values(**values)
+            .execution_options(synchronize_session=False)
+        )
+
+    async def list_deliveries(self, subscription_id: UUID | str, limit: int) -> list[WebhookDelivery]:
+        rows = await self.session.scalars(
+            select(WebhookDelivery)
+            .where(WebhookDelivery.subscription_id == subscription_id)
+            .order_by(WebhookDelivery.id.desc())
+            .limit(limit)
+        )
+        return list(rows)
+
+    async def has_due(self, subscription_id: UUID | str) -> bool:
+        return bool(await self.session.scalar(
+            select(
+                select(WebhookDelivery.id)
+                .where(WebhookDelivery.subscription_id == subscription_id, *_claimable())
+                .exists()
+            )
+        ))
+
+    async def subscriptions_with_due(self) -> list[UUID]:
+        """Active subscriptions with deliveries waiting for a retry or a lost claim."""
+        rows = await self.session.scalars(
+            select(WebhookSubscription.id).where(
+                WebhookSubscription.is_active.is_(True),
+                select(WebhookDelivery.id)
+                .where(WebhookDelivery.subscription_id == WebhookSubscription.id, *_claimable())
+                .exists(),
+            )
+        )
+        return list(rows)
+
+    async def prune(self, delivered_before: datetime, failed_before: datetime) -> int:
+        result = await self.session.execute(
+            delete(WebhookDelivery).where(
+                or_(
+                    WebhookDelivery.delivered_at < delivered_before,
+                    WebhookDelivery.failed_at < failed_before,
+                )
+            )
+        )
+        return result.rowcount or 0
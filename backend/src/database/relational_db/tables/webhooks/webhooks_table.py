@@ -0,0 +1,82 @@
+from uuid import UUID, uuid4
+from datetime import datetime
+from typing import Any
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy import (
+    ARRAY,
+    BigInteger,
+    Boolean,
+    DateTime,
+    ForeignKey,
+    Identity,
+    Index,
+    Integer,
+    String,
+    Text,
+    UniqueConstraint,
+    Uuid,
+    func,
+    text,
+)
+from sqlalchemy.dialects.postgresql import JSONB
+
+from ..table_base import Base
+from ..mixins import CreatedAtMixin, TimestampMixin
+
+
+class WebhookSubscription(TimestampMixin, Base):
+    """An endpoint receiving batches of events, signed with its `secret`."""
+    __tablename__ = "webhook_subscriptions"
+
+    id: Mapped[UUID] = mapped_column(Uuid(as_uuid=True), default=uuid4, primary_key=True)
+    url: Mapped[str] = mapped_column(String(2048), nullable=False)
+    secret: Mapped[str] = mapped_column(String(128), nullable=False)
+    # Empty means every event type
+    event_types: Mapped[list[str]] = mapped_column(
+        ARRAY(String(64)), nullable=False, default=list, server_default="{}"
+    )
+    description: Mapped[str | None] = mapped_column(Text, nullable=True)
+    is_active: Mapped[bool] = mapped_column(
+        Boolean, nullable=False, default=True, server_default="true"
+    )
+    # Requests in flight to this endpoint at once, across all workers
+    max_concurrency: Mapped[int] = mapped_column(
+        Integer, nullable=False, default=2, server_default="2"
+    )
+
+
+class WebhookDelivery(CreatedAtMixin, Base):
+    """One event due to one subscription, until it is delivered or given up on."""
+    __tablename__ = "webhook_deliveries"
+
+    id: Mapped[int] = mapped_column(BigInteger, Identity(), primary_key=True)
+    subscription_id: Mapped[UUID] = mapped_column(
+        Uuid(as_uuid=True),
+        ForeignKey("webhook_subscriptions.id", ondelete="CASCADE"),
+        nullable=False,
+    )
+    event_id: Mapped[UUID] = mapped_column(Uuid(as_uuid=True), nullable=False)
+    event_type: Mapped[str] = mapped_column(String(64), nullable=False)
+    payload: Mapped[dict[str, Any]] = mapped_column(JSONB, nullable=False)
+
+    attempts: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
+    next_attempt_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), nullable=False, server_default=func.now()
+    )
+    # Set while a worker is sending it; a claim that runs out is sent again
+    locked_until: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    batch_id: Mapped[UUID | None] = mapped_column(Uuid(as_uuid=True), nullable=True)
+    delivered_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    failed_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    last_error: Mapped[str | None] = mapped_column(Text, nullable=True)
+
+    __table_args__ = (
+        # Fan-out may run twice for the same event
+        UniqueConstraint("subscription_id", "event_id", name="webhook_deliveries_event_uq"),
+        # Only undelivered rows are ever scanned
+        Index(
+            "webhook_deliveries_pending_idx",
+            "subscription_id", "next_attempt_at",
+            postgresql_where=text("delivered_at IS NULL AND failed_at IS NULL"),
+        ),
+    )
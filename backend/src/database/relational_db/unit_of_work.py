@@ -1,23 +1,55 @@
+from typing import Any
+
+from sqlalchemy import text
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from core.config import Settings
+from .tables.outbox import OutboxEvent
+
+config = Settings() # pyright: ignore[reportCallIssue]
+
+# Wakes the outbox relay when a transaction with events commits
+OUTBOX_CHANNEL = "outbox"
+
 
 class UoW:
     """Unit-of-Work: single transaction, single session."""
     def __init__(self, session: AsyncSession):
         self.session = session
         self._committed = False
+        self._events: list[OutboxEvent] = []
 
     async def __aenter__(self):
         return self
 
     async def __aexit__(self, exc_type, *_):
         if exc_type is None and not self._committed:
+            await self._write_events()
             await self.session.commit()
         elif exc_type is not None:
+            self._events.clear()
             await self.session.rollback()
 
+    def add_event(self, event_type: str, data: dict[str, Any]) -> None:
+        """
+        Records a domain event. It is written to the outbox with the next
+        commit and published by the relay after it; a rollback drops it.
+        `data` must be JSON-serializable.
+        """
+        self._events.append(OutboxEvent(event_type=event_type, payload=data))
+
+    async def _write_events(self) -> None:
+        if not self._events:
+            return
+        self.session.add_all(self._events)
+        self._events = []
+        if config.OUTBOX_NOTIFY:
+            # Delivered on commit only, and once however many events there are
+            await self.session.execute(text(f"SELECT pg_notify('{OUTBOX_CHANNEL}', '{{}}')"))
+
     async def commit(self):
         """Manually commit the current transaction and start a new one."""
+        await self._write_events()
         await self.session.commit()
         self._committed = True
         # Start a new transaction for any subsequent operations
@@ -0,0 +1 @@
+from .jobs import ScheduledJob
@@ -0,0 +1,19 @@
+from datetime import datetime
+from pydantic import BaseModel, Field
+
+
+class ScheduledJob(BaseModel):
+    id: str = Field(...)
+    trigger: str = Field(...)
+    next_run_at: datetime | None = Field(None, description="Null while the job is paused")
+    last_run_at: datetime | None = Field(None)
+    last_outcome: str | None = Field(None, description="success or error")
+    last_duration: float | None = Field(None, description="In seconds")
+    last_lag: float | None = Field(None, description="Seconds the last run started behind schedule")
+    last_error: str | None = Field(None)
+    last_overlap_skip_at: datetime | None = Field(None)
+    last_miss_at: datetime | None = Field(None)
+    runs: int = Field(0, description="Successful runs")
+    failures: int = Field(0)
+    overlap_skips: int = Field(0, description="Runs skipped because the previous one hadn't finished")
+    misses: int = Field(0, description="Runs skipped for starting later than the misfire grace time")
@@ -1 +1,2 @@
 from .interactions import Interaction
+from .granularity import Granularity
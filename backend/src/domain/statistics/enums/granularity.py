@@ -0,0 +1,9 @@
+from enum import StrEnum
+
+
+class Granularity(StrEnum):
+    """Time bucket size for statistics graphs"""
+    HOUR = "hour"
+    DAY = "day"
+    WEEK = "week"
+    MONTH = "month"
@@ -1,2 +1,2 @@
-from .user_graphs import ActiveUsersGraph, RegistrationsGraph
-from .book_graphs import BookStatsGraph
+from .user_graphs import ActiveUserCounts, ActiveUsersGraph, RegistrationsGraph
+from .interactions import InteractionIn, InteractionsIn, InteractionsAccepted
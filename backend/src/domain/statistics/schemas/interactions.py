@@ -0,0 +1,16 @@
+from pydantic import BaseModel, Field
+
+from ..enums import Interaction
+
+
+class InteractionIn(BaseModel):
+    interaction: Interaction = Field(...)
+    target_id: str = Field(..., min_length=1, max_length=64, description="Id of the book interacted with")
+
+
+class InteractionsIn(BaseModel):
+    events: list[InteractionIn] = Field(..., min_length=1, max_length=100)
+
+
+class InteractionsAccepted(BaseModel):
+    accepted: int = Field(..., description="Events queued; the rest were dropped under load")
@@ -1,10 +1,21 @@
-from datetime import date
-from pydantic import BaseModel, Field
+from datetime import date, datetime
+from pydantic import BaseModel, Field, computed_field
 
 class ActiveUsersGraph(BaseModel):
     day: date = Field(...)
     count: int = Field(...)
 
+class ActiveUserCounts(BaseModel):
+    day: date = Field(..., description="UTC day")
+    dau: int = Field(..., description="Distinct users active on the day")
+    wau: int = Field(..., description="Distinct users active in the 7 days ending on the day")
+    mau: int = Field(..., description="Distinct users active in the 30 days ending on the day")
+
 class RegistrationsGraph(BaseModel):
-    day: date = Field(...)
+    bucket: datetime = Field(..., description="Bucket start in the requested timezone")
     count: int = Field(...)
+
+    @computed_field(description="Date of the bucket start in the requested timezone")
+    @property
+    def day(self) -> date:
+        return self.bucket.date()
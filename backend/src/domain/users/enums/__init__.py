@@ -1 +1,2 @@
 from .genders import Gender
+from .sorting import UserSort
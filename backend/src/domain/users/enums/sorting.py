@@ -0,0 +1,7 @@
+from enum import StrEnum
+
+
+class UserSort(StrEnum):
+    """Admin user list order, newest first"""
+    CREATED_AT = "created_at"
+    LAST_SEEN_AT = "last_seen_at"
@@ -1,2 +1,3 @@
 from .profile import UserModel, UserPatch, UserRolesUpdate
 from .shareable import UserShare, UserBrief
+from .picture import PictureUploadForm, PictureUploadConfirm
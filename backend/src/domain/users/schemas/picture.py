@@ -0,0 +1,16 @@
+from pydantic import BaseModel, Field
+
+
+class PictureUploadForm(BaseModel):
+    """
+    Presigned form for uploading a picture straight to storage: POST `fields`
+    followed by the file (as `file`) to `url`, then confirm with `key`.
+    """
+    url: str = Field(...)
+    fields: dict[str, str] = Field(default_factory=dict)
+    key: str = Field(..., description="Pass to the confirm endpoint after uploading")
+    expires_in: int = Field(..., description="Seconds the form stays valid")
+
+
+class PictureUploadConfirm(BaseModel):
+    key: str = Field(...)
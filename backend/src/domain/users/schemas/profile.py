@@ -1,6 +1,6 @@
 from typing import Annotated
 from pydantic import BaseModel, ConfigDict, Field, EmailStr, HttpUrl, constr
-from datetime import date
+from datetime import date, datetime
 from uuid import UUID
 
 from domain.common import TimestampModel
@@ -15,11 +15,15 @@ class UserModel(TimestampModel):
     
     username: str | None = Field(None, description="User's display name")
     profile_pic_url: HttpUrl | None = Field(None)
+    profile_pic_variants: dict[str, dict[str, HttpUrl]] | None = Field(
+        None, description="Picture URLs by square size in px, then format (webp, jpg)"
+    )
     bio: str | None = Field(None)
     language_code: Annotated[str, constr(min_length=2, max_length=2)] | None = Field(None)
     
     is_onboarded: bool
     banned: bool
+    last_seen_at: datetime | None = Field(None, description="Last authenticated request, accurate to about a minute")
     
     # TODO: Make this field returned only when ?expand=roles
     # Roles list is intentionally optional so it is omitted unless expansion is requested.
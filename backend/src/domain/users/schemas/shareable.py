@@ -11,6 +11,9 @@ class UserShare(BaseModel):
     
     username: str | None = Field(None, description="User's display name")
     profile_pic_url: HttpUrl | None = Field(None)
+    profile_pic_variants: dict[str, dict[str, HttpUrl]] | None = Field(
+        None, description="Picture URLs by square size in px, then format (webp, jpg)"
+    )
     bio: str | None = Field(None)
     language_code: Annotated[str, constr(min_length=2, max_length=2)] | None = Field(None)
 
@@ -18,3 +21,6 @@ class UserBrief(BaseModel):
     id: UUID = Field(...)
     username: str | None = Field(None, description="User's display name")
     profile_pic_url: HttpUrl | None = Field(None)
+    profile_pic_variants: dict[str, dict[str, HttpUrl]] | None = Field(
+        None, description="Picture URLs by square size in px, then format (webp, jpg)"
+    )
@@ -0,0 +1,2 @@
+from .schemas import *
+from .enums import *
@@ -0,0 +1,11 @@
+from enum import Enum
+
+
+class WebhookEventType(Enum):
+    """Events endpoints can subscribe to"""
+    PING = "ping"
+    USER_REGISTERED = "user.registered"
+    USER_UPDATED = "user.updated"
+    USER_BANNED = "user.banned"
+    USER_UNBANNED = "user.unbanned"
+    USER_ROLES_UPDATED = "user.roles_updated"
@@ -0,0 +1 @@
+from .subscriptions import WebhookCreate, WebhookPatch, WebhookModel, WebhookCreated, WebhookDeliveryModel
@@ -0,0 +1,44 @@
+from datetime import datetime
+from uuid import UUID
+from pydantic import BaseModel, Field, HttpUrl
+
+from ..enums import WebhookEventType
+
+
+class WebhookCreate(BaseModel):
+    url: HttpUrl = Field(...)
+    event_types: list[WebhookEventType] = Field(
+        default_factory=list, description="Empty to receive every event"
+    )
+    description: str | None = Field(None, max_length=1024)
+    max_concurrency: int = Field(2, ge=1, le=32, description="Requests in flight to the endpoint at once")
+
+class WebhookPatch(BaseModel):
+    url: HttpUrl | None = Field(None)
+    event_types: list[WebhookEventType] | None = Field(None)
+    description: str | None = Field(None, max_length=1024)
+    max_concurrency: int | None = Field(None, ge=1, le=32)
+    is_active: bool | None = Field(None)
+
+class WebhookModel(BaseModel):
+    id: UUID = Field(...)
+    url: str = Field(...)
+    event_types: list[str] = Field(...)
+    description: str | None = Field(None)
+    is_active: bool = Field(...)
+    max_concurrency: int = Field(...)
+    created_at: datetime = Field(...)
+
+class WebhookCreated(WebhookModel):
+    secret: str = Field(..., description="Signing secret; only shown once")
+
+class WebhookDeliveryModel(BaseModel):
+    id: int = Field(...)
+    event_id: UUID = Field(...)
+    event_type: str = Field(...)
+    attempts: int = Field(...)
+    next_attempt_at: datetime = Field(...)
+    delivered_at: datetime | None = Field(None)
+    failed_at: datetime | None = Field(None)
+    last_error: str | None = Field(None)
+    created_at: datetime = Field(...)
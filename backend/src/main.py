@@ -1,27 +1,65 @@
+import logging
+
 from fastapi import FastAPI
-from fastapi.staticfiles import StaticFiles
-from fastapi_limiter import FastAPILimiter
+from prometheus_client import start_http_server
 from contextlib import asynccontextmanager
 from starlette.middleware.cors import CORSMiddleware
 
 from api import get_api_routers
+from api.media import get_media_router
 from webhooks import get_webhooks
 from core.config import Settings, configure_logging
-from database.redis import get_redis
-# from scheduler import init_scheduler
+from core.cache_invalidation import get_db_invalidation_listener
+from core.middlewares import AdmissionControlMiddleware, MetricsMiddleware, RouteClass
+from service.users.pictures import shutdown_picture_pool
+from service.statistics import get_interaction_buffer
+from service.users import get_last_seen_tracker
+from database.media import get_media_storage
+from database.redis import REDIS_FAILURES, get_binary_redis, get_invalidation_bus, get_redis, get_redis_breaker
+from scheduler import get_scheduler
 
 
 config = Settings() # pyright: ignore[reportCallIssue]
 configure_logging()
+logger = logging.getLogger(__name__)
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     redis = get_redis()
+    bus = get_invalidation_bus()
+    db_listener = get_db_invalidation_listener()
+    scheduler = get_scheduler()
+    interactions = get_interaction_buffer()
+    last_seen = get_last_seen_tracker()
+    # Not a route: the app's port is public (Fly serves it directly), this one isn't
+    metrics_server = start_http_server(config.METRICS_PORT)[0] if config.METRICS_PORT else None
     try:
-        await FastAPILimiter.init(redis)
+        # Redis is optional at startup: requests run degraded until it answers
+        try:
+            await get_redis_breaker().call(redis.ping)
+        except REDIS_FAILURES:
+            logger.warning("Redis is unavailable, starting in degraded mode")
+        await bus.start()
+        await db_listener.start()
+        await interactions.start()
+        await last_seen.start()
+        if config.SCHEDULER_ENABLED:
+            # Runs jobs only while this process holds the leader lease
+            scheduler.start()
         yield
     finally:
+        if metrics_server is not None:
+            metrics_server.shutdown()
+        await scheduler.stop()
+        # Flushes what is buffered while the database is still reachable
+        await interactions.stop()
+        await last_seen.stop()
+        await db_listener.stop()
+        await bus.stop()
+        shutdown_picture_pool()
+        await get_media_storage().close()
         await redis.aclose()
+        await get_binary_redis().aclose()
 
 
 app = FastAPI(
@@ -30,12 +68,10 @@ app = FastAPI(
     debug=config.DEBUG if config.DEBUG is not None else config.APP_STAGE == "dev"
 )
 
-# Mount static
-# app.mount('/media', StaticFiles(directory=config.MEDIA_DIR, check_dir=False), 'media')
-
 # Including routers
 app.include_router(get_api_routers())
 app.include_router(get_webhooks())
+app.include_router(get_media_router())
 
 @app.get('/')
 @app.get('/ping')
@@ -45,6 +81,39 @@ async def ping():
 
 # Adding middlewares
 
+# Per route class concurrency limits and statement timeouts; overflow gets a fast 503
+app.add_middleware(
+    AdmissionControlMiddleware,
+    route_classes=[
+        # argon2 hashing makes these slow and CPU bound by design
+        RouteClass(
+            'auth', prefixes=('/api/v1/auth',),
+            initial_limit=16, max_limit=64, target_latency=1.0, statement_timeout_ms=2_000,
+        ),
+        RouteClass(
+            'admin', prefixes=('/api/v1/admins',),
+            initial_limit=16, max_limit=64, target_latency=1.0, statement_timeout_ms=5_000,
+        ),
+        # Bodies move at the client's pace: these hold a slot for long and their
+        # latency says nothing about load. Fixed limits, apart from the default class
+        RouteClass(
+            'transfers', prefixes=('/api/v1/users/me/picture', '/media/'),
+            initial_limit=64, adaptive=False, statement_timeout_ms=3_000,
+        ),
+        RouteClass(
+            'ingest', prefixes=('/api/v1/interactions',),
+            initial_limit=256, adaptive=False, statement_timeout_ms=3_000,
+        ),
+    ],
+    default=RouteClass(
+        'default', initial_limit=256, max_limit=1024, target_latency=0.25, statement_timeout_ms=3_000,
+    ),
+)
+
+# Outermost, so requests shed by admission control are measured too. Always on:
+# query budgets rely on its per-request statement counts, even with METRICS_PORT=0
+app.add_middleware(MetricsMiddleware, server_timing=config.APP_STAGE == 'dev')
+
 # Optional CORS; enable only when calling API directly, without proxy
 # def _parse_csv(value: str) -> list[str]:
 #     if not value:
@@ -23,9 +23,15 @@ if config.config_file_name is not None:
 # from myapp import mymodel
 # target_metadata = mymodel.Base.metadata
 from database.relational_db import Base
+from database.relational_db.tables.interactions.interactions_interface import PARTITION_PREFIX
 
 target_metadata = Base.metadata
 
+
+def include_object(object, name, type_, reflected, compare_to) -> bool:
+    # Daily partitions are created and dropped at runtime, not by migrations
+    return not (type_ == "table" and reflected and name.startswith(PARTITION_PREFIX))
+
 settings = Settings() # pyright: ignore[reportCallIssue]
 
 config.set_main_option("sqlalchemy.url", settings.DATABASE_URL)
@@ -53,6 +59,7 @@ def run_migrations_offline() -> None:
     context.configure(
         url=url,
         target_metadata=target_metadata,
+        include_object=include_object,
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
     )
@@ -62,7 +69,7 @@ def run_migrations_offline() -> None:
 
 
 def do_run_migrations(connection: Connection) -> None:
-    context.configure(connection=connection, target_metadata=target_metadata)
+    context.configure(connection=connection, target_metadata=target_metadata, include_object=include_object)
 
     with context.begin_transaction():
         context.run_migrations()
@@ -0,0 +1,44 @@
+"""user daily stats rollup
+
+Revision ID: 3c9d2e71b0a4
+Revises: a629654c84b7
+Create Date: 2026-10-19 10:12:40.118204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3c9d2e71b0a4'
+down_revision: Union[str, Sequence[str], None] = 'a629654c84b7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('user_daily_stats',
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('registrations', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.PrimaryKeyConstraint('day')
+    )
+
+    # Backfill from existing users, bucketed by UTC day
+    op.execute(
+        """
+        INSERT INTO user_daily_stats (day, registrations)
+        SELECT (created_at AT TIME ZONE 'UTC')::date, count(id)
+        FROM users
+        GROUP BY 1
+        """
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('user_daily_stats')
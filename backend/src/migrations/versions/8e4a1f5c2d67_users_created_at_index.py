@@ -0,0 +1,38 @@
+"""users created_at index
+
+Revision ID: 8e4a1f5c2d67
+Revises: 3c9d2e71b0a4
+Create Date: 2026-10-19 11:02:17.530962
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8e4a1f5c2d67'
+down_revision: Union[str, Sequence[str], None] = '3c9d2e71b0a4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # A btree rather than BRIN: the same index also serves the admin list's
+    # ORDER BY created_at DESC, id DESC keyset pagination, which BRIN can't.
+    # Built concurrently so a large users table isn't locked for writes.
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'users_created_at_id_idx', 'users', ['created_at', 'id'],
+            unique=False, postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'users_created_at_id_idx', table_name='users', postgresql_concurrently=True,
+        )
@@ -0,0 +1,37 @@
+"""partitioned interaction events
+
+Revision ID: a6d1f9c3e27b
+Revises: f3b8d2a6c915
+Create Date: 2026-10-19 20:31:52.604183
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a6d1f9c3e27b'
+down_revision: Union[str, Sequence[str], None] = 'f3b8d2a6c915'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Daily partitions are created at runtime by the `interaction_partitions` job
+    op.create_table(
+        'interaction_events',
+        sa.Column('occurred_at', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('user_id', sa.Uuid(), nullable=False),
+        sa.Column('interaction', sa.String(length=16), nullable=False),
+        sa.Column('target_id', sa.String(length=64), nullable=False),
+        postgresql_partition_by='RANGE (occurred_at)',
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # Drops the partitions with it
+    op.drop_table('interaction_events')
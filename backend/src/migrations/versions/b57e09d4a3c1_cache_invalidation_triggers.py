@@ -0,0 +1,94 @@
+"""cache invalidation triggers
+
+Revision ID: b57e09d4a3c1
+Revises: 8e4a1f5c2d67
+Create Date: 2026-10-19 13:40:02.774315
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b57e09d4a3c1'
+down_revision: Union[str, Sequence[str], None] = '8e4a1f5c2d67'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Payload formats are documented in core/cache_invalidation.py.
+    # Identical payloads within one transaction are collapsed by Postgres.
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION notify_cache_invalidation() RETURNS trigger AS $$
+        DECLARE
+            payload jsonb;
+            target_id uuid;
+            version integer;
+        BEGIN
+            IF TG_TABLE_NAME = 'users' THEN
+                payload := jsonb_build_object('t', 'u', 'id', OLD.id, 'av', OLD.auth_version);
+            ELSIF TG_TABLE_NAME = 'user_roles' THEN
+                IF TG_OP = 'DELETE' THEN
+                    target_id := OLD.user_id;
+                ELSE
+                    target_id := NEW.user_id;
+                END IF;
+                SELECT auth_version INTO version FROM users WHERE id = target_id;
+                payload := jsonb_build_object('t', 'ur', 'id', target_id, 'av', version);
+            ELSE
+                payload := jsonb_build_object('t', 'r', 'id', OLD.id);
+            END IF;
+
+            PERFORM pg_notify('cache_invalidation', payload::text);
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql;
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER users_cache_invalidation
+        AFTER UPDATE ON users
+        FOR EACH ROW
+        WHEN (
+            OLD.auth_version IS DISTINCT FROM NEW.auth_version
+            OR OLD.banned IS DISTINCT FROM NEW.banned
+        )
+        EXECUTE FUNCTION notify_cache_invalidation();
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER users_cache_invalidation_delete
+        AFTER DELETE ON users
+        FOR EACH ROW EXECUTE FUNCTION notify_cache_invalidation();
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER user_roles_cache_invalidation
+        AFTER INSERT OR UPDATE OR DELETE ON user_roles
+        FOR EACH ROW EXECUTE FUNCTION notify_cache_invalidation();
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER roles_cache_invalidation
+        AFTER UPDATE OR DELETE ON roles
+        FOR EACH ROW EXECUTE FUNCTION notify_cache_invalidation();
+        """
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP TRIGGER IF EXISTS roles_cache_invalidation ON roles;")
+    op.execute("DROP TRIGGER IF EXISTS user_roles_cache_invalidation ON user_roles;")
+    op.execute("DROP TRIGGER IF EXISTS users_cache_invalidation_delete ON users;")
+    op.execute("DROP TRIGGER IF EXISTS users_cache_invalidation ON users;")
+    op.execute("DROP FUNCTION IF EXISTS notify_cache_invalidation();")
@@ -0,0 +1,41 @@
+"""users last_seen_at
+
+Revision ID: b9e4c7a2d318
+Revises: a6d1f9c3e27b
+Create Date: 2026-10-19 21:12:40.118274
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b9e4c7a2d318'
+down_revision: Union[str, Sequence[str], None] = 'a6d1f9c3e27b'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Nullable without a default: no table rewrite
+    op.add_column('users', sa.Column('last_seen_at', sa.DateTime(timezone=True), nullable=True))
+    # In the admin list's sort order, so "recently seen first" pages are index scans.
+    # Built concurrently so a large users table isn't locked for writes.
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'users_last_seen_at_id_idx', 'users',
+            [sa.text('last_seen_at DESC NULLS LAST'), sa.text('id DESC')],
+            unique=False, postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'users_last_seen_at_id_idx', table_name='users', postgresql_concurrently=True,
+        )
+    op.drop_column('users', 'last_seen_at')
@@ -0,0 +1,68 @@
+"""skip cache invalidation for roles of new users
+
+Revision ID: c8f2a5d7e610
+Revises: b9e4c7a2d318
+Create Date: 2026-10-19 14:05:11.208734
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c8f2a5d7e610'
+down_revision: Union[str, Sequence[str], None] = 'b9e4c7a2d318'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+FUNCTION = """
+    CREATE OR REPLACE FUNCTION notify_cache_invalidation() RETURNS trigger AS $$
+    DECLARE
+        payload jsonb;
+        target_id uuid;
+        version integer;
+        written_by bigint;
+    BEGIN
+        IF TG_TABLE_NAME = 'users' THEN
+            payload := jsonb_build_object('t', 'u', 'id', OLD.id, 'av', OLD.auth_version);
+        ELSIF TG_TABLE_NAME = 'user_roles' THEN
+            IF TG_OP = 'DELETE' THEN
+                target_id := OLD.user_id;
+            ELSE
+                target_id := NEW.user_id;
+            END IF;
+            SELECT auth_version, xmin::text::bigint INTO version, written_by FROM users WHERE id = target_id;
+            {skip_own_users}
+            payload := jsonb_build_object('t', 'ur', 'id', target_id, 'av', version);
+        ELSE
+            payload := jsonb_build_object('t', 'r', 'id', OLD.id);
+        END IF;
+
+        PERFORM pg_notify('cache_invalidation', payload::text);
+        RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql;
+"""
+
+# A user row written by this same transaction was either just created, so no
+# cache holds it (every signup's role insert), or updated, and then an
+# auth_version bump already notifies through the users trigger. NOTIFY takes a
+# global lock at commit, so skipping it keeps signups from queueing on it.
+SKIP_OWN_USERS = """
+            IF TG_OP = 'INSERT' AND written_by = txid_current() % 4294967296 THEN
+                RETURN NULL;
+            END IF;
+"""
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute(FUNCTION.format(skip_own_users=SKIP_OWN_USERS.strip()))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute(FUNCTION.format(skip_own_users=""))
@@ -0,0 +1,32 @@
+"""user profile picture variants
+
+Revision ID: d41c8e7f9a20
+Revises: b57e09d4a3c1
+Create Date: 2026-10-19 15:24:08.114372
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd41c8e7f9a20'
+down_revision: Union[str, Sequence[str], None] = 'b57e09d4a3c1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        'users',
+        sa.Column('profile_pic_variants', postgresql.JSONB(astext_type=sa.Text()), nullable=True),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('users', 'profile_pic_variants')
@@ -0,0 +1,45 @@
+"""user daily stats slots
+
+Revision ID: d7b3e1f04a92
+Revises: c8f2a5d7e610
+Create Date: 2026-10-19 14:32:57.640193
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd7b3e1f04a92'
+down_revision: Union[str, Sequence[str], None] = 'c8f2a5d7e610'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Existing counts become slot 0 of their day
+    op.add_column(
+        'user_daily_stats',
+        sa.Column('slot', sa.SmallInteger(), server_default='0', nullable=False),
+    )
+    op.drop_constraint('user_daily_stats_pkey', 'user_daily_stats', type_='primary')
+    op.create_primary_key('user_daily_stats_pkey', 'user_daily_stats', ['day', 'slot'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # Folds every day's slots into slot 0
+    op.execute(
+        """
+        INSERT INTO user_daily_stats (day, slot, registrations)
+        SELECT day, 0, sum(registrations) FROM user_daily_stats GROUP BY day
+        ON CONFLICT (day, slot) DO UPDATE SET registrations = EXCLUDED.registrations
+        """
+    )
+    op.execute("DELETE FROM user_daily_stats WHERE slot <> 0")
+    op.drop_constraint('user_daily_stats_pkey', 'user_daily_stats', type_='primary')
+    op.drop_column('user_daily_stats', 'slot')
+    op.create_primary_key('user_daily_stats_pkey', 'user_daily_stats', ['day'])
@@ -0,0 +1,73 @@
+"""webhook subscriptions and deliveries
+
+Revision ID: e7a93c5d1b42
+Revises: d41c8e7f9a20
+Create Date: 2026-10-19 18:02:41.530127
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e7a93c5d1b42'
+down_revision: Union[str, Sequence[str], None] = 'd41c8e7f9a20'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'webhook_subscriptions',
+        sa.Column('id', sa.Uuid(), nullable=False),
+        sa.Column('url', sa.String(length=2048), nullable=False),
+        sa.Column('secret', sa.String(length=128), nullable=False),
+        sa.Column('event_types', postgresql.ARRAY(sa.String(length=64)), server_default='{}', nullable=False),
+        sa.Column('description', sa.Text(), nullable=True),
+        sa.Column('is_active', sa.Boolean(), server_default='true', nullable=False),
+        sa.Column('max_concurrency', sa.Integer(), server_default='2', nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_table(
+        'webhook_deliveries',
+        sa.Column('id', sa.BigInteger(), sa.Identity(), nullable=False),
+        sa.Column('subscription_id', sa.Uuid(), nullable=False),
+        sa.Column('event_id', sa.Uuid(), nullable=False),
+        sa.Column('event_type', sa.String(length=64), nullable=False),
+        sa.Column('payload', postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+        sa.Column('attempts', sa.Integer(), server_default='0', nullable=False),
+        sa.Column('next_attempt_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.Column('locked_until', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('batch_id', sa.Uuid(), nullable=True),
+        sa.Column('delivered_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('failed_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('last_error', sa.Text(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.ForeignKeyConstraint(['subscription_id'], ['webhook_subscriptions.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('subscription_id', 'event_id', name='webhook_deliveries_event_uq'),
+    )
+    op.create_index(
+        'webhook_deliveries_pending_idx',
+        'webhook_deliveries',
+        ['subscription_id', 'next_attempt_at'],
+        unique=False,
+        postgresql_where=sa.text('delivered_at IS NULL AND failed_at IS NULL'),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(
+        'webhook_deliveries_pending_idx',
+        table_name='webhook_deliveries',
+        postgresql_where=sa.text('delivered_at IS NULL AND failed_at IS NULL'),
+    )
+    op.drop_table('webhook_deliveries')
+    op.drop_table('webhook_subscriptions')
@@ -0,0 +1 @@
+from .handlers import OutboxBatch, handlers, outbox_handler
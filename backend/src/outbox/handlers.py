@@ -0,0 +1,41 @@
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from database.relational_db import OutboxEvent
+
+
+@dataclass
+class OutboxBatch:
+    """
+    Events the relay is publishing, with the session of the transaction
+    that marks them published. Handlers may write through `session` to have
+    their rows committed with that mark, and register `after_commit`
+    callbacks for side effects that must only follow a successful commit.
+    """
+    session: AsyncSession
+    events: list[OutboxEvent]
+    _after_commit: list[Callable[[], Awaitable[None]]] = field(default_factory=list)
+
+    def after_commit(self, callback: Callable[[], Awaitable[None]]) -> None:
+        self._after_commit.append(callback)
+
+
+Handler = Callable[[OutboxBatch], Awaitable[None]]
+
+handlers: dict[str, Handler] = {}
+
+
+def outbox_handler(name: str) -> Callable[[Handler], Handler]:
+    """
+    Registers a handler called with every batch the relay publishes. A
+    handler that raises fails the batch, and every handler sees its events
+    again, so handlers must tolerate repeats (events carry a stable id).
+    """
+    def decorator(func: Handler) -> Handler:
+        if name in handlers:
+            raise ValueError(f"Outbox handler {name} is already registered")
+        handlers[name] = func
+        return func
+    return decorator
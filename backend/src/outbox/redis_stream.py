@@ -0,0 +1,23 @@
+import json
+
+from core.config import Settings
+from database.redis import get_redis, get_redis_breaker
+from .handlers import OutboxBatch, outbox_handler
+
+config = Settings() # pyright: ignore[reportCallIssue]
+
+
+@outbox_handler("redis_stream")
+async def add_to_stream(batch: OutboxBatch) -> None:
+    """Adds every event to the `OUTBOX_STREAM` Redis stream, for consumers outside Postgres."""
+    async def add() -> None:
+        async with get_redis().pipeline(transaction=False) as pipe:
+            for event in batch.events:
+                pipe.xadd(
+                    config.OUTBOX_STREAM,
+                    {"id": str(event.event_id), "type": event.event_type, "event": json.dumps(event.envelope())},
+                    maxlen=config.OUTBOX_STREAM_MAX_LEN,
+                    approximate=True,
+                )
+            await pipe.execute()
+    await get_redis_breaker().call(add)
@@ -0,0 +1,209 @@
+"""
+Outbox relay: publishes events committed to the `outbox` table.
+
+    python -m outbox.relay [--concurrency 1]
+
+Each loop claims a batch of due events with FOR UPDATE SKIP LOCKED, hands
+it to every registered handler and marks it published in the same
+transaction, so several relays (and several loops in one) can run side by
+side without publishing an event twice. When a batch fails its events are
+retried one at a time, so one bad event doesn't hold back the rest; events
+still failing are retried with backoff and given up on after
+`OUTBOX_MAX_ATTEMPTS`. Delivery is at least once, and batches from
+parallel relays may be published out of order.
+"""
+import argparse
+import asyncio
+import importlib
+import logging
+import random
+import signal
+from datetime import datetime, timedelta, UTC
+from typing import Awaitable, Callable
+
+from prometheus_client import Counter, Histogram, start_http_server
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.config import Settings, configure_logging
+from database.redis import get_redis
+from database.relational_db import OutboxEvent, OutboxInterface, PgListener, uow_scope
+from database.relational_db.unit_of_work import OUTBOX_CHANNEL
+from .handlers import OutboxBatch, handlers
+
+config = Settings() # pyright: ignore[reportCallIssue]
+logger = logging.getLogger(__name__)
+
+# Modules declaring handlers; imported so their handlers are registered
+HANDLER_MODULES = (
+    "outbox.redis_stream",
+    "webhooks.dispatcher",
+)
+
+MAX_RETRY_DELAY = 60 * 10
+# Kept for inspection this long after they are settled
+PUBLISHED_RETENTION = timedelta(days=3)
+FAILED_RETENTION = timedelta(days=30)
+
+OUTBOX_EVENTS = Counter(
+    "outbox_events_total",
+    "Outbox events by outcome (published, retry, failed)",
+    ["outcome"],
+)
+OUTBOX_LAG = Histogram(
+    "outbox_publish_lag_seconds",
+    "Time from an event's commit to its publication",
+    buckets=(0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 300),
+)
+OUTBOX_BATCH_SIZE = Histogram(
+    "outbox_batch_size",
+    "Events per relayed batch",
+    buckets=(1, 5, 10, 25, 50, 100, 250, 500, 1000),
+)
+
+
+async def _dispatch(session: AsyncSession, events: list[OutboxEvent]) -> list[Callable[[], Awaitable[None]]]:
+    """Runs every handler on the events inside a savepoint; returns their after-commit callbacks."""
+    batch = OutboxBatch(session, events)
+    async with session.begin_nested():
+        for handler in handlers.values():
+            await handler(batch)
+    return batch._after_commit
+
+
+def _retry_at(attempts: int) -> datetime:
+    delay = min(2 ** attempts, MAX_RETRY_DELAY) * random.uniform(0.8, 1.2)
+    return datetime.now(UTC) + timedelta(seconds=delay)
+
+
+async def relay_once(limit: int) -> int:
+    """Publishes one batch. Returns how many events were claimed."""
+    callbacks: list[Callable[[], Awaitable[None]]] = []
+    async with uow_scope() as uow:
+        repo = OutboxInterface(uow.session)
+        events = await repo.claim(limit)
+        if not events:
+            return 0
+
+        published = events
+        try:
+            callbacks = await _dispatch(uow.session, events)
+        except Exception:
+            logger.warning("Outbox batch of %d failed, retrying one by one", len(events), exc_info=True)
+            published = []
+            for event in events:
+                try:
+                    callbacks += await _dispatch(uow.session, [event])
+                except Exception as exc:
+                    give_up = event.attempts + 1 >= config.OUTBOX_MAX_ATTEMPTS
+                    await repo.mark_failed(
+                        event.id, f"{type(exc).__name__}: {exc}", None if give_up else _retry_at(event.attempts),
+                    )
+                    OUTBOX_EVENTS.labels("failed" if give_up else "retry").inc()
+                    logger.error("Outbox event %s (%s) failed", event.event_id, event.event_type, exc_info=True)
+                else:
+                    published.append(event)
+
+        await repo.mark_published([event.id for event in published])
+
+    now = datetime.now(UTC)
+    for event in published:
+        OUTBOX_LAG.observe(max(0.0, (now - event.created_at).total_seconds()))
+    OUTBOX_EVENTS.labels("published").inc(len(published))
+    OUTBOX_BATCH_SIZE.observe(len(events))
+
+    for callback in callbacks:
+        try:
+            await callback()
+        except Exception:
+            logger.exception("Outbox after-commit callback failed")
+    return len(events)
+
+
+class Relay:
+    def __init__(self, *, concurrency: int = 1):
+        self.concurrency = concurrency
+        self._wake = asyncio.Event()
+        self._stopping = asyncio.Event()
+        # Without NOTIFY nothing would arrive: the loops only poll
+        self._listener = (
+            PgListener(OUTBOX_CHANNEL, self._notified, on_reconnect=self._reconnected)
+            if config.OUTBOX_NOTIFY else None
+        )
+
+    async def _notified(self, _payload) -> None:
+        self._wake.set()
+
+    async def _reconnected(self) -> None:
+        self._wake.set()
+
+    async def _loop(self) -> None:
+        backoff = 0.5
+        while not self._stopping.is_set():
+            # Cleared before claiming, so a commit landing meanwhile isn't missed
+            self._wake.clear()
+            try:
+                claimed = await relay_once(config.OUTBOX_BATCH_SIZE)
+                backoff = 0.5
+            except Exception:
+                logger.warning("Outbox relay failed, retrying in %.1fs", backoff, exc_info=True)
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, 30)
+                continue
+            if claimed >= config.OUTBOX_BATCH_SIZE:
+                # Backlog: go straight on
+                continue
+            try:
+                # Polling also picks up retries coming due
+                await asyncio.wait_for(self._wake.wait(), config.OUTBOX_POLL_INTERVAL)
+            except asyncio.TimeoutError:
+                pass
+
+    async def run(self) -> None:
+        if self._listener is not None:
+            await self._listener.start()
+        logger.info("Outbox relay running %d loops, handlers: %s", self.concurrency, ", ".join(handlers))
+        loops = [asyncio.create_task(self._loop()) for _ in range(self.concurrency)]
+        await self._stopping.wait()
+        self._wake.set()
+        # Loops finish the batch they are on
+        await asyncio.gather(*loops, return_exceptions=True)
+        if self._listener is not None:
+            await self._listener.stop()
+
+    def stop(self) -> None:
+        self._stopping.set()
+
+
+async def prune_outbox() -> None:
+    """Scheduler job: deletes settled events past their retention."""
+    now = datetime.now(UTC)
+    async with uow_scope() as uow:
+        removed = await OutboxInterface(uow.session).prune(now - PUBLISHED_RETENTION, now - FAILED_RETENTION)
+    if removed:
+        logger.info("Pruned %d outbox events", removed)
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description="Publish events from the transactional outbox")
+    parser.add_argument("--concurrency", type=int, default=1)
+    args = parser.parse_args()
+
+    configure_logging()
+    for module in HANDLER_MODULES:
+        importlib.import_module(module)
+    if config.OUTBOX_METRICS_PORT:
+        start_http_server(config.OUTBOX_METRICS_PORT)
+
+    relay = Relay(concurrency=args.concurrency)
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, relay.stop)
+
+    try:
+        await relay.run()
+    finally:
+        await get_redis().aclose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -1,27 +1,104 @@
-from apscheduler.schedulers.asyncio import AsyncIOScheduler
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
+
+from core.config import Settings
+from database.redis import get_redis
+from outbox.relay import prune_outbox
+from service.statistics import maintain_partitions
+from service.users.resumable import expire_uploads
+from webhooks.dispatcher import prune_deliveries, wake_due
+from .leader import LeaderLease
+from .monitor import JobMonitor
+from .runner import LeaderScheduler
+
+config = Settings() # pyright: ignore[reportCallIssue]
+
+# Interval jobs count from here, so every process computes the same run times
+EPOCH = datetime(2025, 1, 1, tzinfo=timezone.utc)
 
 
 def example_scheduler():
     pass
 
-def init_scheduler():
+def init_scheduler() -> LeaderScheduler:
     """
     Add all jobs to scheduler
     """
-    scheduler = AsyncIOScheduler()
-    
+    scheduler = LeaderScheduler(
+        LeaderLease(get_redis(), "scheduler:leader", config.SCHEDULER_LEASE_TTL),
+        JobMonitor(get_redis()),
+    )
+
     scheduler.add_job(
         func=example_scheduler,
         trigger="cron",
         minute="*/10",
         id="example",
-        next_run_time=datetime.now() + timedelta(seconds=3),
+        next_run_time=datetime.now(timezone.utc) + timedelta(seconds=3),
         max_instances=1,
         coalesce=True,
         misfire_grace_time=60,
     )
-    
-    # scheduler.start()
 
+    scheduler.add_job(
+        func=expire_uploads,
+        trigger="interval",
+        hours=1,
+        start_date=EPOCH,
+        id="expire_uploads",
+        max_instances=1,
+        coalesce=True,
+        misfire_grace_time=60 * 10,
+    )
+
+    scheduler.add_job(
+        func=wake_due,
+        trigger="interval",
+        seconds=30,
+        start_date=EPOCH,
+        id="webhooks_wake_due",
+        max_instances=1,
+        coalesce=True,
+        misfire_grace_time=30,
+    )
+
+    scheduler.add_job(
+        func=prune_deliveries,
+        trigger="cron",
+        hour=3,
+        minute=30,
+        id="webhooks_prune",
+        max_instances=1,
+        coalesce=True,
+        misfire_grace_time=60 * 60,
+    )
+
+    scheduler.add_job(
+        func=maintain_partitions,
+        trigger="cron",
+        hour="*/6",
+        minute=5,
+        id="interaction_partitions",
+        next_run_time=datetime.now(timezone.utc) + timedelta(seconds=5),
+        max_instances=1,
+        coalesce=True,
+        misfire_grace_time=60 * 60,
+    )
+
+    scheduler.add_job(
+        func=prune_outbox,
+        trigger="cron",
+        hour=3,
+        minute=45,
+        id="outbox_prune",
+        max_instances=1,
+        coalesce=True,
+        misfire_grace_time=60 * 60,
+    )
+
+    return scheduler
+
+
+scheduler = init_scheduler()
+
+def get_scheduler() -> LeaderScheduler:
     return scheduler
@@ -0,0 +1,113 @@
+import asyncio
+import logging
+import os
+import socket
+import time
+from typing import Awaitable, Callable
+from uuid import uuid4
+
+from redis.asyncio import Redis
+
+from database.redis import REDIS_FAILURES, get_redis_breaker
+
+logger = logging.getLogger(__name__)
+
+# Extends the lease only while we still own it
+RENEW_LUA = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('PEXPIRE', KEYS[1], ARGV[2])
+end
+return 0
+"""
+
+RELEASE_LUA = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+
+class LeaderLease:
+    """
+    A Redis key held by one process at a time, renewed every `ttl / 3`.
+
+    The holder considers itself leader until `ttl * 0.8` after its last
+    successful renewal started, so it steps down before the key can expire
+    and be taken by another process, even when Redis stops answering.
+    """
+    def __init__(self, redis: Redis, key: str, ttl: float):
+        self.redis = redis
+        self.key = key
+        self.ttl = ttl
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid4().hex[:8]}"
+        self._held_until = 0.0
+        self._renew = redis.register_script(RENEW_LUA)
+        self._release = redis.register_script(RELEASE_LUA)
+        self._on_change: list[Callable[[bool], Awaitable[None] | None]] = []
+        self._task: asyncio.Task | None = None
+
+    @property
+    def held(self) -> bool:
+        return time.monotonic() < self._held_until
+
+    def on_change(self, callback: Callable[[bool], Awaitable[None] | None]) -> None:
+        """Called with True when the lease is acquired, and False when it is lost."""
+        self._on_change.append(callback)
+
+    async def current_owner(self) -> str | None:
+        return await get_redis_breaker().call(self.redis.get, self.key)
+
+    async def _try_hold(self) -> None:
+        started = time.monotonic()
+        ttl_ms = int(self.ttl * 1000)
+        breaker = get_redis_breaker()
+        try:
+            # Renewing first also recovers a lease we stepped down from but still own
+            ok = await breaker.call(self._renew, keys=[self.key], args=[self.owner, ttl_ms])
+            if not ok:
+                ok = await breaker.call(self.redis.set, self.key, self.owner, nx=True, px=ttl_ms)
+        except REDIS_FAILURES:
+            logger.warning("Failed to renew leader lease %s", self.key)
+            return
+        if ok:
+            self._held_until = started + self.ttl * 0.8
+        else:
+            self._held_until = 0.0
+
+    async def _notify(self, held: bool) -> None:
+        for callback in self._on_change:
+            try:
+                result = callback(held)
+                if asyncio.iscoroutine(result):
+                    await result
+            except Exception:
+                logger.exception("Leader lease callback failed")
+
+    async def _run(self) -> None:
+        was_held = False
+        while True:
+            await self._try_hold()
+            if self.held != was_held:
+                was_held = self.held
+                logger.info("%s leader lease %s", "Acquired" if was_held else "Lost", self.key)
+                await self._notify(was_held)
+            await asyncio.sleep(self.ttl / 3)
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        if self.held:
+            self._held_until = 0.0
+            await self._notify(False)
+            # Hand over right away instead of making the next leader wait for expiry
+            try:
+                await get_redis_breaker().call(self._release, keys=[self.key], args=[self.owner])
+            except REDIS_FAILURES:
+                pass
@@ -0,0 +1,119 @@
+import asyncio
+import logging
+import time
+from datetime import datetime, timezone
+
+from prometheus_client import Counter, Gauge, Histogram
+from redis.asyncio import Redis
+
+from database.redis import REDIS_FAILURES, get_redis_breaker
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = "scheduler:job"
+
+# Skip outcome -> (counter, timestamp field) in the job's hash
+SKIP_FIELDS = {
+    "skipped_overlap": ("overlap_skips", "last_overlap_skip_at"),
+    "missed": ("misses", "last_miss_at"),
+}
+
+# Outcomes: success, error, skipped_overlap, missed, already_run, not_leader
+JOB_RUNS = Counter(
+    "scheduler_job_runs_total",
+    "Scheduled job runs by outcome",
+    ["job", "outcome"],
+)
+JOB_DURATION = Histogram(
+    "scheduler_job_duration_seconds",
+    "Time spent running a scheduled job",
+    ["job"],
+    buckets=(0.01, 0.05, 0.1, 0.5, 1, 5, 10, 30, 60, 300, 900),
+)
+JOB_LAG = Histogram(
+    "scheduler_job_lag_seconds",
+    "Time from when a job was scheduled to run to when it started",
+    ["job"],
+    buckets=(0.01, 0.05, 0.1, 0.5, 1, 5, 10, 30, 60, 300),
+)
+SCHEDULER_LEADER = Gauge(
+    "scheduler_leader",
+    "1 while this process holds the scheduler lease",
+)
+
+
+class JobMonitor:
+    """
+    Records scheduled job runs as Prometheus metrics, and as a Redis hash
+    per job (`scheduler:job:{id}`), so the last runs can be looked up from
+    any process whichever one is the leader.
+    """
+    def __init__(self, redis: Redis):
+        self.redis = redis
+        self._scheduled: dict[str, datetime] = {}
+        self._writes: set[asyncio.Task] = set()
+
+    @staticmethod
+    def key(job_id: str) -> str:
+        return f"{KEY_PREFIX}:{job_id}"
+
+    async def _write(self, job_id: str, fields: dict[str, str | float], counter: str) -> None:
+        async def write() -> None:
+            async with self.redis.pipeline(transaction=True) as pipe:
+                if fields:
+                    pipe.hset(self.key(job_id), mapping=fields)
+                pipe.hincrby(self.key(job_id), counter, 1)
+                await pipe.execute()
+        try:
+            await get_redis_breaker().call(write)
+        except REDIS_FAILURES:
+            # Metrics still have it; only the stored history misses a run
+            logger.warning("Failed to record run of job %s", job_id)
+
+    def _write_later(self, job_id: str, fields: dict[str, str | float], counter: str) -> None:
+        write = asyncio.create_task(self._write(job_id, fields, counter))
+        self._writes.add(write)
+        write.add_done_callback(self._writes.discard)
+
+    def submitted(self, job_id: str, scheduled_at: datetime) -> None:
+        self._scheduled[job_id] = scheduled_at
+
+    def scheduled_at(self, job_id: str) -> datetime | None:
+        return self._scheduled.get(job_id)
+
+    def lag(self, job_id: str) -> float:
+        """Seconds the run that is starting now is behind its scheduled time."""
+        scheduled_at = self._scheduled.pop(job_id, None)
+        if scheduled_at is None:
+            return 0.0
+        lag = max(0.0, (datetime.now(timezone.utc) - scheduled_at).total_seconds())
+        JOB_LAG.labels(job_id).observe(lag)
+        return lag
+
+    async def finished(self, job_id: str, lag: float, duration: float, error: str | None) -> None:
+        outcome = "error" if error else "success"
+        JOB_RUNS.labels(job_id, outcome).inc()
+        JOB_DURATION.labels(job_id).observe(duration)
+        fields: dict[str, str | float] = {
+            "last_run_at": time.time(),
+            "last_outcome": outcome,
+            "last_duration": round(duration, 6),
+            "last_lag": round(lag, 6),
+        }
+        if error:
+            fields["last_error"] = error
+        await self._write(job_id, fields, "failures" if error else "runs")
+
+    def skipped(self, job_id: str, outcome: str) -> None:
+        """An overlap or misfire skip, reported by the scheduler."""
+        JOB_RUNS.labels(job_id, outcome).inc()
+        counter, last_at = SKIP_FIELDS[outcome]
+        self._write_later(job_id, {last_at: time.time()}, counter)
+
+    async def history(self, job_ids: list[str]) -> dict[str, dict[str, str]]:
+        async def read() -> list[dict[str, str]]:
+            async with self.redis.pipeline(transaction=False) as pipe:
+                for job_id in job_ids:
+                    pipe.hgetall(self.key(job_id))
+                return await pipe.execute()
+        return dict(zip(job_ids, await get_redis_breaker().call(read)))
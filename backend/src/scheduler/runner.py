@@ -0,0 +1,136 @@
+import asyncio
+import functools
+import inspect
+import logging
+import time
+from datetime import datetime, timezone
+from typing import Any, Callable
+
+from apscheduler.events import (
+    EVENT_JOB_MAX_INSTANCES,
+    EVENT_JOB_MISSED,
+    EVENT_JOB_SUBMITTED,
+    JobEvent,
+)
+from apscheduler.schedulers.asyncio import AsyncIOScheduler
+
+from database.redis import REDIS_FAILURES, get_redis_breaker
+from .leader import LeaderLease
+from .monitor import JOB_RUNS, SCHEDULER_LEADER, JobMonitor
+
+logger = logging.getLogger(__name__)
+
+# Runs claimed by a leader are remembered this long, in seconds
+CLAIM_TTL = 60 * 60 * 24
+
+
+class LeaderScheduler:
+    """
+    An `AsyncIOScheduler` started in every API process but only resumed in
+    the one holding the leader lease, so each job runs once across replicas.
+
+    Around a handover a run may be due on both the old and the new leader;
+    runs are also claimed in Redis by their scheduled time, which settles
+    that for jobs whose triggers give the same times everywhere (cron jobs,
+    and interval jobs with a fixed `start_date`). A leader that loses the
+    lease lets jobs already running finish.
+    """
+    def __init__(self, lease: LeaderLease, monitor: JobMonitor):
+        self.lease = lease
+        self.monitor = monitor
+        self.scheduler = AsyncIOScheduler(timezone=timezone.utc)
+        self.scheduler.add_listener(
+            self._on_event, EVENT_JOB_SUBMITTED | EVENT_JOB_MAX_INSTANCES | EVENT_JOB_MISSED,
+        )
+        self._leader_since: datetime | None = None
+
+    def add_job(self, func: Callable[..., Any], *, id: str, **kwargs) -> None:
+        self.scheduler.add_job(self._instrument(id, func), id=id, name=id, **kwargs)
+
+    def _on_event(self, event: JobEvent) -> None:
+        if event.code == EVENT_JOB_SUBMITTED:
+            self.monitor.submitted(event.job_id, event.scheduled_run_times[-1])  # type: ignore[attr-defined]
+        elif event.code == EVENT_JOB_MAX_INSTANCES:
+            self.monitor.skipped(event.job_id, "skipped_overlap")
+        elif event.code == EVENT_JOB_MISSED:
+            # Runs due while another process was leader weren't ours to make
+            scheduled_at = event.scheduled_run_time  # type: ignore[attr-defined]
+            if self._leader_since is not None and scheduled_at >= self._leader_since:
+                self.monitor.skipped(event.job_id, "missed")
+
+    async def _claim(self, job_id: str) -> bool:
+        """Whether no other leader has run this job's current run yet."""
+        scheduled_at = self.monitor.scheduled_at(job_id)
+        if scheduled_at is None:
+            return True
+        key = f"{self.monitor.key(job_id)}:run:{int(scheduled_at.timestamp())}"
+        try:
+            return bool(await get_redis_breaker().call(
+                self.lease.redis.set, key, self.lease.owner, nx=True, ex=CLAIM_TTL,
+            ))
+        except REDIS_FAILURES:
+            # We held the lease a moment ago; running twice beats not running
+            return True
+
+    def _instrument(self, job_id: str, func: Callable[..., Any]) -> Callable[..., Any]:
+        @functools.wraps(func)
+        async def run(*args, **kwargs) -> Any:
+            if not self.lease.held:
+                JOB_RUNS.labels(job_id, "not_leader").inc()
+                return None
+            if not await self._claim(job_id):
+                JOB_RUNS.labels(job_id, "already_run").inc()
+                return None
+
+            lag = self.monitor.lag(job_id)
+            started = time.perf_counter()
+            error = None
+            try:
+                if inspect.iscoroutinefunction(func):
+                    return await func(*args, **kwargs)
+                return await asyncio.to_thread(func, *args, **kwargs)
+            except asyncio.CancelledError:
+                error = "Cancelled on shutdown"
+                raise
+            except Exception as exc:
+                error = f"{type(exc).__name__}: {exc}"
+                raise
+            finally:
+                await self.monitor.finished(job_id, lag, time.perf_counter() - started, error)
+        return run
+
+    def _on_leadership(self, held: bool) -> None:
+        SCHEDULER_LEADER.set(1 if held else 0)
+        if held:
+            self._leader_since = datetime.now(timezone.utc)
+            self.scheduler.resume()
+        else:
+            self._leader_since = None
+            self.scheduler.pause()
+
+    def start(self) -> None:
+        self.scheduler.start(paused=True)
+        self.lease.on_change(self._on_leadership)
+        self.lease.start()
+
+    async def stop(self) -> None:
+        await self.lease.stop()
+        if self.scheduler.running:
+            self.scheduler.shutdown(wait=False)
+
+    async def jobs(self) -> list[dict[str, Any]]:
+        """Every job with its next run and what was recorded of its last runs."""
+        jobs = self.scheduler.get_jobs()
+        try:
+            history = await self.monitor.history([job.id for job in jobs])
+        except REDIS_FAILURES:
+            history = {}
+        return [
+            {
+                "id": job.id,
+                "trigger": str(job.trigger),
+                "next_run_at": job.next_run_time,
+                **history.get(job.id, {}),
+            }
+            for job in jobs
+        ]
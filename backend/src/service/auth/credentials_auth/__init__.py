@@ -4,6 +4,7 @@ from fastapi import Depends, Request
 from database.relational_db import (
     RolesInterface,
     UoW,
+    UserDailyStatsInterface,
     UserInterface,
     get_uow,
 )
@@ -17,10 +18,12 @@ async def get_credentials_service(
 ) -> CredentialsService:
     user_repo = UserInterface(uow.session)
     role_repo = RolesInterface(uow.session)
+    daily_repo = UserDailyStatsInterface(uow.session)
 
     return CredentialsService(
         uow,
         user_repo,
         role_repo,
+        daily_repo,
         token_service,
     )
@@ -1,15 +1,18 @@
+from datetime import UTC
 from typing import Literal
 from fastapi import Request
 from sqlalchemy.exc import IntegrityError
 
 from database.relational_db import (
     RolesInterface,
+    UserDailyStatsInterface,
     UserInterface,
     User,
     UoW,
 )
 from domain.auth import UserRegister, UserLogin
 from domain.auth.enums import DEFAULT_ROLE
+from domain.webhooks import WebhookEventType
 from core.config import Settings
 from core.crypto import hash_password, verify_password, needs_rehash
 from .exceptions import AlreadyExists, WrongCredentials
@@ -23,11 +26,13 @@ class CredentialsService:
         uow: UoW,
         user_repo: UserInterface,
         role_repo: RolesInterface,
+        daily_repo: UserDailyStatsInterface,
         token_service: TokenService,
     ):
         self.uow = uow
         self.user_repo = user_repo
         self.role_repo = role_repo
+        self.daily_repo = daily_repo
         self.token_service = token_service
         
     @staticmethod
@@ -73,6 +78,12 @@ class CredentialsService:
             raise RuntimeError("Default role is missing from the database")
 
         await self.user_repo.assign_roles(user, [default_role])
+        # Rollup row is bumped in the same transaction, so it never counts a failed signup
+        await self.daily_repo.increment_registrations(user.created_at.astimezone(UTC).date())
+        self.uow.add_event(
+            WebhookEventType.USER_REGISTERED.value,
+            {"id": str(user.id), "username": user.username, "src": src},
+        )
         
         access, refresh, csrf = await self.token_service.issue_tokens(user, src)
         return access, refresh, csrf
@@ -1,15 +1,18 @@
 from fastapi import Depends
 from redis.asyncio import Redis
 
+from core.config import Settings
 from database.redis import CacheRepo, get_redis
 from database.relational_db import UoW, UserInterface, get_uow
 from .token_service import TokenService
 
+config = Settings() # pyright: ignore[reportCallIssue]
+
 
 async def get_token_service(
     redis: Redis = Depends(get_redis),
     uow: UoW = Depends(get_uow),
 ) -> TokenService:
-    cache_repo = CacheRepo(redis)
+    cache_repo = CacheRepo(redis, autobatch=config.REDIS_AUTOBATCH)
     user_repo = UserInterface(uow.session)
     return TokenService(cache_repo, user_repo)
@@ -0,0 +1,69 @@
+import logging
+import math
+import time
+
+from database.redis import REDIS_FAILURES, CacheRepo, get_redis, get_redis_breaker
+
+logger = logging.getLogger(__name__)
+
+
+class DenylistMirror:
+    """
+    Per-worker copy of the token denylist, consulted while Redis is unavailable.
+
+    Holds the tokens this worker blocked and the blocked tokens it has seen
+    in Redis, until they expire. Blocks written while Redis was down are
+    kept as pending and replayed once the breaker closes. Tokens blocked by
+    other workers during an outage are not known here.
+    """
+    def __init__(self, max_entries: int = 100_000):
+        self.max_entries = max_entries
+        self._entries: dict[str, float] = {}  # jti -> expires at (unix time)
+        self._pending: set[str] = set()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _prune(self) -> None:
+        now = time.time()
+        for jti in [jti for jti, expires_at in self._entries.items() if expires_at <= now]:
+            del self._entries[jti]
+            self._pending.discard(jti)
+        # Still full: drop the entries closest to expiry, pending writes last
+        if len(self._entries) >= self.max_entries:
+            by_expiry = sorted(self._entries, key=lambda jti: (jti in self._pending, self._entries[jti]))
+            for jti in by_expiry[: len(by_expiry) // 10 or 1]:
+                del self._entries[jti]
+                self._pending.discard(jti)
+
+    def add(self, jti: str, expires_at: float, pending: bool = False) -> None:
+        if jti not in self._entries and len(self._entries) >= self.max_entries:
+            self._prune()
+        self._entries[jti] = expires_at
+        if pending:
+            self._pending.add(jti)
+
+    def contains(self, jti: str) -> bool:
+        expires_at = self._entries.get(jti)
+        return expires_at is not None and expires_at > time.time()
+
+    async def replay(self) -> None:
+        """Writes blocks made during an outage to Redis."""
+        if not self._pending:
+            return
+        repo = CacheRepo(get_redis())
+        now = time.time()
+        for jti in list(self._pending):
+            ttl = math.ceil(self._entries.get(jti, now) - now)
+            try:
+                if ttl > 0:
+                    await repo.set(f"block:{jti}", "1", ttl)
+            except REDIS_FAILURES:
+                logger.warning("Denylist replay interrupted, %d blocks pending", len(self._pending))
+                return
+            self._pending.discard(jti)
+        logger.info("Replayed token denylist to Redis")
+
+
+denylist_mirror = DenylistMirror()
+get_redis_breaker().on_close(denylist_mirror.replay)
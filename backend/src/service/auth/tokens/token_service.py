@@ -7,16 +7,30 @@ from typing import Literal
 from uuid import uuid4
 
 import jwt
+from prometheus_client import Histogram
 
 from core.config import Settings
-from database.redis import CacheRepo
+from database.redis import REDIS_FAILURES, REDIS_FALLBACKS, CacheRepo
 from database.relational_db import User, UserInterface
+from .denylist import denylist_mirror
 
 config = Settings()  # pyright: ignore[reportCallIssue]
 logger = logging.getLogger(__name__)
 PRIVATE_KEY = config.JWT_PRIVATE_KEY.encode()
 PUBLIC_KEY = config.JWT_PUBLIC_KEY.encode()
 
+JWT_DURATION = Histogram(
+    "jwt_duration_seconds",
+    "JWT signing and verification time, by operation (encode, decode)",
+    ["operation"],
+    buckets=(0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025),
+)
+
+
+def _encode(payload: dict[str, int | str]) -> str:
+    with JWT_DURATION.labels("encode").time():
+        return jwt.encode(payload, PRIVATE_KEY, algorithm=config.JWT_ALGO)
+
 
 class TokenService:
     def __init__(self, repo: CacheRepo, user_repo: UserInterface):
@@ -29,16 +43,53 @@ class TokenService:
             config.CSRF_HMAC_KEY, refresh_token.encode(), "sha256"
         ).hexdigest()
 
-    async def _verify_token(self, token: str) -> dict[str, int | str] | None:
+    @staticmethod
+    def decode(token: str) -> dict[str, int | str] | None:
+        """Verifies signature and expiry only, without the Redis denylist lookup."""
         try:
-            payload = jwt.decode(token, PUBLIC_KEY, algorithms=[config.JWT_ALGO])
+            with JWT_DURATION.labels("decode").time():
+                return jwt.decode(token, PUBLIC_KEY, algorithms=[config.JWT_ALGO])
         except jwt.PyJWTError:
             logger.info("Failed to decode jwt")
             return None
 
-        jti = payload["jti"]
-        if await self.repo.exists(f"block:{jti}"):
+    async def is_blocked(self, jti: str, expires_at: int | None = None) -> bool:
+        """
+        Denylist lookup. While Redis is unavailable, falls back to this
+        worker's mirror of the denylist rather than failing the request.
+        """
+        try:
+            blocked = bool(await self.repo.exists(f"block:{jti}"))
+        except REDIS_FAILURES:
+            REDIS_FALLBACKS.labels("denylist").inc()
+            blocked = denylist_mirror.contains(jti)
+        else:
+            if blocked:
+                expires_at = expires_at or int(datetime.now(UTC).timestamp()) + config.REFRESH_TTL
+                denylist_mirror.add(jti, expires_at)
+
+        if blocked:
             logger.info("Failed to verify JWT: this token is blocked")
+        return blocked
+
+    async def _block(self, payload: dict[str, int | str]) -> None:
+        jti, expires_at = str(payload["jti"]), int(payload["exp"])
+        ttl = expires_at - int(datetime.now(UTC).timestamp())
+        try:
+            await self.repo.set(f"block:{jti}", "1", ttl)
+        except REDIS_FAILURES:
+            # Enforced by this worker now, written to Redis once it is back
+            REDIS_FALLBACKS.labels("denylist").inc()
+            denylist_mirror.add(jti, expires_at, pending=True)
+        else:
+            denylist_mirror.add(jti, expires_at)
+
+    async def _verify_token(self, token: str) -> dict[str, int | str] | None:
+        payload = self.decode(token)
+        if payload is None:
+            return None
+
+        if await self.is_blocked(str(payload["jti"]), int(payload["exp"])):
             return None
 
         return payload
@@ -62,7 +113,7 @@ class TokenService:
             "iat": int(now.timestamp()),
             "exp": int((now + timedelta(seconds=config.ACCESS_TTL)).timestamp()),
         }
-        access = jwt.encode(access_payload, PRIVATE_KEY, algorithm=config.JWT_ALGO)
+        access = _encode(access_payload)
 
         refresh_payload = {
             "sub": user_id,
@@ -73,7 +124,7 @@ class TokenService:
             "iat": int(now.timestamp()),
             "exp": int((now + timedelta(seconds=config.REFRESH_TTL)).timestamp()),
         }
-        refresh = jwt.encode(refresh_payload, PRIVATE_KEY, algorithm=config.JWT_ALGO)
+        refresh = _encode(refresh_payload)
 
         csrf = self._make_csrf(refresh)
 
@@ -98,9 +149,7 @@ class TokenService:
         elif src != "mobile":
             return None
 
-        jti = payload["jti"]
-        ttl = int(payload["exp"]) - int(datetime.now(UTC).timestamp())
-        await self.repo.set(f"block:{jti}", "1", ttl)
+        await self._block(payload)
 
         user_id = payload["sub"]
         user = await self.user_repo.get_by_id(user_id)
@@ -122,8 +171,7 @@ class TokenService:
         if payload is None or payload["typ"] != "refresh":
             return None
 
-        ttl = int(payload["exp"]) - int(datetime.now(UTC).timestamp())
-        await self.repo.set(f"block:{payload['jti']}", "1", ttl)
+        await self._block(payload)
 
         return payload
 
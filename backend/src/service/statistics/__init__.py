@@ -1,24 +1,24 @@
 from fastapi import Depends
+from redis.asyncio import Redis
 
-from database.relational_db import (
-    get_uow,
-    UoW,
-    BookEventsInterface,
-    UserInterestInterface,
-    BooksInterface,
-    BookStatsInterface,
-    UserInterface,
-)
+from core.config import Settings
+from database.redis import SWRCache, get_redis
 from .statistics_service import StatService
+from .active_users import ActiveUsersCounter, get_active_users_counter
+from .ingest import InteractionBuffer, get_interaction_buffer, maintain_partitions
+
+config = Settings() # pyright: ignore[reportCallIssue]
 
 
 async def get_stats_service(
-    uow: UoW = Depends(get_uow),
+    redis: Redis = Depends(get_redis),
 ) -> StatService:
-    bv_repo = BookEventsInterface(uow.session)
-    ui_repo = UserInterestInterface(uow.session)
-    book_repo = BooksInterface(uow.session)
-    bs_repo = BookStatsInterface(uow.session)
-    user_repo = UserInterface(uow.session)
+    # No request UoW: computations open their own session, since they may run
+    # as a background refresh, and only on a cache miss
+    cache = SWRCache(
+        redis,
+        fresh_ttl=config.STATS_CACHE_FRESH_TTL,
+        stale_ttl=config.STATS_CACHE_STALE_TTL,
+    )
     
-    return StatService(uow, bv_repo, ui_repo, book_repo, bs_repo, user_repo)
+    return StatService(cache)
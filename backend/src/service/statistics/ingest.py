@@ -0,0 +1,154 @@
+"""
+In-process buffer for interaction events.
+
+Requests only append to a list; a background task writes the buffer to
+`interaction_events` with COPY once `INTERACTIONS_BATCH_SIZE` rows are
+waiting or every `INTERACTIONS_FLUSH_INTERVAL` seconds. Each worker has its
+own buffer, so a crash loses at most the rows it had not flushed. When the
+database can't keep up the buffer holds up to `INTERACTIONS_MAX_BUFFER`
+rows and drops the rest rather than slow requests down.
+"""
+import asyncio
+import logging
+import time
+from datetime import date, datetime, timedelta, UTC
+from typing import Sequence
+
+from prometheus_client import Counter, Gauge, Histogram
+
+from core.config import Settings
+from database.relational_db import InteractionRow, InteractionsInterface, uow_scope
+
+config = Settings() # pyright: ignore[reportCallIssue]
+logger = logging.getLogger(__name__)
+
+# Partitions the scheduler keeps created ahead of today
+PARTITIONS_AHEAD = 7
+
+INTERACTIONS_INGESTED = Counter(
+    "interactions_ingested_total",
+    "Interaction events by outcome (written, dropped)",
+    ["outcome"],
+)
+INTERACTIONS_BUFFERED = Gauge(
+    "interactions_buffered",
+    "Interaction events waiting in this worker's buffer",
+)
+INTERACTIONS_FLUSH_DURATION = Histogram(
+    "interactions_flush_duration_seconds",
+    "Time to COPY one batch of interaction events",
+)
+
+
+class InteractionBuffer:
+    def __init__(self, batch_size: int, flush_interval: float, max_size: int):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_size = max_size
+        self._rows: list[InteractionRow] = []
+        self._full = asyncio.Event()
+        self._lock = asyncio.Lock()
+        self._task: asyncio.Task | None = None
+        self._stopping = False
+        # Days this worker has seen a partition for
+        self._partitions: set[date] = set()
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def add(self, rows: Sequence[InteractionRow]) -> int:
+        """Queues rows for the next flush without waiting. Returns how many were kept."""
+        room = max(0, self.max_size - len(self._rows))
+        kept = rows[:room]
+        self._rows.extend(kept)
+        if len(kept) < len(rows):
+            INTERACTIONS_INGESTED.labels("dropped").inc(len(rows) - len(kept))
+        INTERACTIONS_BUFFERED.set(len(self._rows))
+        if len(self._rows) >= self.batch_size:
+            self._full.set()
+        return len(kept)
+
+    async def _copy(self, batch: list[InteractionRow]) -> None:
+        async with uow_scope() as uow:
+            repo = InteractionsInterface(uow.session)
+            days = {row[0].astimezone(UTC).date() for row in batch} - self._partitions
+            if days:
+                # Normally created ahead by the scheduler; this covers a fresh database
+                await repo.ensure_partitions(sorted(days))
+                self._partitions.update(days)
+            await repo.copy(batch)
+
+    async def flush(self) -> None:
+        """Writes everything buffered, batch by batch. A failed batch goes back to the buffer."""
+        async with self._lock:
+            while self._rows:
+                batch = self._rows[:self.batch_size]
+                del self._rows[:self.batch_size]
+                started = time.perf_counter()
+                try:
+                    await self._copy(batch)
+                except Exception:
+                    logger.warning("Failed to write %d interaction events", len(batch), exc_info=True)
+                    self._partitions.clear()
+                    # Back in front of anything added meanwhile, as far as it fits
+                    self._rows[:0] = batch
+                    overflow = len(self._rows) - self.max_size
+                    if overflow > 0:
+                        del self._rows[self.max_size:]
+                        INTERACTIONS_INGESTED.labels("dropped").inc(overflow)
+                    break
+                INTERACTIONS_FLUSH_DURATION.observe(time.perf_counter() - started)
+                INTERACTIONS_INGESTED.labels("written").inc(len(batch))
+            INTERACTIONS_BUFFERED.set(len(self._rows))
+
+    async def _run(self) -> None:
+        while not self._stopping:
+            try:
+                await asyncio.wait_for(self._full.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._full.clear()
+            # A failed flush waits for the next interval, which doubles as backoff
+            await self.flush()
+
+    async def start(self) -> None:
+        if self._task is None:
+            self._stopping = False
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stops the flush loop and writes what is left."""
+        if self._task is not None:
+            # Not cancelled: a COPY in progress is let finish
+            self._stopping = True
+            self._full.set()
+            await self._task
+            self._task = None
+        await self.flush()
+        if self._rows:
+            logger.error("Lost %d interaction events on shutdown", len(self._rows))
+            INTERACTIONS_INGESTED.labels("dropped").inc(len(self._rows))
+            self._rows.clear()
+
+
+interaction_buffer = InteractionBuffer(
+    config.INTERACTIONS_BATCH_SIZE,
+    config.INTERACTIONS_FLUSH_INTERVAL,
+    config.INTERACTIONS_MAX_BUFFER,
+)
+
+def get_interaction_buffer() -> InteractionBuffer:
+    return interaction_buffer
+
+
+async def maintain_partitions() -> None:
+    """Scheduler job: creates the coming days' partitions and drops those past retention."""
+    today = datetime.now(UTC).date()
+    async with uow_scope() as uow:
+        repo = InteractionsInterface(uow.session)
+        created = await repo.ensure_partitions([today + timedelta(days=n) for n in range(PARTITIONS_AHEAD + 1)])
+        dropped = await repo.drop_partitions(today - timedelta(days=config.INTERACTIONS_RETENTION_DAYS))
+    if created:
+        logger.info("Created interaction partitions for %s", ", ".join(map(str, created)))
+    if dropped:
+        logger.info("Dropped interaction partitions for %s", ", ".join(map(str, dropped)))
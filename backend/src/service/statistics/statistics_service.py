@@ -1,28 +1,114 @@
-from uuid import UUID
-from fastapi import HTTPException
+from datetime import UTC
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+from fastapi import HTTPException, status
 
 from core.config import Settings
+from database.redis import REDIS_FAILURES, REDIS_FALLBACKS, SWRCache
 from database.relational_db import (
-    UoW,
-    User,
+    InteractionsInterface,
+    UserDailyStatsInterface,
     UserInterface,
+    uow_scope,
 )
-from domain.statistics import Interaction
+from domain.statistics import Granularity, Interaction
+from .active_users import MONTH, get_active_users_counter
 
 settings = Settings() # type: ignore
 
+UTC_ZONES = {"UTC", "Etc/UTC"}
+MAX_HOURLY_DAYS = 31
+# Graphs the UTC daily rollup can't serve scan the users table, so their window stays small
+MAX_RAW_DAYS = 92
+
+
 class StatService:
-    def __init__(
-        self,
-        uow: UoW,
-        user_repo: UserInterface,
-    ):
-        self.uow = uow
-        self.user_repo = user_repo
+    def __init__(self, cache: SWRCache):
+        self.cache = cache
 
+    @staticmethod
+    def _zone(tz: str) -> ZoneInfo:
+        try:
+            return ZoneInfo(tz)
+        except (ZoneInfoNotFoundError, ValueError):
+            raise HTTPException(status.HTTP_400_BAD_REQUEST, detail=f"Unknown timezone: {tz}")
         
-    # async def active_users(self, days: int):
-    #     return await self.be_repo.users_by_day(days)
+    @staticmethod
+    async def _compute_active_users(days: int) -> list[dict]:
+        async with uow_scope() as uow:
+            rows = await InteractionsInterface(uow.session).active_users_series(days)
+
+        return [{"day": row["bucket"].astimezone(UTC).date().isoformat(), "count": row["count"]} for row in rows]
+
+    async def active_users(self, days: int) -> tuple[list[dict], float]:
+        """Users with at least one interaction per UTC day, and the age of the cached result."""
+        if days > settings.INTERACTIONS_RETENTION_DAYS:
+            raise HTTPException(
+                status.HTTP_400_BAD_REQUEST,
+                detail=f"Interactions are only kept for {settings.INTERACTIONS_RETENTION_DAYS} days",
+            )
+
+        return await self.cache.get_or_compute(
+            f"stats:active_users:{days}",
+            lambda: self._compute_active_users(days),
+        )
+
+    async def active_user_counts(self, days: int) -> tuple[list[dict], float]:
+        """DAU/WAU/MAU per UTC day from the HyperLogLogs, and the age of the cached result."""
+        max_days = settings.ACTIVE_USERS_TTL_DAYS - MONTH
+        if days > max_days:
+            raise HTTPException(
+                status.HTTP_400_BAD_REQUEST,
+                detail=f"Active user counts are limited to {max_days} days",
+            )
+
+        counter = get_active_users_counter()
+        try:
+            return await self.cache.get_or_compute(f"stats:active_counts:{days}", lambda: counter.counts(days))
+        except REDIS_FAILURES:
+            # The counts only live in Redis. A cached result is served stale while a
+            # refresh fails; without one, zeros are returned and not cached
+            REDIS_FALLBACKS.labels("active_users").inc()
+            return counter.empty_counts(days), 0.0
+
+    @staticmethod
+    def _from_rollup(granularity: Granularity, zone: ZoneInfo) -> bool:
+        """The daily rollup is bucketed by UTC day, anything finer or shifted goes to the raw table."""
+        return zone.key in UTC_ZONES and granularity != Granularity.HOUR
+
+    @classmethod
+    async def _compute_registrations(cls, days: int, granularity: Granularity, zone: ZoneInfo) -> list[dict]:
+        # Own session: this may run as a background refresh after the request is gone
+        async with uow_scope() as uow:
+            if cls._from_rollup(granularity, zone):
+                rows = await UserDailyStatsInterface(uow.session).registrations_series(granularity.value, days)
+            else:
+                rows = await UserInterface(uow.session).registrations_series(granularity.value, zone.key, days)
+
+        return [
+            {"bucket": row["bucket"].astimezone(zone).isoformat(), "count": row["count"]}
+            for row in rows
+        ]
+
+    async def new_registrations(
+        self,
+        days: int,
+        granularity: Granularity = Granularity.DAY,
+        tz: str = "UTC",
+    ) -> tuple[list[dict], float]:
+        """Returns graph points and the age of the cached result in seconds."""
+        zone = self._zone(tz)
+        if granularity == Granularity.HOUR and days > MAX_HOURLY_DAYS:
+            raise HTTPException(
+                status.HTTP_400_BAD_REQUEST,
+                detail=f"Hourly graphs are limited to {MAX_HOURLY_DAYS} days",
+            )
+        if not self._from_rollup(granularity, zone) and days > MAX_RAW_DAYS:
+            raise HTTPException(
+                status.HTTP_400_BAD_REQUEST,
+                detail=f"Graphs in timezones other than UTC are limited to {MAX_RAW_DAYS} days",
+            )
 
-    async def new_registrations(self, days: int):
-        return await self.user_repo.registrations_by_days(days)
+        return await self.cache.get_or_compute(
+            f"stats:registrations:{granularity.value}:{zone.key}:{days}",
+            lambda: self._compute_registrations(days, granularity, zone),
+        )
@@ -1,5 +1,6 @@
 from fastapi import Depends
 
+from database.media import get_media_storage
 from database.redis import CacheRepo, get_redis
 from database.relational_db import (
     LanguagesInterface,
@@ -9,6 +10,7 @@ from database.relational_db import (
     get_uow,
 )
 from .user_service import UserService
+from .last_seen import LastSeenTracker, get_last_seen_tracker
 
 
 async def get_user_service(
@@ -19,4 +21,4 @@ async def get_user_service(
     lang_repo = LanguagesInterface(uow.session)
     role_repo = RolesInterface(uow.session)
     cache_repo = CacheRepo(redis) if redis else None
-    return UserService(uow, user_repo, lang_repo, role_repo, cache_repo)
+    return UserService(uow, user_repo, lang_repo, role_repo, cache_repo, get_media_storage())
@@ -0,0 +1,103 @@
+"""
+Write-behind `users.last_seen_at`.
+
+`auth_user` calls `touch()` on every authenticated request, which only
+records the time in this worker's map. Every `LAST_SEEN_FLUSH_INTERVAL`
+seconds the map is swapped out and written with one batched
+`UPDATE … FROM (VALUES …)` per `BATCH_SIZE` users, so any number of
+requests by a user costs at most one row update per interval per worker.
+Requests within `LAST_SEEN_RESOLUTION` seconds of the stored value aren't
+recorded at all.
+"""
+import asyncio
+import logging
+import time
+from datetime import datetime, timedelta, UTC
+from uuid import UUID
+
+from prometheus_client import Counter, Histogram
+
+from core.config import Settings
+from database.relational_db import User, UserInterface, uow_scope
+
+config = Settings() # pyright: ignore[reportCallIssue]
+logger = logging.getLogger(__name__)
+
+# Users per statement, two bind parameters each; asyncpg allows 32767
+BATCH_SIZE = 5_000
+
+LAST_SEEN_WRITES = Counter(
+    "last_seen_writes_total",
+    "Users whose last_seen_at was flushed, by outcome (written, dropped)",
+    ["outcome"],
+)
+LAST_SEEN_FLUSH_DURATION = Histogram(
+    "last_seen_flush_duration_seconds",
+    "Time to write one batch of last_seen_at updates",
+)
+
+
+class LastSeenTracker:
+    def __init__(self, flush_interval: float, resolution: float):
+        self.flush_interval = flush_interval
+        self.resolution = timedelta(seconds=resolution)
+        self._seen: dict[UUID, datetime] = {}
+        self._lock = asyncio.Lock()
+        self._stopping = asyncio.Event()
+        self._task: asyncio.Task | None = None
+
+    def touch(self, user: User) -> None:
+        """Records a request by `user`; written with the next flush."""
+        now = datetime.now(UTC)
+        if user.last_seen_at is not None and now - user.last_seen_at < self.resolution:
+            return
+        self._seen[user.id] = now
+
+    async def flush(self) -> None:
+        async with self._lock:
+            seen, self._seen = self._seen, {}
+            items = list(seen.items())
+            for start in range(0, len(items), BATCH_SIZE):
+                batch = dict(items[start:start + BATCH_SIZE])
+                started = time.perf_counter()
+                try:
+                    async with uow_scope() as uow:
+                        await UserInterface(uow.session).touch_last_seen(batch)
+                except Exception:
+                    logger.warning("Failed to write last_seen_at for %d users", len(batch), exc_info=True)
+                    # Retried with the next flush, unless a newer hit was recorded meanwhile
+                    for user_id, seen_at in batch.items():
+                        self._seen.setdefault(user_id, seen_at)
+                    continue
+                LAST_SEEN_FLUSH_DURATION.observe(time.perf_counter() - started)
+                LAST_SEEN_WRITES.labels("written").inc(len(batch))
+
+    async def _run(self) -> None:
+        while not self._stopping.is_set():
+            try:
+                await asyncio.wait_for(self._stopping.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            await self.flush()
+
+    async def start(self) -> None:
+        if self._task is None:
+            self._stopping.clear()
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stops the flush loop after one last flush."""
+        if self._task is not None:
+            self._stopping.set()
+            await self._task
+            self._task = None
+        if self._seen:
+            LAST_SEEN_WRITES.labels("dropped").inc(len(self._seen))
+            logger.warning("Lost last_seen_at of %d users on shutdown", len(self._seen))
+            self._seen.clear()
+
+
+last_seen_tracker = LastSeenTracker(config.LAST_SEEN_FLUSH_INTERVAL, config.LAST_SEEN_RESOLUTION)
+
+def get_last_seen_tracker() -> LastSeenTracker:
+    return last_seen_tracker
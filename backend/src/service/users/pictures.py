@@ -0,0 +1,224 @@
+"""
+Profile picture processing.
+
+Uploads are decoded, EXIF-stripped (after applying its orientation) and
+re-encoded into fixed square sizes in WebP and JPEG, so clients can fetch
+the smallest variant they can display. Decoding and encoding are CPU bound
+and run in a process pool, off the event loop.
+
+Variants are stored per user under the digest of the uploaded file, so
+re-uploading the same picture reuses the stored set. Older sets are
+collected by the `pictures.collect` task once the user points at a new one.
+"""
+import asyncio
+import hashlib
+import io
+import logging
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import AsyncIterable, AsyncIterator
+from uuid import UUID
+
+from fastapi import UploadFile
+from PIL import Image, ImageOps
+
+from core.config import Settings
+from database.media import get_media_storage
+from database.redis import REDIS_FAILURES
+from database.relational_db import UserInterface, uow_scope
+from tasks import task
+
+config = Settings() # pyright: ignore[reportCallIssue]
+logger = logging.getLogger(__name__)
+
+# Square edge lengths in px, smallest first
+PICTURE_SIZES = (48, 128, 512)
+PICTURE_FORMATS = {
+    "webp": ("WEBP", {"quality": 80, "method": 4}),
+    "jpg": ("JPEG", {"quality": 82, "optimize": True, "progressive": True}),
+}
+CONTENT_TYPES = {"webp": "image/webp", "jpg": "image/jpeg"}
+ACCEPTED_FORMATS = {"JPEG", "PNG", "WEBP"}
+
+# Pillow only raises DecompressionBombError past twice this, and between 1x
+# and 2x merely warns; render_variants refuses anything over it explicitly
+Image.MAX_IMAGE_PIXELS = config.MAX_PICTURE_PIXELS
+
+
+class UnsupportedPicture(ValueError):
+    """The upload isn't an image we accept."""
+
+
+def _flatten(image: Image.Image) -> Image.Image:
+    """Drops transparency onto a white background, for formats without alpha."""
+    if image.mode in ("RGBA", "LA") or (image.mode == "P" and "transparency" in image.info):
+        image = image.convert("RGBA")
+        background = Image.new("RGB", image.size, (255, 255, 255))
+        background.paste(image, mask=image.getchannel("A"))
+        return background
+    return image.convert("RGB")
+
+
+def render_variants(data: bytes) -> dict[int, dict[str, bytes]]:
+    """
+    Encodes every size and format of a picture: `{size: {ext: bytes}}`.
+    Runs in the picture pool; metadata is dropped by not passing it on.
+    """
+    try:
+        with Image.open(io.BytesIO(data)) as source:
+            if source.format not in ACCEPTED_FORMATS:
+                raise UnsupportedPicture(f"Unsupported image format: {source.format}")
+            width, height = source.size
+            if width * height > config.MAX_PICTURE_PIXELS:
+                raise UnsupportedPicture(f"Image too large: {width}x{height} px")
+            # JPEG can decode straight to a reduced scale, much cheaper than a full decode
+            source.draft("RGB", (max(PICTURE_SIZES) * 2, max(PICTURE_SIZES) * 2))
+            image = ImageOps.exif_transpose(source)
+            image.load()
+    except (Image.DecompressionBombError, OSError, SyntaxError) as exc:
+        raise UnsupportedPicture(str(exc)) from exc
+
+    has_alpha = image.mode in ("RGBA", "LA") or "transparency" in image.info
+    image = image.convert("RGBA" if has_alpha else "RGB")
+
+    variants: dict[int, dict[str, bytes]] = {}
+    for size in PICTURE_SIZES:
+        resized = ImageOps.fit(image, (size, size), Image.Resampling.LANCZOS)
+        encoded: dict[str, bytes] = {}
+        for ext, (fmt, options) in PICTURE_FORMATS.items():
+            out = io.BytesIO()
+            (resized if fmt == "WEBP" else _flatten(resized)).save(out, fmt, **options)
+            encoded[ext] = out.getvalue()
+        variants[size] = encoded
+    return variants
+
+
+_pool: ProcessPoolExecutor | None = None
+
+
+def get_picture_pool() -> ProcessPoolExecutor:
+    global _pool
+    if _pool is None:
+        _pool = ProcessPoolExecutor(max_workers=config.PICTURE_WORKERS)
+    return _pool
+
+
+def shutdown_picture_pool() -> None:
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
+
+
+async def process_picture(data: bytes) -> dict[int, dict[str, bytes]]:
+    """`render_variants` in the picture pool. Raises `UnsupportedPicture`."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_picture_pool(), render_variants, data)
+
+
+class PictureTooLarge(ValueError):
+    """The upload is over `MAX_PHOTO_SIZE`."""
+
+
+def picture_digest(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()[:32]
+
+
+def sniff_picture(head: bytes) -> str | None:
+    """Format from the magic bytes at the start of a file, None if it isn't one we accept."""
+    if head.startswith(b"\xff\xd8\xff"):
+        return "JPEG"
+    if head.startswith(b"\x89PNG\r\n\x1a\n"):
+        return "PNG"
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return "WEBP"
+    return None
+
+
+async def iter_upload(file: UploadFile, chunk_size: int = 64 * 1024) -> AsyncIterator[bytes]:
+    while chunk := await file.read(chunk_size):
+        yield chunk
+
+
+async def read_picture(chunks: AsyncIterable[bytes], limit: int) -> tuple[bytes, str]:
+    """
+    Collects an upload of at most `limit` bytes, hashing it on the way.
+    Rejects it from its first bytes when they aren't a JPEG, PNG or WebP
+    header, and as soon as it goes over the limit. Returns `(data, digest)`.
+    """
+    digest = hashlib.sha256()
+    data = bytearray()
+    sniffed = False
+    async for chunk in chunks:
+        if len(data) + len(chunk) > limit:
+            raise PictureTooLarge
+        digest.update(chunk)
+        data += chunk
+        if not sniffed and len(data) >= 12:
+            if sniff_picture(bytes(data[:12])) is None:
+                raise UnsupportedPicture("Not a JPEG, PNG or WebP file")
+            sniffed = True
+    if not sniffed and sniff_picture(bytes(data)) is None:
+        raise UnsupportedPicture("Not a JPEG, PNG or WebP file")
+    return bytes(data), digest.hexdigest()[:32]
+
+
+def picture_keys(user_id: UUID | str, digest: str) -> dict[int, dict[str, str]]:
+    """Storage keys of every variant: `{size: {ext: key}}`."""
+    return {
+        size: {ext: f"users/{user_id}/{digest}_{size}.{ext}" for ext in PICTURE_FORMATS}
+        for size in PICTURE_SIZES
+    }
+
+
+def upload_prefix(user_id: UUID | str) -> str:
+    """Where a user's direct uploads land before they are confirmed."""
+    return f"uploads/{user_id}/"
+
+
+def marker_key(keys: dict[int, dict[str, str]]) -> str:
+    """Written last, so when it exists the whole set does."""
+    return keys[max(PICTURE_SIZES)]["jpg"]
+
+
+async def _current_digest(user_id: str) -> str | None:
+    """Digest of the set the user's picture points at, None without one."""
+    storage = get_media_storage()
+    async with uow_scope() as uow:
+        user = await UserInterface(uow.session).get_by_id(user_id)
+    current_url = user.profile_pic_url if user is not None else None
+    current_key = storage.key_for(current_url) if current_url else None
+    return current_key.rsplit("/", 1)[-1].split("_", 1)[0] if current_key else None
+
+
+@task("pictures.collect", max_retries=3)
+async def collect_pictures(user_id: str) -> None:
+    """
+    Deletes a user's stored variants other than the current set, and direct
+    uploads that were never confirmed. Files younger than `MEDIA_GC_GRACE`
+    are kept, as they may belong to an upload that hasn't committed yet.
+    """
+    storage = get_media_storage()
+    keep = {await _current_digest(user_id)}
+
+    cutoff = time.time() - config.MEDIA_GC_GRACE
+    candidates = [obj.key for obj in await storage.list(f"users/{user_id}") if obj.modified_at < cutoff]
+    # An upload that reused an old set may have committed since the first read
+    keep.add(await _current_digest(user_id))
+    stale = [key for key in candidates if key.rsplit("/", 1)[-1].split("_", 1)[0] not in keep]
+    # Direct uploads that were never confirmed
+    stale += [
+        obj.key for obj in await storage.list(upload_prefix(user_id))
+        if obj.modified_at < cutoff - config.MEDIA_UPLOAD_URL_TTL
+    ]
+    if stale:
+        await storage.delete(*stale)
+        logger.info("Collected %d old picture files of user %s", len(stale), user_id)
+
+
+async def schedule_collect_pictures(user_id: UUID | str) -> None:
+    try:
+        await collect_pictures.enqueue(str(user_id))
+    except REDIS_FAILURES:
+        # Nothing is lost: the next collection for this user covers these files too
+        logger.warning("Failed to enqueue picture collection for user %s", user_id)
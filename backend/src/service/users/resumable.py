@@ -0,0 +1,221 @@
+"""
+Resumable picture uploads, after the tus protocol (create, HEAD, PATCH).
+
+Upload state lives in Redis under `upload:{id}` and expires
+`RESUMABLE_UPLOAD_TTL` seconds after the last chunk; bytes are appended to
+a staging file under `UPLOAD_STAGING_DIR`. Staging is local disk, so with
+several replicas it must be a shared volume. Abandoned staging files are
+removed by the `expire_uploads` job.
+"""
+import asyncio
+import logging
+import os
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import AsyncIterable, AsyncIterator
+from uuid import UUID, uuid4
+
+import aiofiles
+import aiofiles.os
+from fastapi import HTTPException, status
+from redis.asyncio import Redis
+from redis.exceptions import LockError
+from starlette.requests import ClientDisconnect
+
+from core.config import Settings
+from database.redis import REDIS_FAILURES, get_redis, get_redis_breaker
+from .pictures import sniff_picture
+
+config = Settings() # pyright: ignore[reportCallIssue]
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = "upload"
+# Renewed every third of it while a PATCH is writing, so only a Redis outage lets it lapse
+LOCK_TTL = 60
+
+
+@dataclass(frozen=True)
+class UploadState:
+    id: str
+    user_id: str
+    length: int
+    offset: int
+
+    @property
+    def complete(self) -> bool:
+        return self.offset >= self.length
+
+
+class ResumableUploads:
+    def __init__(self, redis: Redis, staging_dir: str | Path, ttl: int):
+        self.redis = redis
+        self.staging_dir = Path(staging_dir)
+        self.ttl = ttl
+
+    @staticmethod
+    def _key(upload_id: str) -> str:
+        return f"{KEY_PREFIX}:{upload_id}"
+
+    def _path(self, upload_id: str) -> Path:
+        # Ids are generated here; anything else can't name a staging file
+        return self.staging_dir / f"{UUID(upload_id).hex}.part"
+
+    async def _redis(self, command: str, *args, **kwargs):
+        return await self._call(getattr(self.redis, command), *args, **kwargs)
+
+    async def _call(self, method, *args, **kwargs):
+        try:
+            return await get_redis_breaker().call(method, *args, **kwargs)
+        except REDIS_FAILURES:
+            raise HTTPException(
+                status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Resumable uploads are temporarily unavailable",
+                headers={"Retry-After": "5"},
+            )
+
+    async def create(self, user_id: UUID | str, length: int) -> UploadState:
+        upload_id = str(uuid4())
+        await aiofiles.os.makedirs(self.staging_dir, exist_ok=True)
+        async with aiofiles.open(self._path(upload_id), "wb"):
+            pass
+        key = self._key(upload_id)
+        await self._redis("hset", key, mapping={"user_id": str(user_id), "length": length, "offset": 0})
+        await self._redis("expire", key, self.ttl)
+        return UploadState(upload_id, str(user_id), length, 0)
+
+    async def get(self, upload_id: str, user_id: UUID | str) -> UploadState:
+        """The upload's state; 404 for unknown, expired or someone else's uploads."""
+        try:
+            UUID(upload_id)
+        except ValueError:
+            raise HTTPException(status.HTTP_404_NOT_FOUND, detail="Upload not found")
+        data = await self._redis("hgetall", self._key(upload_id))
+        if not data or data["user_id"] != str(user_id):
+            raise HTTPException(status.HTTP_404_NOT_FOUND, detail="Upload not found")
+        return UploadState(upload_id, data["user_id"], int(data["length"]), int(data["offset"]))
+
+    async def append(
+        self,
+        state: UploadState,
+        offset: int,
+        chunks: AsyncIterable[bytes],
+    ) -> UploadState:
+        """
+        Appends a PATCH body at `offset`. Whatever arrived before a client
+        disconnect is kept, so the client can resume from the new offset.
+        """
+        lock = self.redis.lock(f"{self._key(state.id)}:lock", timeout=LOCK_TTL)
+        if not await self._call(lock.acquire, blocking=False):
+            raise HTTPException(status.HTTP_423_LOCKED, detail="Upload is being written to")
+
+        written = 0
+        lost = asyncio.Event()
+        renewal = asyncio.create_task(self._renew(lock, lost))
+        try:
+            # Read under the lock: a PATCH that held it until now may have moved the offset
+            state = await self.get(state.id, state.user_id)
+            if offset != state.offset:
+                raise HTTPException(status.HTTP_409_CONFLICT, detail="Upload-Offset doesn't match")
+
+            async with aiofiles.open(self._path(state.id), "r+b") as out:
+                # Drop bytes a previous, interrupted PATCH wrote past its recorded offset
+                await out.truncate(offset)
+                await out.seek(offset)
+                head = b""
+                try:
+                    async for chunk in chunks:
+                        if lost.is_set():
+                            break
+                        if offset + written + len(chunk) > state.length:
+                            await out.truncate(offset + written)
+                            raise HTTPException(
+                                status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                                detail="Chunk goes past Upload-Length",
+                            )
+                        if offset == 0 and len(head) < 12:
+                            head += chunk[:12 - len(head)]
+                            if len(head) >= min(12, state.length) and sniff_picture(head) is None:
+                                raise HTTPException(
+                                    status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+                                    detail="Only jpg / png / webp allowed",
+                                )
+                        await out.write(chunk)
+                        written += len(chunk)
+                except ClientDisconnect:
+                    logger.info("Upload %s interrupted at %d bytes", state.id, offset + written)
+                await out.flush()
+            if lost.is_set():
+                # Another PATCH may be writing by now: the offset isn't advanced
+                raise HTTPException(status.HTTP_409_CONFLICT, detail="Upload lock was lost, resume from HEAD")
+        finally:
+            renewal.cancel()
+            await asyncio.gather(renewal, return_exceptions=True)
+            try:
+                if written and not lost.is_set():
+                    key = self._key(state.id)
+                    await self._redis("hset", key, "offset", offset + written)
+                    await self._redis("expire", key, self.ttl)
+            finally:
+                try:
+                    # Compare-and-delete on the lock's token: never releases another request's lock
+                    await get_redis_breaker().call(lock.release)
+                except (LockError, *REDIS_FAILURES):
+                    # Lapsed, or left to expire while Redis is unavailable
+                    pass
+
+        return UploadState(state.id, state.user_id, state.length, offset + written)
+
+    @staticmethod
+    async def _renew(lock, lost: asyncio.Event) -> None:
+        while True:
+            await asyncio.sleep(LOCK_TTL / 3)
+            try:
+                await get_redis_breaker().call(lock.reacquire)
+            except LockError:
+                lost.set()
+                return
+            except REDIS_FAILURES:
+                logger.warning("Failed to renew upload lock %s", lock.name)
+
+    async def read(self, upload_id: str, chunk_size: int = 64 * 1024) -> AsyncIterator[bytes]:
+        async with aiofiles.open(self._path(upload_id), "rb") as file:
+            while chunk := await file.read(chunk_size):
+                yield chunk
+
+    async def discard(self, upload_id: str) -> None:
+        await asyncio.to_thread(self._path(upload_id).unlink, missing_ok=True)
+        try:
+            await get_redis_breaker().call(self.redis.delete, self._key(upload_id))
+        except REDIS_FAILURES:
+            # The key expires on its own
+            pass
+
+
+resumable_uploads = ResumableUploads(get_redis(), config.UPLOAD_STAGING_DIR, config.RESUMABLE_UPLOAD_TTL)
+
+def get_resumable_uploads() -> ResumableUploads:
+    return resumable_uploads
+
+
+async def expire_uploads() -> None:
+    """Removes staging files of uploads whose state has expired."""
+    uploads = get_resumable_uploads()
+
+    def stale_files() -> list[Path]:
+        if not uploads.staging_dir.is_dir():
+            return []
+        cutoff = time.time() - uploads.ttl
+        return [
+            Path(entry.path) for entry in os.scandir(uploads.staging_dir)
+            if entry.name.endswith(".part") and entry.stat().st_mtime < cutoff
+        ]
+
+    removed = 0
+    for path in await asyncio.to_thread(stale_files):
+        upload_id = str(UUID(path.stem))
+        if not await uploads.redis.exists(uploads._key(upload_id)):
+            await asyncio.to_thread(path.unlink, missing_ok=True)
+            removed += 1
+    if removed:
+        logger.info("Expired %d abandoned uploads", removed)
@@ -1,15 +1,30 @@
-import aiofiles
-import shutil
 from datetime import datetime
+from typing import AsyncIterable
 
 from uuid import UUID, uuid4
-from pathlib import Path
 from fastapi import UploadFile, status, HTTPException
 
 from core.config import Settings
 # from core.rbac import permissions_cache_key
-from database.redis import CacheRepo
-from domain.users import UserPatch
+from core.rbac import roles_cache_key
+from database.media import DirectUploadsUnsupported, MediaStorage, PresignedUpload, get_media_storage
+from database.redis import CacheRepo, LocalCache, get_invalidation_bus
+from domain.users import UserPatch, UserSort
+from domain.webhooks import WebhookEventType
+from .pictures import (
+    CONTENT_TYPES,
+    PICTURE_SIZES,
+    PictureTooLarge,
+    UnsupportedPicture,
+    iter_upload,
+    marker_key,
+    picture_digest,
+    picture_keys,
+    process_picture,
+    read_picture,
+    schedule_collect_pictures,
+    upload_prefix,
+)
 from database.relational_db import (
     LanguagesInterface,
     RolesInterface,
@@ -21,6 +36,11 @@ from database.relational_db import (
 
 settings = Settings()  # type: ignore
 
+LANGUAGES_CACHE_TTL_SECONDS = 60 * 60 * 24
+languages_local_cache = get_invalidation_bus().register(
+    LocalCache("misc:languages", maxsize=256, ttl=60 * 5)
+)
+
 
 class UserService:
     def __init__(
@@ -30,12 +50,14 @@ class UserService:
         lang_repo: LanguagesInterface,
         role_repo: RolesInterface,
         cache_repo: CacheRepo | None = None,
+        storage: MediaStorage | None = None,
     ):
         self.uow = uow
         self.user_repo = user_repo
         self.lang_repo = lang_repo
         self.role_repo = role_repo
         self.cache_repo = cache_repo
+        self.storage = storage or get_media_storage()
         
     async def get_user(self, user_id: UUID | str) -> User | None:
         return await self.user_repo.get_by_id(user_id)
@@ -46,85 +68,140 @@ class UserService:
         for field, value in data.items():
             setattr(user, field, value)
             
+        self.uow.add_event(WebhookEventType.USER_UPDATED.value, {"id": str(user.id), "fields": sorted(data)})
         await self.uow.commit()
             
         await self.uow.session.refresh(user)
 
     async def add_picture(
         self,
-        file: UploadFile,
+        file: UploadFile | AsyncIterable[bytes],
         user: User
     ) -> None:
-        folder = Path(settings.MEDIA_DIR, "users", str(user.id))
-        if folder.exists():
-            shutil.rmtree(folder)
-        folder.mkdir(parents=True, exist_ok=True)
-
-        if file.content_type not in ("image/jpeg", "image/png"):
+        """Sets the user's picture from an upload, or from its bytes as they stream in."""
+        chunks = iter_upload(file) if isinstance(file, UploadFile) else file
+        try:
+            data, digest = await read_picture(chunks, settings.MAX_PHOTO_SIZE * 1024 * 1024)
+        except PictureTooLarge:
+            raise HTTPException(
+                status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                detail=f"File too large. Max {settings.MAX_PHOTO_SIZE} MB"
+            )
+        except UnsupportedPicture:
             raise HTTPException(
                 status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
-                detail="Only jpg / png allowed"
+                detail="Only jpg / png / webp allowed"
+            )
+        await self._set_picture(user, data, digest)
+
+    async def create_picture_upload(self, user: User) -> tuple[str, PresignedUpload]:
+        """Presigned form for uploading a picture straight to storage, and its key."""
+        key = f"{upload_prefix(user.id)}{uuid4().hex}"
+        try:
+            upload = await self.storage.presign_upload(
+                key,
+                max_size=settings.MAX_PHOTO_SIZE * 1024 * 1024,
+                expires_in=settings.MEDIA_UPLOAD_URL_TTL,
             )
+        except DirectUploadsUnsupported as exc:
+            raise HTTPException(status.HTTP_501_NOT_IMPLEMENTED, detail=str(exc))
+        return key, upload
+
+    async def confirm_picture_upload(self, user: User, key: str) -> None:
+        """Turns a direct upload into the user's picture, then drops the uploaded original."""
+        if not key.startswith(upload_prefix(user.id)) or ".." in key:
+            raise HTTPException(status.HTTP_403_FORBIDDEN, detail="Not your upload")
 
-        ext  = ".jpg" if file.content_type == "image/jpeg" else ".png"
-        name = f"{uuid4()}{ext}"
-
-        file_path = folder / name
-        limit_bytes = settings.MAX_PHOTO_SIZE * 1024 * 1024
-        written = 0
-        async with aiofiles.open(file_path, "wb") as out:
-            while chunk := await file.read(1024 * 1024):
-                if written + len(chunk) > limit_bytes:
-                    try:
-                        await out.flush()
-                        await out.close()
-                    except Exception:
-                        pass
-                    try:
-                        file_path.unlink(missing_ok=True)
-                    except Exception:
-                        pass
-                    raise HTTPException(
-                        status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
-                        detail=f"File too large. Max {settings.MAX_PHOTO_SIZE} MB"
-                    )
-                await out.write(chunk)
-                written += len(chunk)
-
-        url = f"{settings.SITE_URL}/{settings.MEDIA_DIR}/users/{user.id}/{name}"
-
-        user.profile_pic_url = url
+        stored = await self.storage.stat(key)
+        if stored is None:
+            raise HTTPException(status.HTTP_404_NOT_FOUND, detail="Upload not found")
+        if stored.size is not None and stored.size > settings.MAX_PHOTO_SIZE * 1024 * 1024:
+            await self.storage.delete(key)
+            raise HTTPException(
+                status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                detail=f"File too large. Max {settings.MAX_PHOTO_SIZE} MB"
+            )
+
+        data = await self.storage.get(key)
+        try:
+            await self._set_picture(user, data, picture_digest(data))
+        finally:
+            await self.storage.delete(key)
+
+    async def _set_picture(self, user: User, data: bytes, digest: str) -> None:
+        keys = picture_keys(user.id, digest)
+        marker = marker_key(keys)
+        variant_keys = [key for by_ext in keys.values() for key in by_ext.values() if key != marker]
+        # Same picture uploaded before: its variants are already stored. They are
+        # touched so a collection that saw their old mtime leaves them alone
+        if await self.storage.touch(*variant_keys, marker):
+            # The image is decoded rather than trusting the declared content type
+            try:
+                variants = await process_picture(data)
+            except UnsupportedPicture:
+                raise HTTPException(
+                    status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+                    detail="Only jpg / png / webp allowed"
+                )
+            for size, encoded in variants.items():
+                for ext, content in encoded.items():
+                    if keys[size][ext] != marker:
+                        await self.storage.put(keys[size][ext], content, CONTENT_TYPES[ext])
+            await self.storage.put(marker, variants[max(PICTURE_SIZES)]["jpg"], CONTENT_TYPES["jpg"])
+
+        user.profile_pic_variants = {
+            str(size): {ext: self.storage.url(key) for ext, key in by_ext.items()}
+            for size, by_ext in keys.items()
+        }
+        user.profile_pic_url = self.storage.url(marker)
+        await self.uow.commit()
+        await self.uow.session.refresh(user)
+
+        # Only now that the new set is committed can the old one go
+        await schedule_collect_pictures(user.id)
 
     async def admin_list_users(
         self,
         *,
         banned: bool | None = None,
         search: str | None = None,
+        seen_after: datetime | None = None,
+        seen_before: datetime | None = None,
+        sort: UserSort = UserSort.CREATED_AT,
         limit: int = 50,
         cursor: str | None = None,
     ) -> tuple[list[User], str | None]:
-        cursor_created_at = None
+        cursor_at = None
         cursor_id = None
         if cursor:
             try:
                 ts_str, id_str = cursor.split("_", 1)
-                cursor_created_at = datetime.fromisoformat(ts_str)
+                # Users never seen have no timestamp in a last_seen_at cursor
+                cursor_at = datetime.fromisoformat(ts_str) if ts_str else None
                 cursor_id = UUID(id_str)
             except Exception:
                 raise HTTPException(400, detail='Invalid cursor')
+            if cursor_at is None and sort != UserSort.LAST_SEEN_AT:
+                raise HTTPException(400, detail='Invalid cursor')
 
         users = await self.user_repo.admin_list_users(
             banned=banned,
             search=search,
+            seen_after=seen_after,
+            seen_before=seen_before,
+            sort=sort.value,
             limit=limit,
-            cursor_created_at=cursor_created_at,
+            cursor_at=cursor_at,
             cursor_id=cursor_id,
         )
 
         next_cursor = None
         if len(users) == limit:
             last = users[-1]
-            if last.created_at is None:
+            if sort == UserSort.LAST_SEEN_AT:
+                last_seen = last.last_seen_at.isoformat() if last.last_seen_at is not None else ""
+                next_cursor = f"{last_seen}_{last.id}"
+            elif last.created_at is None:
                 next_cursor = None
             else:
                 next_cursor = f"{last.created_at.isoformat()}_{last.id}"
@@ -135,13 +212,49 @@ class UserService:
         previous_version = target.auth_version
         target.banned = banned
         target.bump_auth_version()
+        event = WebhookEventType.USER_BANNED if banned else WebhookEventType.USER_UNBANNED
+        self.uow.add_event(event.value, {"id": str(target.id)})
         await self.uow.commit()
         await self.uow.session.refresh(target)
+        await self._invalidate_roles_cache(target.id, previous_version)
         # await self._invalidate_permissions_cache(target.id, previous_version)
         return target
 
-    async def list_languages(self, search: str, limit: int):
-        return await self.lang_repo.search(search, limit)
+    async def list_languages(self, search: str, limit: int) -> list[dict]:
+        if self.cache_repo is None:
+            languages = await self.lang_repo.search(search, limit)
+            return [
+                {"code": lang.code, "name_ru": lang.name_ru, "name_en": lang.name_en}
+                for lang in languages
+            ]
+
+        async def load() -> list[dict]:
+            languages = await self.lang_repo.list_all()
+            return [
+                {"code": lang.code, "name_ru": lang.name_ru, "name_en": lang.name_en}
+                for lang in languages
+            ]
+
+        # One key for the whole (small, static) table: search text comes from
+        # anonymous clients and must not pick cache keys
+        languages = await self.cache_repo.get_or_load(
+            "misc:languages:all",
+            load,
+            namespace="misc:languages",
+            ttl=LANGUAGES_CACHE_TTL_SECONDS,
+            local=languages_local_cache,
+        )
+        if not search:
+            return languages[:limit]
+
+        # Same matching and order as LanguagesInterface.search
+        needle = search.lower()
+        found = [
+            lang for lang in languages
+            if needle in lang["name_ru"].lower() or needle in lang["name_en"].lower()
+        ]
+        found.sort(key=lambda lang: len(lang["name_ru"]))
+        return found[:limit]
 
     async def admin_assign_roles(
         self,
@@ -162,12 +275,28 @@ class UserService:
         previous_version = target.auth_version
         await self.user_repo.assign_roles(target, roles)
         target.bump_auth_version()
+        self.uow.add_event(
+            WebhookEventType.USER_ROLES_UPDATED.value,
+            {"id": str(target.id), "roles": sorted(role.slug for role in roles)},
+        )
         await self.uow.commit()
         await self.uow.session.refresh(target)
 
+        await self._invalidate_roles_cache(target.id, previous_version)
         # await self._invalidate_permissions_cache(target.id, previous_version)
         return target
 
+    async def _invalidate_roles_cache(
+        self,
+        user_id: UUID | str,
+        previous_version: int | None,
+    ) -> None:
+        # The bumped auth version already points readers at a new key; this
+        # just frees the old entry everywhere instead of waiting for its TTL
+        if not self.cache_repo or previous_version is None:
+            return
+        await self.cache_repo.invalidate(roles_cache_key(user_id, previous_version))
+
     # async def _invalidate_permissions_cache(
     #     self,
     #     user_id: UUID | str,
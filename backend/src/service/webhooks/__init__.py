@@ -0,0 +1,8 @@
+from fastapi import Depends
+
+from database.relational_db import UoW, WebhooksInterface, get_uow
+from .webhook_service import WebhookService
+
+
+async def get_webhook_service(uow: UoW = Depends(get_uow)) -> WebhookService:
+    return WebhookService(uow, WebhooksInterface(uow.session))
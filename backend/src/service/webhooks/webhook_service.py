@@ -0,0 +1,83 @@
+from uuid import UUID
+
+from fastapi import HTTPException, status
+
+from core.config import Settings
+from database.relational_db import UoW, WebhookDelivery, WebhookSubscription, WebhooksInterface
+from domain.webhooks import WebhookCreate, WebhookEventType, WebhookPatch
+from webhooks.dispatcher import new_event, wake
+from webhooks.signing import generate_secret
+
+settings = Settings()  # type: ignore
+
+
+class WebhookService:
+    def __init__(self, uow: UoW, repo: WebhooksInterface):
+        self.uow = uow
+        self.repo = repo
+
+    @staticmethod
+    def _check_url(url: str) -> None:
+        if settings.APP_STAGE == "prod" and not url.startswith("https://"):
+            raise HTTPException(
+                status.HTTP_422_UNPROCESSABLE_ENTITY,
+                detail="Webhook URLs must use https",
+            )
+
+    async def _get(self, subscription_id: UUID) -> WebhookSubscription:
+        subscription = await self.repo.get_subscription(subscription_id)
+        if subscription is None:
+            raise HTTPException(status.HTTP_404_NOT_FOUND, detail="Webhook not found")
+        return subscription
+
+    async def list_subscriptions(self) -> list[WebhookSubscription]:
+        return await self.repo.list_subscriptions()
+
+    async def create(self, payload: WebhookCreate) -> WebhookSubscription:
+        self._check_url(str(payload.url))
+        subscription = await self.repo.add_subscription(
+            WebhookSubscription(
+                url=str(payload.url),
+                secret=generate_secret(),
+                event_types=[event_type.value for event_type in payload.event_types],
+                description=payload.description,
+                max_concurrency=payload.max_concurrency,
+            )
+        )
+        await self.uow.commit()
+        return subscription
+
+    async def update(self, subscription_id: UUID, payload: WebhookPatch) -> WebhookSubscription:
+        subscription = await self._get(subscription_id)
+        data = payload.model_dump(exclude_none=True)
+        if "url" in data:
+            data["url"] = str(data["url"])
+            self._check_url(data["url"])
+        if "event_types" in data:
+            data["event_types"] = [event_type.value for event_type in data["event_types"]]
+
+        for field, value in data.items():
+            setattr(subscription, field, value)
+
+        await self.uow.commit()
+        await self.uow.session.refresh(subscription)
+        if subscription.is_active:
+            # Deliveries may have piled up while it was off
+            await wake(subscription.id)
+        return subscription
+
+    async def delete(self, subscription_id: UUID) -> None:
+        await self.repo.delete_subscription(await self._get(subscription_id))
+        await self.uow.commit()
+
+    async def ping(self, subscription_id: UUID) -> None:
+        """Sends a `ping` event to one endpoint, whatever it is subscribed to."""
+        subscription = await self._get(subscription_id)
+        event = new_event(WebhookEventType.PING.value, {"subscription_id": str(subscription.id)})
+        await self.repo.add_deliveries([subscription.id], UUID(event["id"]), event["type"], event)
+        await self.uow.commit()
+        await wake(subscription.id)
+
+    async def list_deliveries(self, subscription_id: UUID, limit: int) -> list[WebhookDelivery]:
+        await self._get(subscription_id)
+        return await self.repo.list_deliveries(subscription_id, limit)
@@ -0,0 +1,109 @@
+import json
+import logging
+import time
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable
+from uuid import uuid4
+
+from prometheus_client import Counter, Gauge, Histogram
+
+from core.config import Settings
+from database.redis import get_redis, get_redis_breaker
+
+config = Settings() # pyright: ignore[reportCallIssue]
+logger = logging.getLogger(__name__)
+
+DELAYED_SUFFIX = ":delayed"
+DEAD_SUFFIX = ":dead"
+
+TASK_RUNS = Counter(
+    "task_runs_total",
+    "Task executions by outcome (success, retry, dead)",
+    ["task", "outcome"],
+)
+TASK_DURATION = Histogram(
+    "task_duration_seconds",
+    "Time spent running a task, failed attempts included",
+    ["task"],
+)
+TASK_QUEUE_LATENCY = Histogram(
+    "task_queue_latency_seconds",
+    "Time from when a task was due to when a worker started it",
+    ["task"],
+)
+TASKS_IN_FLIGHT = Gauge(
+    "tasks_in_flight",
+    "Tasks being run by this worker",
+)
+
+
+@dataclass
+class Task:
+    """An async function that can be run by a worker through `enqueue`."""
+    name: str
+    func: Callable[..., Awaitable[Any]]
+    max_retries: int = 5
+    backoff: float = 2.0  # seconds before the first retry, doubled on each following one
+    timeout: float = 300.0
+
+    async def __call__(self, *args, **kwargs) -> Any:
+        """Runs the task inline, e.g. from a test or a command."""
+        return await self.func(*args, **kwargs)
+
+    async def enqueue(self, *args, **kwargs) -> str:
+        """Adds a run to the queue. Arguments must be JSON-serializable. Returns the message id."""
+        message = encode_message(self.name, args, kwargs)
+        return await get_redis_breaker().call(
+            get_redis().xadd,
+            config.TASKS_STREAM,
+            message,
+            maxlen=config.TASKS_MAX_LEN,
+            approximate=True,
+        )
+
+    def retry_delay(self, attempt: int) -> float:
+        return self.backoff * 2 ** attempt
+
+
+registry: dict[str, Task] = {}
+
+
+def task(
+    name: str | None = None,
+    *,
+    max_retries: int = 5,
+    backoff: float = 2.0,
+    timeout: float | None = None,
+) -> Callable[[Callable[..., Awaitable[Any]]], Task]:
+    """
+    Declares an async function as a task:
+
+        @task("pictures.collect")
+        async def collect_pictures(user_id: str) -> None: ...
+
+        await collect_pictures.enqueue(str(user.id))
+    """
+    def decorator(func: Callable[..., Awaitable[Any]]) -> Task:
+        task_name = name or f"{func.__module__}.{func.__qualname__}"
+        if task_name in registry:
+            raise ValueError(f"Task {task_name} is already registered")
+        registry[task_name] = Task(
+            task_name,
+            func,
+            max_retries=max_retries,
+            backoff=backoff,
+            timeout=timeout if timeout is not None else config.TASKS_DEFAULT_TIMEOUT,
+        )
+        return registry[task_name]
+    return decorator
+
+
+def encode_message(name: str, args: tuple | list, kwargs: dict, attempt: int = 0) -> dict[str, str]:
+    now = time.time()
+    return {
+        "id": uuid4().hex,
+        "task": name,
+        "payload": json.dumps({"args": list(args), "kwargs": kwargs}),
+        "attempt": str(attempt),
+        "due_at": repr(now),
+    }
@@ -0,0 +1,278 @@
+"""
+Task worker: runs tasks enqueued on the Redis stream.
+
+    python -m tasks.worker [--concurrency 8] [--name worker-1]
+
+Workers share a consumer group, so each message is delivered to one of
+them. A message is acknowledged once its task has finished, failed for
+good or been scheduled for a retry; messages left pending by a worker that
+died are claimed by another one after `TASKS_VISIBILITY_TIMEOUT` seconds.
+Failed runs are retried with exponential backoff through a sorted set of
+delayed messages, and after `max_retries` go to the dead-letter stream.
+"""
+import argparse
+import asyncio
+import importlib
+import json
+import logging
+import os
+import random
+import signal
+import socket
+import time
+import traceback
+
+from prometheus_client import start_http_server
+from redis.asyncio import Redis
+from redis.exceptions import ResponseError
+
+from core.config import Settings, configure_logging
+from webhooks.client import close_http_client
+from .queue import (
+    DEAD_SUFFIX,
+    DELAYED_SUFFIX,
+    TASK_DURATION,
+    TASK_QUEUE_LATENCY,
+    TASK_RUNS,
+    TASKS_IN_FLIGHT,
+    encode_message,
+    registry,
+)
+
+config = Settings() # pyright: ignore[reportCallIssue]
+logger = logging.getLogger(__name__)
+
+# Modules declaring tasks; imported so their tasks are registered
+TASK_MODULES = (
+    "service.users.pictures",
+    "webhooks.dispatcher",
+)
+
+BLOCK_MS = 5_000
+
+# Moves due retries back onto the stream; ZREM first, so only one worker moves each
+PROMOTE_LUA = """
+local due = redis.call('ZRANGEBYSCORE', KEYS[1], '-inf', ARGV[1], 'LIMIT', 0, tonumber(ARGV[2]))
+for _, member in ipairs(due) do
+    if redis.call('ZREM', KEYS[1], member) == 1 then
+        local fields = cjson.decode(member)
+        local flat = {}
+        for k, v in pairs(fields) do
+            table.insert(flat, k)
+            table.insert(flat, v)
+        end
+        redis.call('XADD', KEYS[2], 'MAXLEN', '~', ARGV[3], '*', unpack(flat))
+    end
+end
+return #due
+"""
+
+
+class Worker:
+    def __init__(self, redis: Redis, *, name: str, concurrency: int):
+        self.redis = redis
+        self.name = name
+        self.concurrency = concurrency
+        self.stream = config.TASKS_STREAM
+        self.group = config.TASKS_GROUP
+        self.delayed = f"{self.stream}{DELAYED_SUFFIX}"
+        self.dead = f"{self.stream}{DEAD_SUFFIX}"
+        self._running: set[asyncio.Task] = set()
+        self._stopping = asyncio.Event()
+        self._promote = redis.register_script(PROMOTE_LUA)
+
+    async def _ensure_group(self) -> None:
+        try:
+            await self.redis.xgroup_create(self.stream, self.group, id="0", mkstream=True)
+        except ResponseError as exc:
+            if "BUSYGROUP" not in str(exc):
+                raise
+
+    async def _handle(self, message_id: str, fields: dict[str, str]) -> None:
+        name = fields.get("task", "")
+        task = registry.get(name)
+        if task is None:
+            await self._dead_letter(message_id, fields, f"Unknown task {name}")
+            TASK_RUNS.labels(name, "dead").inc()
+            return
+
+        TASK_QUEUE_LATENCY.labels(name).observe(max(0.0, time.time() - float(fields.get("due_at", 0))))
+        attempt = int(fields.get("attempt", 0))
+        payload = json.loads(fields["payload"])
+        started = time.perf_counter()
+        TASKS_IN_FLIGHT.inc()
+        try:
+            await asyncio.wait_for(task.func(*payload["args"], **payload["kwargs"]), task.timeout)
+        except Exception:
+            error = traceback.format_exc(limit=5)
+            if attempt < task.max_retries:
+                delay = task.retry_delay(attempt) * random.uniform(0.8, 1.2)
+                logger.warning("Task %s failed (attempt %d), retrying in %.1fs", name, attempt + 1, delay)
+                retry = encode_message(name, payload["args"], payload["kwargs"], attempt + 1)
+                retry["due_at"] = repr(time.time() + delay)
+                async with self.redis.pipeline(transaction=True) as pipe:
+                    pipe.zadd(self.delayed, {json.dumps(retry): time.time() + delay})
+                    pipe.xack(self.stream, self.group, message_id)
+                    await pipe.execute()
+                TASK_RUNS.labels(name, "retry").inc()
+            else:
+                logger.error("Task %s failed for good after %d attempts", name, attempt + 1)
+                await self._dead_letter(message_id, fields, error)
+                TASK_RUNS.labels(name, "dead").inc()
+        else:
+            await self.redis.xack(self.stream, self.group, message_id)
+            TASK_RUNS.labels(name, "success").inc()
+        finally:
+            TASKS_IN_FLIGHT.dec()
+            TASK_DURATION.labels(name).observe(time.perf_counter() - started)
+
+    async def _dead_letter(self, message_id: str, fields: dict[str, str], error: str) -> None:
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.xadd(
+                self.dead,
+                {**fields, "error": error, "failed_at": repr(time.time()), "worker": self.name},
+                maxlen=config.TASKS_MAX_LEN,
+                approximate=True,
+            )
+            pipe.xack(self.stream, self.group, message_id)
+            await pipe.execute()
+
+    async def _run(self, message_id: str, fields: dict[str, str]) -> None:
+        try:
+            await self._handle(message_id, fields)
+        except Exception:
+            # Couldn't record the outcome; the message stays pending and is run again
+            logger.exception("Failed to settle message %s", message_id)
+
+    def _spawn(self, message_id: str, fields: dict[str, str]) -> None:
+        run = asyncio.create_task(self._run(message_id, fields))
+        self._running.add(run)
+        run.add_done_callback(self._running.discard)
+
+    async def _wait_for_slot(self) -> int:
+        while len(self._running) >= self.concurrency:
+            await asyncio.wait(self._running, return_when=asyncio.FIRST_COMPLETED)
+        return self.concurrency - len(self._running)
+
+    async def _read(self) -> None:
+        while not self._stopping.is_set():
+            free = await self._wait_for_slot()
+            response = await self.redis.xreadgroup(
+                self.group, self.name, {self.stream: ">"}, count=free, block=BLOCK_MS,
+            )
+            for _, messages in response or []:
+                for message_id, fields in messages:
+                    self._spawn(message_id, fields)
+
+    async def _promote_due(self) -> None:
+        while not self._stopping.is_set():
+            await self._promote(
+                keys=[self.delayed, self.stream],
+                args=[time.time(), 100, config.TASKS_MAX_LEN],
+            )
+            await asyncio.sleep(1)
+
+    async def _reclaim(self) -> None:
+        """Takes over messages that another worker received but never acknowledged."""
+        idle_ms = config.TASKS_VISIBILITY_TIMEOUT * 1000
+        while not self._stopping.is_set():
+            await asyncio.sleep(config.TASKS_VISIBILITY_TIMEOUT / 2)
+            start = "0-0"
+            while True:
+                free = await self._wait_for_slot()
+                # [next start, messages] on Redis 6.2, plus deleted ids on 7+
+                claimed = await self.redis.xautoclaim(
+                    self.stream, self.group, self.name, idle_ms, start_id=start, count=free,
+                )
+                start, messages = claimed[0], claimed[1]
+                for message_id, fields in messages:
+                    if fields is None:
+                        continue
+                    pending = await self.redis.xpending_range(
+                        self.stream, self.group, min=message_id, max=message_id, count=1,
+                    )
+                    task = registry.get(fields.get("task", ""))
+                    limit = (task.max_retries if task else 0) + 2
+                    if pending and pending[0]["times_delivered"] > limit:
+                        # Keeps killing its workers: stop handing it out
+                        await self._dead_letter(message_id, fields, "Worker died while running it")
+                        TASK_RUNS.labels(fields.get("task", ""), "dead").inc()
+                    else:
+                        self._spawn(message_id, fields)
+                if start == "0-0":
+                    break
+
+    async def _supervise(self, loop) -> None:
+        """Keeps a loop running through Redis outages."""
+        backoff = 0.5
+        while not self._stopping.is_set():
+            try:
+                await loop()
+                return
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.warning("%s failed, restarting in %.1fs", loop.__name__, backoff, exc_info=True)
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, 30)
+
+    async def run(self) -> None:
+        await self._supervise(self._ensure_group)
+        logger.info(
+            "Worker %s consuming %s with concurrency %d, tasks: %s",
+            self.name, self.stream, self.concurrency, ", ".join(sorted(registry)),
+        )
+        loops = [
+            asyncio.create_task(self._supervise(loop))
+            for loop in (self._read, self._promote_due, self._reclaim)
+        ]
+        await self._stopping.wait()
+        for loop in loops:
+            loop.cancel()
+        await asyncio.gather(*loops, return_exceptions=True)
+
+        if self._running:
+            logger.info("Waiting for %d running tasks", len(self._running))
+            _, unfinished = await asyncio.wait(self._running, timeout=config.TASKS_SHUTDOWN_GRACE)
+            for run in unfinished:
+                # Left pending, so another worker picks them up
+                run.cancel()
+
+    def stop(self) -> None:
+        self._stopping.set()
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description="Run background tasks from the Redis stream")
+    parser.add_argument("--concurrency", type=int, default=config.TASKS_CONCURRENCY)
+    parser.add_argument("--name", default=f"{socket.gethostname()}-{os.getpid()}")
+    args = parser.parse_args()
+
+    configure_logging()
+    for module in TASK_MODULES:
+        importlib.import_module(module)
+    if config.TASKS_METRICS_PORT:
+        start_http_server(config.TASKS_METRICS_PORT)
+
+    # Own client: blocking reads need a longer socket timeout than API calls get
+    redis = Redis.from_url(
+        config.REDIS_URL,
+        decode_responses=True,
+        socket_timeout=BLOCK_MS / 1000 + 5,
+        socket_connect_timeout=config.REDIS_CONNECT_TIMEOUT,
+    )
+    worker = Worker(redis, name=args.name, concurrency=args.concurrency)
+
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, worker.stop)
+
+    try:
+        await worker.run()
+    finally:
+        await close_http_client()
+        await redis.aclose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,48 @@
+"""
+SQL statement counting for tests.
+
+Counts what the engine instrumentation sees inside a block, including
+requests made in process through `httpx.ASGITransport` or Starlette's
+`TestClient` (the metrics middleware merges each request's statements into
+the enclosing count). Pin the main flows so an N+1 shows up as a failure:
+
+    async with AsyncClient(transport=ASGITransport(app), base_url="http://test") as client:
+        with assert_max_statements(3):
+            await client.get("/api/v1/users/me", headers=auth)
+"""
+from collections.abc import Iterator
+from contextlib import contextmanager
+
+from database.relational_db.instrumentation import DbStats, db_stats
+
+
+@contextmanager
+def count_statements() -> Iterator[DbStats]:
+    """Yields the `DbStats` of the block, filled in as statements run."""
+    stats = DbStats()
+    parent = db_stats.get()
+    token = db_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        db_stats.reset(token)
+        if parent is not None:
+            parent.merge(stats)
+
+
+@contextmanager
+def assert_max_statements(limit: int) -> Iterator[DbStats]:
+    """Fails with the most repeated statement when the block runs more than `limit` statements."""
+    __tracebackhide__ = True
+    with count_statements() as stats:
+        yield stats
+    assert stats.statements <= limit, f"Expected at most {limit} SQL statements, got {stats.describe()}"
+
+
+@contextmanager
+def assert_statements(expected: int) -> Iterator[DbStats]:
+    """Fails unless the block runs exactly `expected` statements, so improvements get pinned too."""
+    __tracebackhide__ = True
+    with count_statements() as stats:
+        yield stats
+    assert stats.statements == expected, f"Expected {expected} SQL statements, got {stats.describe()}"
@@ -0,0 +1,31 @@
+import httpx
+
+from core.config import Settings
+
+config = Settings() # pyright: ignore[reportCallIssue]
+
+_client: httpx.AsyncClient | None = None
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """Shared client, so deliveries to an endpoint reuse kept-alive connections."""
+    global _client
+    if _client is None:
+        _client = httpx.AsyncClient(
+            timeout=httpx.Timeout(config.WEBHOOK_TIMEOUT, connect=min(5.0, config.WEBHOOK_TIMEOUT)),
+            limits=httpx.Limits(
+                max_connections=config.WEBHOOK_MAX_CONNECTIONS,
+                max_keepalive_connections=config.WEBHOOK_MAX_CONNECTIONS // 2,
+                keepalive_expiry=30,
+            ),
+            follow_redirects=False,
+            headers={"User-Agent": "backend-webhooks/1"},
+        )
+    return _client
+
+
+async def close_http_client() -> None:
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
@@ -0,0 +1,261 @@
+"""
+Outgoing webhook delivery.
+
+Events recorded with `uow.add_event()` reach `fan_out` through the outbox
+relay, which records a delivery row per subscribed endpoint in the relay's
+transaction and then wakes that endpoint's `webhooks.deliver` task.
+Delivery waits `WEBHOOK_BATCH_WINDOW` so a burst of events goes out as one
+signed request, then claims batches of due rows and POSTs them over the
+shared keep-alive client, with at most `max_concurrency` batches in flight
+per endpoint across all workers.
+
+Failed batches are retried with exponential backoff (or after the
+endpoint's Retry-After) until `WEBHOOK_MAX_ATTEMPTS`, by the `wake_due`
+scheduler job. Endpoints answering 410 Gone are deactivated. Batches to
+one endpoint may arrive out of order; receivers should dedupe on event id.
+"""
+import asyncio
+import email.utils
+import json
+import logging
+import random
+import time
+from datetime import datetime, timedelta, UTC
+from itertools import groupby
+from typing import Any
+from uuid import UUID, uuid4
+
+import httpx
+from prometheus_client import Counter, Histogram
+
+from core.config import Settings
+from database.redis import REDIS_FAILURES, get_redis, get_redis_breaker
+from database.relational_db import (
+    WebhookDelivery,
+    WebhookSubscription,
+    WebhooksInterface,
+    uow_scope,
+)
+from domain.webhooks import WebhookEventType
+from outbox import OutboxBatch, outbox_handler
+from tasks import task
+from .client import get_http_client
+from .signing import signature_headers
+
+config = Settings() # pyright: ignore[reportCallIssue]
+logger = logging.getLogger(__name__)
+
+# Outbox events endpoints can subscribe to; pings go to one endpoint directly
+EVENT_TYPES = {event_type.value for event_type in WebhookEventType} - {WebhookEventType.PING.value}
+
+WAKE_PREFIX = "webhooks:wake"
+WAKE_TTL = 60
+# A deliver task hands over to a fresh one after this long, in seconds
+DRAIN_SECONDS = 60
+MAX_RETRY_DELAY = 60 * 60 * 6
+# Kept for inspection this long after they are settled
+DELIVERED_RETENTION = timedelta(days=7)
+FAILED_RETENTION = timedelta(days=30)
+
+WEBHOOK_EVENTS = Counter(
+    "webhook_events_total",
+    "Webhook events by delivery outcome (delivered, retry, failed)",
+    ["outcome"],
+)
+WEBHOOK_REQUEST_DURATION = Histogram(
+    "webhook_request_duration_seconds",
+    "Webhook delivery requests by response status class",
+    ["status"],
+)
+WEBHOOK_BATCH_SIZE = Histogram(
+    "webhook_batch_size",
+    "Events per webhook delivery request",
+    buckets=(1, 2, 5, 10, 25, 50, 100, 250, 500),
+)
+
+
+def new_event(event_type: str, data: dict[str, Any]) -> dict[str, Any]:
+    """The event as receivers get it, within a batch's `events`."""
+    return {
+        "id": str(uuid4()),
+        "type": event_type,
+        "created_at": datetime.now(UTC).isoformat(),
+        "data": data,
+    }
+
+
+@outbox_handler("webhooks")
+async def fan_out(batch: OutboxBatch) -> None:
+    """Records a delivery per subscribed endpoint, committed with the batch."""
+    repo = WebhooksInterface(batch.session)
+    woken: set[UUID] = set()
+    for event in batch.events:
+        if event.event_type not in EVENT_TYPES:
+            continue
+        subscription_ids = await repo.subscribers(event.event_type)
+        await repo.add_deliveries(subscription_ids, event.event_id, event.event_type, event.envelope())
+        woken.update(subscription_ids)
+
+    async def wake_all() -> None:
+        for subscription_id in woken:
+            await wake(subscription_id)
+    if woken:
+        batch.after_commit(wake_all)
+
+
+async def wake(subscription_id: UUID | str) -> None:
+    """Queues delivery for an endpoint, unless it is already queued and hasn't started."""
+    try:
+        woken = await get_redis_breaker().call(
+            get_redis().set, f"{WAKE_PREFIX}:{subscription_id}", "1", nx=True, ex=WAKE_TTL,
+        )
+        if woken:
+            await deliver.enqueue(str(subscription_id))
+    except REDIS_FAILURES:
+        # The rows are stored; `wake_due` gets to them
+        logger.warning("Failed to queue webhook delivery for %s", subscription_id)
+
+
+@task("webhooks.deliver", max_retries=3, timeout=DRAIN_SECONDS + config.WEBHOOK_TIMEOUT * 3)
+async def deliver(subscription_id: str) -> None:
+    # Let a burst of events gather into one batch
+    await asyncio.sleep(config.WEBHOOK_BATCH_WINDOW)
+    try:
+        # Events committed from here on wake a new task
+        await get_redis_breaker().call(get_redis().delete, f"{WAKE_PREFIX}:{subscription_id}")
+    except REDIS_FAILURES:
+        pass
+
+    async with uow_scope() as uow:
+        subscription = await WebhooksInterface(uow.session).get_subscription(subscription_id)
+    if subscription is None or not subscription.is_active:
+        return
+
+    deadline = time.monotonic() + DRAIN_SECONDS
+    results = await asyncio.gather(*(
+        _drain(subscription, deadline) for _ in range(subscription.max_concurrency)
+    ))
+    if any(results):
+        # Stopped at the deadline with work left
+        async with uow_scope() as uow:
+            if await WebhooksInterface(uow.session).has_due(subscription_id):
+                await wake(subscription_id)
+
+
+async def _drain(subscription: WebhookSubscription, deadline: float) -> bool:
+    """Sends batches until none is due or the endpoint fails. True if stopped by the deadline."""
+    lease = timedelta(seconds=config.WEBHOOK_TIMEOUT * 3)
+    while time.monotonic() < deadline:
+        async with uow_scope() as uow:
+            claimed = await WebhooksInterface(uow.session).claim_batch(
+                subscription, config.WEBHOOK_BATCH_SIZE, lease,
+            )
+        if claimed is None:
+            return False
+        batch_id, deliveries = claimed
+        if not await _send(subscription, batch_id, deliveries):
+            return False
+    return True
+
+
+def _retry_after(response: httpx.Response) -> float | None:
+    value = response.headers.get("retry-after")
+    if not value:
+        return None
+    if value.isdigit():
+        return float(value)
+    try:
+        return max(0.0, email.utils.parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def _retry_delay(attempts: int, retry_after: float | None) -> float:
+    delay = min(config.WEBHOOK_RETRY_BACKOFF * 2 ** attempts, MAX_RETRY_DELAY)
+    delay *= random.uniform(0.8, 1.2)
+    if retry_after is not None:
+        delay = max(delay, min(retry_after, MAX_RETRY_DELAY))
+    return delay
+
+
+async def _send(
+    subscription: WebhookSubscription,
+    batch_id: UUID,
+    deliveries: list[WebhookDelivery],
+) -> bool:
+    """POSTs one batch and records the outcome. Returns whether it was accepted."""
+    body = json.dumps(
+        {"batch_id": str(batch_id), "events": [delivery.payload for delivery in deliveries]},
+        separators=(",", ":"),
+    ).encode()
+    headers = {
+        "content-type": "application/json",
+        **signature_headers(subscription.secret, str(batch_id), body),
+    }
+
+    error = None
+    retry_after = None
+    gone = False
+    started = time.perf_counter()
+    try:
+        response = await get_http_client().post(subscription.url, content=body, headers=headers)
+    except httpx.HTTPError as exc:
+        error = f"{type(exc).__name__}: {exc}"
+        status_class = "error"
+    else:
+        status_class = f"{response.status_code // 100}xx"
+        if not response.is_success:
+            error = f"HTTP {response.status_code}"
+            retry_after = _retry_after(response)
+            gone = response.status_code == 410
+    WEBHOOK_REQUEST_DURATION.labels(status_class).observe(time.perf_counter() - started)
+    WEBHOOK_BATCH_SIZE.observe(len(deliveries))
+
+    async with uow_scope() as uow:
+        repo = WebhooksInterface(uow.session)
+        if error is None:
+            await repo.mark_delivered([delivery.id for delivery in deliveries])
+            WEBHOOK_EVENTS.labels("delivered").inc(len(deliveries))
+            return True
+
+        logger.warning("Webhook batch %s to %s failed: %s", batch_id, subscription.url, error)
+        if gone:
+            stored = await repo.get_subscription(subscription.id)
+            if stored is not None:
+                stored.is_active = False
+            await repo.mark_failed([delivery.id for delivery in deliveries], "Endpoint is gone (410)", None)
+            WEBHOOK_EVENTS.labels("failed").inc(len(deliveries))
+            logger.warning("Deactivated webhook %s after 410 Gone", subscription.id)
+            return False
+
+        now = datetime.now(UTC)
+        by_attempts = sorted(deliveries, key=lambda delivery: delivery.attempts)
+        for attempts, group in groupby(by_attempts, key=lambda delivery: delivery.attempts):
+            ids = [delivery.id for delivery in group]
+            if attempts + 1 >= config.WEBHOOK_MAX_ATTEMPTS:
+                await repo.mark_failed(ids, error, None)
+                WEBHOOK_EVENTS.labels("failed").inc(len(ids))
+            else:
+                retry_at = now + timedelta(seconds=_retry_delay(attempts, retry_after))
+                await repo.mark_failed(ids, error, retry_at)
+                WEBHOOK_EVENTS.labels("retry").inc(len(ids))
+    return False
+
+
+async def wake_due() -> None:
+    """Scheduler job: queues endpoints with retries due or claims that ran out."""
+    async with uow_scope() as uow:
+        subscription_ids = await WebhooksInterface(uow.session).subscriptions_with_due()
+    for subscription_id in subscription_ids:
+        await wake(subscription_id)
+
+
+async def prune_deliveries() -> None:
+    """Scheduler job: deletes settled deliveries past their retention."""
+    now = datetime.now(UTC)
+    async with uow_scope() as uow:
+        removed = await WebhooksInterface(uow.session).prune(
+            now - DELIVERED_RETENTION, now - FAILED_RETENTION,
+        )
+    if removed:
+        logger.info("Pruned %d webhook deliveries", removed)
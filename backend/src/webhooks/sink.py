@@ -0,0 +1,79 @@
+"""
+Local endpoint for trying webhooks out:
+
+    python -m webhooks.sink --secret whsec_... [--port 9009] [--fail-rate 0.2] [--delay 0.5]
+
+Verifies each request's signature and prints the events it received.
+`--fail-rate` answers that share of requests with a 503, and `--delay`
+makes every response slow, to exercise retries and concurrency caps.
+"""
+import argparse
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from .signing import verify
+
+
+def make_handler(secret: str | None, fail_rate: float, delay: float):
+    lock = threading.Lock()
+    seen: set[str] = set()
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self) -> None:
+            body = self.rfile.read(int(self.headers.get("content-length", 0)))
+            headers = {key.lower(): value for key, value in self.headers.items()}
+            if secret is not None and not verify(secret, headers, body):
+                print(f"! {headers.get('webhook-id')}: bad signature")
+                self._reply(401)
+                return
+            if delay:
+                time.sleep(delay)
+            if random.random() < fail_rate:
+                print(f"~ {headers.get('webhook-id')}: failing on purpose")
+                self._reply(503, {"retry-after": "1"})
+                return
+
+            events = json.loads(body).get("events", [])
+            with lock:
+                duplicates = sum(event["id"] in seen for event in events)
+                seen.update(event["id"] for event in events)
+            print(f"< {headers.get('webhook-id')}: {len(events)} events, {duplicates} seen before")
+            for event in events:
+                print(f"    {event['type']} {event['id']} {json.dumps(event['data'])}")
+            self._reply(204)
+
+        def _reply(self, status: int, headers: dict[str, str] | None = None) -> None:
+            self.send_response(status)
+            for key, value in (headers or {}).items():
+                self.send_header(key, value)
+            self.send_header("content-length", "0")
+            self.end_headers()
+
+        def log_message(self, format, *args) -> None:
+            pass
+
+    return Handler
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Print and verify incoming webhooks")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9009)
+    parser.add_argument("--secret", help="Subscription secret; signatures aren't checked without it")
+    parser.add_argument("--fail-rate", type=float, default=0.0)
+    parser.add_argument("--delay", type=float, default=0.0)
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(args.secret, args.fail_rate, args.delay))
+    print(f"Listening on http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
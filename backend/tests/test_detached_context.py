@@ -0,0 +1,38 @@
+"""Request-scoped database settings don't leak into tasks that outlive the request."""
+import asyncio
+
+import pytest
+
+from database.relational_db import detached_context
+from database.relational_db.instrumentation import db_stats
+from database.relational_db.session import statement_timeout
+from utils.query_counter import count_statements
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_statement_timeout_is_not_inherited():
+    async def timeout() -> int | None:
+        return statement_timeout.get()
+
+    token = statement_timeout.set(2_000)
+    try:
+        inherited = await asyncio.create_task(timeout())
+        detached = await asyncio.create_task(timeout(), context=detached_context())
+    finally:
+        statement_timeout.reset(token)
+
+    assert inherited == 2_000
+    assert detached is None
+
+
+async def test_statement_counter_is_not_inherited():
+    async def counter():
+        return db_stats.get()
+
+    with count_statements() as stats:
+        inherited = await asyncio.create_task(counter())
+        detached = await asyncio.create_task(counter(), context=detached_context())
+
+    assert inherited is stats
+    assert detached is None
@@ -0,0 +1,53 @@
+"""
+L1 cache invalidation across workers: two buses with their own Redis
+connections stand in for two uvicorn workers.
+"""
+import asyncio
+import time
+from uuid import uuid4
+
+import pytest
+from redis.asyncio import Redis
+
+from database.redis import MISSING, InvalidationBus, LocalCache
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+async def workers(redis_url):
+    channel = f"cache:invalidate:test:{uuid4().hex}"
+    started = []
+    for index in range(2):
+        bus = InvalidationBus(Redis.from_url(redis_url, decode_responses=True), channel=channel)
+        cache = bus.register(LocalCache(f"test-{index}", maxsize=100, ttl=300))
+        await bus.start()
+        await bus.wait_ready()
+        started.append((bus, cache))
+    yield started
+    for bus, _ in started:
+        await bus.stop()
+        await bus.redis.aclose()
+
+
+async def _until_dropped(caches: list[LocalCache], key: str, timeout: float = 2) -> None:
+    deadline = time.monotonic() + timeout
+    while any(cache.get(key) is not MISSING for cache in caches):
+        assert time.monotonic() < deadline, f"{key} still cached after {timeout}s"
+        await asyncio.sleep(0.01)
+
+
+async def test_invalidation_reaches_every_worker(workers):
+    (first, _), (second, _) = workers
+    caches = [cache for _, cache in workers]
+    for cache in caches:
+        cache.set("user:1", "stale")
+        cache.set("user:2", "fresh")
+
+    await first.publish(["user:1"])
+    await _until_dropped(caches, "user:1")
+
+    assert all(cache.get("user:2") == "fresh" for cache in caches)
+
+    await second.publish(prefixes=["user:"])
+    await _until_dropped(caches, "user:2")
@@ -0,0 +1,45 @@
+"""Streaming multipart parsing, without a database."""
+import pytest
+from fastapi import HTTPException
+from starlette.requests import Request
+
+from core.http import stream_file_field
+
+pytestmark = pytest.mark.anyio
+
+BOUNDARY = "x-boundary"
+
+
+def _request(body: bytes) -> Request:
+    async def receive() -> dict:
+        return {"type": "http.request", "body": body, "more_body": False}
+
+    scope = {
+        "type": "http",
+        "method": "POST",
+        "path": "/",
+        "headers": [(b"content-type", f"multipart/form-data; boundary={BOUNDARY}".encode())],
+    }
+    return Request(scope, receive)
+
+
+async def _read(body: bytes) -> bytes:
+    return b"".join([chunk async for chunk in stream_file_field(_request(body))])
+
+
+async def test_file_field():
+    body = (
+        f"--{BOUNDARY}\r\n"
+        'Content-Disposition: form-data; name="file"; filename="a.png"\r\n'
+        "Content-Type: image/png\r\n\r\n"
+        f"picture bytes\r\n--{BOUNDARY}--\r\n"
+    ).encode()
+
+    assert await _read(body) == b"picture bytes"
+
+
+async def test_garbage_body_is_a_400():
+    with pytest.raises(HTTPException) as raised:
+        await _read(b"\x00garbage, not multipart at all\r\n\r\n" * 4)
+
+    assert raised.value.status_code == 400
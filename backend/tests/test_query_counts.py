@@ -0,0 +1,70 @@
+"""
+SQL statements per request on the main flows, pinned exactly: an extra lazy
+load or an N+1 fails here, and so does an improvement until the count and
+the route's `query_budget` are lowered with it.
+"""
+from uuid import uuid4
+
+import pytest
+
+from utils.query_counter import assert_statements
+
+pytestmark = pytest.mark.anyio
+
+MOBILE = {"X-Client": "mobile"}
+
+
+async def test_register(client):
+    credentials = {"email": f"{uuid4().hex[:12]}@example.com", "password": "correct horse battery staple"}
+
+    with assert_statements(8):
+        response = await client.post("/api/v1/auth/register", json=credentials, headers=MOBILE)
+
+    assert response.status_code == 201, response.text
+
+
+async def test_login(client, credentials, tokens):
+    with assert_statements(3):
+        response = await client.post("/api/v1/auth/login", json=credentials, headers=MOBILE)
+
+    assert response.status_code == 200, response.text
+
+
+async def test_refresh(client, tokens):
+    with assert_statements(3):
+        response = await client.post(
+            "/api/v1/auth/refresh",
+            headers={"Authorization": f"Bearer {tokens['refresh_token']}"},
+        )
+
+    assert response.status_code == 200, response.text
+
+
+async def test_me(client, tokens):
+    with assert_statements(3):
+        response = await client.get(
+            "/api/v1/users/me",
+            headers={"Authorization": f"Bearer {tokens['access_token']}"},
+        )
+
+    assert response.status_code == 200, response.text
+
+
+async def test_admin_list_users(client, admin_token):
+    # More users than fit on a page: role loading must not scale with it
+    for _ in range(3):
+        await client.post(
+            "/api/v1/auth/register",
+            json={"email": f"{uuid4().hex[:12]}@example.com", "password": "correct horse battery staple"},
+            headers=MOBILE,
+        )
+
+    with assert_statements(5):
+        response = await client.get(
+            "/api/v1/admins/users",
+            params={"limit": 2},
+            headers={"Authorization": f"Bearer {admin_token}"},
+        )
+
+    assert response.status_code == 200, response.text
+    assert len(response.json()["items"]) == 2
@@ -0,0 +1,30 @@
+"""Webhook signatures against the Standard Webhooks reference test vector."""
+from unittest.mock import patch
+
+from webhooks.signing import generate_secret, sign, signature_headers, verify
+
+# From the Standard Webhooks specification's test suite
+SECRET = "whsec_MfKQ9r8GKYqrTwjUPD8ILPZIo2LaLaSw"
+MESSAGE_ID = "msg_p5jXN8AQM9LWM0D4loKWxJek"
+TIMESTAMP = 1614265330
+BODY = b'{"test": 2432232314}'
+SIGNATURE = "v1,g0hM9SsE+OTPJTGt/tmIKtSyZlE3uFJELVlNIOLJ1OE="
+
+
+def test_sign_matches_reference_vector():
+    assert sign(SECRET, MESSAGE_ID, TIMESTAMP, BODY) == SIGNATURE
+
+
+def test_verify_accepts_reference_vector():
+    headers = {"webhook-id": MESSAGE_ID, "webhook-timestamp": str(TIMESTAMP), "webhook-signature": SIGNATURE}
+
+    with patch("webhooks.signing.time.time", return_value=TIMESTAMP):
+        assert verify(SECRET, headers, BODY)
+        assert not verify(SECRET, headers, BODY + b" ")
+
+
+def test_generated_secret_round_trips():
+    secret = generate_secret()
+
+    assert secret.startswith("whsec_")
+    assert verify(secret, signature_headers(secret, MESSAGE_ID, BODY), BODY)